@@ -1,30 +1,16 @@
 # This is the main file where the application will run out of
 import streamlit as st
 
-from utils.utils import check_config_file_state, zip_files
+from utils.utils import finish_rerun, render_sidebar, start_rerun
 
 st.set_page_config(
     page_title="Home",
     page_icon="🏠",
 )
-
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
+start_rerun("home")
 
 # create the sidebars
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
-    )
-
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+render_sidebar()
 
 # start of application
 st.header("RepoConfig")
@@ -33,3 +19,5 @@ st.write("_Your one-stop shop for creating RepoSense configurations and scaffold
 st.divider()
 
 st.info("Select any Configurator on the sidebar to start creating RepoSense configurations and scaffoldings!")
+
+finish_rerun()
@@ -0,0 +1,68 @@
+"""
+Measures checking many entries of ``ignore_commits_list``, against resolving each hash with its own ``git`` process.
+
+Run from the repository root with ``python -m benchmarks.bench_commits``. Requires ``git``.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+from benchmarks.bench_discovery import make_repository
+from utils import commits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--entries", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        path = os.path.join(base_dir, "repo")
+        make_repository(path, args.commits, 10, 0)
+        history = subprocess.run(["git", "-C", path, "rev-list", "HEAD"], capture_output=True, text=True,
+                                 check=True).stdout.split()
+
+        # mostly abbreviated hashes, with every tenth entry a range and a few hashes that do not exist
+        rng = random.Random(0)
+        entries = []
+        for index in range(args.entries):
+            if index % 10 == 0:
+                end = rng.randrange(len(history) - 100)
+                entries.append(f"{history[end + rng.randrange(1, 100)][:10]}..{history[end][:10]}")
+            else:
+                entries.append(history[rng.randrange(len(history))][:10] if index % 25 else f"{index:08x}")
+
+        start = time.perf_counter()
+        for entry in entries:
+            for commit in entry.split(".."):
+                subprocess.run(["git", "-C", path, "rev-parse", "--verify", "--quiet", f"{commit}^{{commit}}"],
+                               capture_output=True)
+        per_hash = time.perf_counter() - start
+
+        validator = commits.CommitValidator()
+        start = time.perf_counter()
+        checks = validator.validate(path, "", entries, expand=True)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        validator.validate(path, "", entries, expand=True)
+        cached = time.perf_counter() - start
+
+        print(json.dumps({
+            "commits": args.commits,
+            "entries": args.entries,
+            "per_hash_s": round(per_hash, 4),
+            "batched_s": round(batched, 4),
+            "cached_s": round(cached, 4),
+            "failed_entries": sum(not check.ok for check in checks.values()),
+        }))
+
+
+if __name__ == "__main__":
+    main()
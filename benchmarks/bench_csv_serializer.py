@@ -0,0 +1,86 @@
+"""
+Compares the streaming CSV serializer against the previous pandas DataFrame round-trip.
+
+Run from the repository root with ``python -m benchmarks.bench_csv_serializer``. The pandas comparison is skipped
+if pandas is not installed.
+"""
+
+import argparse
+import gc
+import io
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_author_config, make_group_config, make_repo_config
+from utils import converters
+
+
+def legacy_convert(rows, headers: list[str]) -> bytes:
+    """
+    Reproduces the previous list of lists -> DataFrame -> to_csv conversion path.
+    """
+
+    import pandas as pd
+
+    df = pd.DataFrame(list(rows), columns=headers)
+    # the previous implementation also wrote the frame to temp/ before serializing it again
+    df.to_csv(io.StringIO(), index=False)
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def measure(func, *args) -> tuple[float, int, bytes]:
+    """
+    Times a single call of the function and records its peak traced memory usage.
+
+    :return: Tuple of elapsed seconds, peak bytes allocated and the return value
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    try:
+        import pandas  # noqa: F401
+        has_pandas = True
+    except ImportError:
+        has_pandas = False
+
+    cases = [
+        ("repo-config.csv", make_repo_config, converters.convert_repo_config_csv_to_csv,
+         converters.iter_repo_config_rows, converters.REPO_CONFIG_HEADERS),
+        ("author-config.csv", make_author_config, converters.convert_author_config_csv_to_csv,
+         converters.iter_author_config_rows, converters.AUTHOR_CONFIG_HEADERS),
+        ("group-config.csv", make_group_config, converters.convert_group_config_csv_to_csv,
+         converters.iter_group_config_rows, converters.GROUP_CONFIG_HEADERS),
+    ]
+    results = []
+
+    for name, make, convert, iter_rows, headers in cases:
+        for size in args.sizes:
+            repoinfo = make(size)
+            elapsed, peak, streamed = measure(convert, repoinfo)
+            result = {"config": name, "rows": size, "streaming_s": round(elapsed, 4), "streaming_peak_bytes": peak,
+                      "output_bytes": len(streamed)}
+
+            if has_pandas:
+                elapsed, peak, legacy = measure(legacy_convert, iter_rows(repoinfo), headers)
+                result.update(pandas_s=round(elapsed, 4), pandas_peak_bytes=peak, identical=legacy == streamed)
+
+            results.append(result)
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
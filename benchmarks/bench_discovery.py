@@ -0,0 +1,88 @@
+"""
+Measures discovering the authors of many repositories, first from scratch and then after a few new commits.
+
+Run from the repository root with ``python -m benchmarks.bench_discovery``. Requires ``git``.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+from utils import discovery
+
+
+def fast_import_stream(commits: int, authors: int, seed: int, start: int = 0) -> bytes:
+    """
+    Generates a ``git fast-import`` stream of empty commits on master by randomly chosen authors.
+    """
+
+    rng = random.Random(seed)
+    lines = []
+
+    for mark in range(start + 1, start + commits + 1):
+        author = rng.randrange(authors)
+        lines += [
+            "commit refs/heads/master",
+            f"mark :{mark}",
+            f"author Author {author} <author{author}@example.com> {1700000000 + mark} +0000",
+            f"committer Author {author} <author{author}@example.com> {1700000000 + mark} +0000",
+            "data 7",
+            f"c{mark % 1000000:06d}",
+        ]
+
+        if mark == start + 1 and start:
+            lines.append("from refs/heads/master^0")
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def make_repository(path: str, commits: int, authors: int, seed: int):
+    subprocess.run(["git", "init", "-q", "-b", "master", path], check=True)
+    subprocess.run(["git", "-C", path, "fast-import", "--quiet"], input=fast_import_stream(commits, authors, seed),
+                   check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=24)
+    parser.add_argument("--commits", type=int, default=50000)
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=discovery.DISCOVERY_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        repos = [(os.path.join(base_dir, f"repo-{index}"), "") for index in range(args.repos)]
+
+        for index, (path, _) in enumerate(repos):
+            make_repository(path, args.commits, args.authors, index)
+
+        author_discovery = discovery.AuthorDiscovery(max_workers=args.workers)
+        start = time.perf_counter()
+        results = author_discovery.discover(repos)
+        cold = time.perf_counter() - start
+
+        for index, (path, _) in enumerate(repos):
+            subprocess.run(["git", "-C", path, "fast-import", "--quiet", "--force"],
+                           input=fast_import_stream(10, args.authors, -index, start=args.commits), check=True)
+
+        start = time.perf_counter()
+        author_discovery.discover(repos)
+        incremental = time.perf_counter() - start
+        author_discovery.shutdown()
+
+        print(json.dumps({
+            "repos": args.repos,
+            "commits_per_repo": args.commits,
+            "workers": args.workers,
+            "cold_s": round(cold, 4),
+            "incremental_s": round(incremental, 4),
+            "authors_found": sum(len(result[1]) for result in results.values() if not isinstance(result, str)),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures previewing the globs of a group-config on a large repository, and previewing them again after one glob is
+edited.
+
+Run from the repository root with ``python -m benchmarks.bench_globs``.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from utils import globs
+
+EXTENSIONS = ["java", "py", "md", "txt", "json", "ts", "png"]
+GLOBS = ["src/main/**", "src/test/**", "**/*.md", "docs/**", "**.json", "*.txt", "lib/{core,extra}/**/*.ts",
+         "**/?est*.py"]
+
+
+def make_paths(count: int, seed: int = 0) -> list[str]:
+    """
+    Generates file paths spread over a few top-level directories and nested subdirectories.
+    """
+
+    rng = random.Random(seed)
+    tops = ["src/main", "src/test", "docs", "lib/core", "lib/extra", "scripts", "assets"]
+    paths = set()
+
+    while len(paths) < count:
+        depth = rng.randrange(4)
+        dirs = "/".join(f"d{rng.randrange(50)}" for _ in range(depth))
+        name = f"{rng.choice(['test', 'file', 'main'])}{rng.randrange(100000)}.{rng.choice(EXTENSIONS)}"
+        paths.add("/".join(filter(None, [rng.choice(tops), dirs, name])))
+
+    return list(paths)
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=1000000)
+    args = parser.parse_args()
+
+    paths = make_paths(args.paths)
+    index_s, index = timed(globs.PathIndex, paths)
+    cold_s, preview = timed(index.preview, GLOBS)
+    cached_s, _ = timed(index.preview, GLOBS)
+
+    edited = GLOBS[:-1] + ["**/test*.java"]
+    edit_s, _ = timed(index.preview, edited)
+    prefix_edit_s, _ = timed(index.preview, GLOBS[1:] + ["src/main/d1/**"])
+
+    print(json.dumps({
+        "paths": args.paths,
+        "globs": len(GLOBS),
+        "index_s": round(index_s, 4),
+        "cold_preview_s": round(cold_s, 4),
+        "cached_preview_s": round(cached_s, 4),
+        "edited_extension_glob_s": round(edit_s, 4),
+        "edited_prefix_glob_s": round(prefix_edit_s, 4),
+        "unmatched": preview.unmatched_count,
+    }))
+
+
+if __name__ == "__main__":
+    main()
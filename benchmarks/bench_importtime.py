@@ -0,0 +1,153 @@
+"""
+Measures the import time of the app and of each configurator page with ``python -X importtime``, and checks it against
+the tracked baseline in ``importtime_baseline.json``.
+
+Each script's top-level imports are run in a fresh interpreter, which is what a container cold start and the first
+render of a page pay for. ``streamlit`` is imported first, so that the time the page's own imports add on top of it
+is reported separately as ``page_ms``.
+
+Run from the repository root with ``python -m benchmarks.bench_importtime``. Pass ``--check`` to exit with an error
+when a page imports a heavy module it did not import in the baseline or got noticeably slower, and ``--update`` to
+record the current measurements as the new baseline.
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASELINE = os.path.join(os.path.dirname(__file__), "importtime_baseline.json")
+
+# modules that must only be imported by the pages that need them
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "sqlite3", "streamlit_tags", "yaml"]
+
+
+def script_imports(path: str) -> str:
+    """
+    Extracts the top-level import statements of a script.
+
+    :param path: Path of the script
+    :return: Source code of the import statements
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    return "\n".join(
+        ast.get_source_segment(source, node)
+        for node in ast.parse(source).body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_time(code: str) -> tuple[float, float, set[str]]:
+    """
+    Runs code in a fresh interpreter with ``-X importtime``, after importing ``streamlit``.
+
+    :param code: Code to run
+    :return: Tuple of the total import time and of the import time after ``streamlit`` in milliseconds, and the names
+             of the top-level packages imported after ``streamlit``
+    """
+
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import streamlit\n{code}"],
+                             capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Unable to import:\n{code}\n{process.stderr.strip().splitlines()[-1]}")
+
+    total = after_streamlit = 0
+    packages = set()
+    seen_streamlit = False
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        if not cumulative.strip().isdigit():
+            continue
+
+        if seen_streamlit:
+            packages.add(name.strip().partition(".")[0])
+
+        # nested imports are indented and already counted in the cumulative time of the top-level imports
+        if name[1:].startswith(" "):
+            continue
+
+        total += int(cumulative)
+
+        if seen_streamlit:
+            after_streamlit += int(cumulative)
+        elif name.strip() == "streamlit":
+            seen_streamlit = True
+
+    return total / 1000, after_streamlit / 1000, packages
+
+
+def measure(code: str, repeat: int) -> tuple[float, float, set[str]]:
+    runs = [import_time(code) for _ in range(repeat)]
+    return statistics.median(run[0] for run in runs), statistics.median(run[1] for run in runs), runs[0][2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="compare against the baseline")
+    parser.add_argument("--update", action="store_true", help="record the measurements as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="fraction by which page_ms may exceed the baseline, on top of a 25 ms allowance")
+    args = parser.parse_args()
+
+    results = {}
+
+    for path in ["Home.py"] + sorted(glob.glob("pages/*.py")):
+        total_ms, page_ms, packages = measure(script_imports(path), args.repeat)
+        results[path] = {
+            "total_ms": round(total_ms, 1),
+            "page_ms": round(page_ms, 1),
+            "heavy_modules": sorted(packages.intersection(HEAVY_MODULES)),
+        }
+
+    print(json.dumps(results, indent=2))
+
+    if args.update:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump({path: {"page_ms": result["page_ms"], "heavy_modules": result["heavy_modules"]}
+                       for path, result in results.items()}, f, indent=2)
+            f.write("\n")
+
+    if not args.check:
+        return 0
+
+    with open(BASELINE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+
+    for path, result in results.items():
+        expected = baseline.get(path)
+
+        if expected is None:
+            continue
+
+        new_modules = set(result["heavy_modules"]) - set(expected["heavy_modules"])
+        if new_modules:
+            regressions.append(f"{path} now imports {', '.join(sorted(new_modules))}")
+
+        limit = expected["page_ms"] * (1 + args.tolerance) + 25
+        if result["page_ms"] > limit:
+            regressions.append(f"{path} takes {result['page_ms']} ms to import, over the limit of {limit:.1f} ms")
+
+    for regression in regressions:
+        print(regression, file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Measures re-serializing a config after a single row is edited, reusing the encoded lines of the unchanged rows.
+
+Run from the repository root with ``python -m benchmarks.bench_incremental``.
+"""
+
+import argparse
+import dataclasses
+import json
+import time
+
+from benchmarks.synthetic import make_author_config, make_group_config, make_repo_config
+from utils import converters, models
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def edited_copy(row):
+    """
+    Returns a copy of the row with its first non-key field changed.
+    """
+
+    field = dataclasses.fields(row)[2].name
+    value = getattr(row, field)
+    edited = not value if isinstance(value, bool) else (value + ("edited",) if isinstance(value, tuple) else "edited")
+    return dataclasses.replace(row, **{field: edited})
+
+
+def edit(table: models.ConfigTable, row) -> bytes:
+    """
+    Replaces a row of the table and serializes the table again.
+    """
+
+    table.put(row)
+    return table.to_csv()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50000])
+    args = parser.parse_args()
+
+    cases = [
+        ("repo-config.csv", make_repo_config, models.RepoBranchConfig, converters.convert_repo_config_csv_to_csv),
+        ("author-config.csv", make_author_config, models.AuthorConfig, converters.convert_author_config_csv_to_csv),
+        ("group-config.csv", make_group_config, models.GroupConfig, converters.convert_group_config_csv_to_csv),
+    ]
+
+    for name, make, row_type, convert in cases:
+        for size in args.sizes:
+            repoinfo = make(size)
+            full_s, _ = timed(convert, repoinfo)
+            build_s, table = timed(models.ConfigTable.from_form, row_type, repoinfo)
+            initial_s, _ = timed(table.to_csv)
+            edit_s, edited = timed(edit, table, edited_copy(list(table)[size // 2]))
+
+            # the pages rebuild the rows from the form mapping on every rerun and sync them into their table
+            repoinfo = table.to_form()
+            sync_s, _ = timed(lambda: table.sync(models.rows_from_form(row_type, repoinfo)) or table.to_csv())
+
+            print(json.dumps({
+                "config": name,
+                "rows": size,
+                "full_convert_s": round(full_s, 4),
+                "table_build_s": round(build_s, 4),
+                "initial_serialize_s": round(initial_s, 4),
+                "single_row_edit_s": round(edit_s, 4),
+                "form_sync_s": round(sync_s, 4),
+                "identical": edited == convert(repoinfo),
+            }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Times the parsers used to import existing configs, and checks that they invert the converters.
+
+Run from the repository root with ``python -m benchmarks.bench_parsers``.
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import make_author_config, make_group_config, make_repo_config
+from utils import converters, parsers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    cases = [
+        ("repo-config.csv", make_repo_config, converters.convert_repo_config_csv_to_csv,
+         parsers.parse_repo_config_csv),
+        ("author-config.csv", make_author_config, converters.convert_author_config_csv_to_csv,
+         parsers.parse_author_config_csv),
+        ("group-config.csv", make_group_config, converters.convert_group_config_csv_to_csv,
+         parsers.parse_group_config_csv),
+    ]
+
+    for name, make, convert, parse in cases:
+        for size in args.sizes:
+            repoinfo = make(size)
+            data = convert(repoinfo)
+            start = time.perf_counter()
+            parsed = parse(data)
+            elapsed = time.perf_counter() - start
+            print(json.dumps({"config": name, "rows": size, "parse_s": round(elapsed, 4), "input_bytes": len(data),
+                              "round_trip": parsed == repoinfo}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures checking the reachability of many repositories, using local ``file://`` bare repositories.
+
+Run from the repository root with ``python -m benchmarks.bench_reachability``. Requires ``git``.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from utils import reachability
+
+
+def make_bare_repositories(base_dir: str, count: int) -> list[str]:
+    """
+    Creates bare repositories with a ``master`` and a ``dev`` branch, by copying a single template repository.
+
+    :return: file:// URLs of the repositories
+    """
+
+    work = os.path.join(base_dir, "work")
+    template = os.path.join(base_dir, "template.git")
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+
+    subprocess.run(git + ["init", "-q", "-b", "master", work], check=True)
+    subprocess.run(git + ["-C", work, "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    subprocess.run(git + ["-C", work, "branch", "dev"], check=True)
+    subprocess.run(git + ["clone", "-q", "--bare", work, template], check=True)
+
+    urls = []
+
+    for index in range(count):
+        path = os.path.join(base_dir, f"repo-{index}.git")
+        shutil.copytree(template, path)
+        urls.append(f"file://{path}")
+
+    return urls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=reachability.MAX_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        urls = make_bare_repositories(base_dir, args.repos)
+        # every tenth repository does not exist and every fifth branch is misspelt
+        repoinfo = {
+            (url + "-missing" if index % 10 == 0 else url): ["master", "devv" if index % 5 == 0 else "dev"]
+            for index, url in enumerate(urls)
+        }
+
+        checker = reachability.ReachabilityChecker(max_workers=args.workers)
+        start = time.perf_counter()
+        results = checker.check(repoinfo)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        checker.check(repoinfo)
+        cached = time.perf_counter() - start
+
+        print(json.dumps({
+            "repos": args.repos,
+            "workers": args.workers,
+            "cold_s": round(cold, 4),
+            "cached_s": round(cached, 4),
+            "ok_branches": sum(result.ok for branches in results.values() for result in branches.values()),
+            "failed_branches": sum(not result.ok for branches in results.values() for result in branches.values()),
+        }))
+
+
+if __name__ == "__main__":
+    main()
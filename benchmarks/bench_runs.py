@@ -0,0 +1,68 @@
+"""
+Measures the RepoSense run queue with a stub in place of RepoSense, which prints a progress line for every
+repository: the time from queueing the runs to finishing them all under different concurrency limits, and how many
+log lines per second are streamed from the runs.
+
+Run from the repository root with ``python -m benchmarks.bench_runs``.
+"""
+
+import argparse
+import json
+import shlex
+import sys
+import tempfile
+import time
+
+from utils import runs
+
+# prints a progress line for each of the repositories given as its first argument, sleeping between them
+STUB = """\
+import sys, time
+total, delay = int(sys.argv[1]), float(sys.argv[2])
+for index in range(1, total + 1):
+    print(f"Analyzing repository {index} ({index}/{total})", flush=True)
+    time.sleep(delay)
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--repos", type=int, default=2000, help="progress lines printed by each run")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds the stub sleeps after each line")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        stub = f"{base_dir}/stub.py"
+
+        with open(stub, "w", encoding="utf-8") as f:
+            f.write(STUB)
+
+        for concurrency in args.concurrency:
+            queue = runs.RunQueue(shlex.join([sys.executable, stub, str(args.repos), str(args.delay)]),
+                                  f"{base_dir}/runs-{concurrency}", max_concurrent=concurrency,
+                                  max_queued=args.runs, history=args.runs)
+            start = time.perf_counter()
+            queued = [queue.submit("bench", {"repo-config.csv": b"Repository's Location,Branch\n"})
+                      for _ in range(args.runs)]
+            submitted = time.perf_counter() - start
+
+            while any(run.record.status not in runs.FINISHED for run in queued):
+                time.sleep(0.01)
+
+            elapsed = time.perf_counter() - start
+            print(json.dumps({
+                "runs": args.runs,
+                "repos": args.repos,
+                "concurrency": concurrency,
+                "submit_ms": round(submitted / args.runs * 1000, 3),
+                "total_s": round(elapsed, 4),
+                "lines_per_s": round(args.runs * args.repos / elapsed),
+                "succeeded": sum(run.record.status == runs.SUCCEEDED for run in queued),
+                "progress": [run.progress for run in queued[:1]],
+            }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Benchmark suite timing the converters, the config archive, validation, the shared artifact cache and full reruns of
+every configurator page at scale.
+
+Run from the repository root with ``python -m benchmarks.bench_suite``. Each measurement is printed as one JSON
+object per line, and ``--output`` also writes all of them into a single JSON file, together with the versions of
+Python and Streamlit, so that runs can be compared over time. ``--only`` restricts the suite to some of its parts,
+e.g. ``--only converters archive`` skips the slower page reruns.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import make_author_config, make_config_json, make_group_config, make_repo_config
+from utils import consistency, converters, memory, validation
+from utils.grid import (AUTHOR_CONFIG_GRID, CONFIG_JSON_AUTHORS_GRID, GROUP_CONFIG_GRID, REPO_CONFIG_GRID, flatten,
+                        to_records, to_rows)
+from utils.utils import zip_files
+
+PARTS = ["converters", "archive", "validation", "cache", "pages"]
+
+# numbers of sessions storing the same config files in the shared artifact cache
+CACHE_SESSIONS = [10, 50]
+
+# page script, grid columns, synthetic generator and key of its per-repository count
+FORM_PAGES = {
+    "repo-config": ("pages/1_repo-config.csv Configurator.py", REPO_CONFIG_GRID, make_repo_config,
+                    "repo-config-branch-count"),
+    "author-config": ("pages/2_author-config.csv Configurator.py", AUTHOR_CONFIG_GRID, make_author_config,
+                      "repo-config-branch-count"),
+    "group-config": ("pages/3_group-config.csv Configurator.py", GROUP_CONFIG_GRID, make_group_config,
+                     "repo-config-group-count"),
+}
+REPORT_CONFIG_PAGE = "pages/4_report-config.json Configurator.py"
+CONFIG_JSON_PAGE = "pages/5_config.json Configurator.py"
+
+
+def timed(func, *args, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def make_inputs(rows: int) -> dict[str, object]:
+    """
+    Generates the form mappings of every config with the given number of rows.
+    """
+
+    return {
+        "repo-config.csv": make_repo_config(rows),
+        "author-config.csv": make_author_config(rows),
+        "group-config.csv": make_group_config(rows),
+        "report-config.json": {"title": f"Report of {rows} rows"},
+        "config.json": make_config_json(rows),
+    }
+
+
+CONVERTERS = {
+    "repo-config.csv": converters.convert_repo_config_csv_to_csv,
+    "author-config.csv": converters.convert_author_config_csv_to_csv,
+    "group-config.csv": converters.convert_group_config_csv_to_csv,
+    "report-config.json": converters.convert_report_config_json_to_json,
+    "config.json": converters.convert_config_json_to_json,
+}
+
+
+def bench_converters(sizes: list[int]):
+    for rows in sizes:
+        for name, repoinfo in make_inputs(rows).items():
+            elapsed, data = timed(CONVERTERS[name], repoinfo)
+            yield {"benchmark": "convert", "config": name, "rows": rows, "seconds": round(elapsed, 4),
+                   "output_bytes": len(data)}
+
+
+def bench_archive(sizes: list[int]):
+    for rows in sizes:
+        files = {name: CONVERTERS[name](repoinfo) for name, repoinfo in make_inputs(rows).items()}
+
+        for compression, level in [("stored", 0), ("deflate", 1), ("deflate", 6)]:
+            elapsed, archive = timed(zip_files, files, compression, level)
+
+            with archive:
+                size = archive.seek(0, 2)
+
+            yield {"benchmark": "zip_files", "rows": rows, "compression": compression, "level": level,
+                   "seconds": round(elapsed, 4), "archive_bytes": size,
+                   "input_bytes": sum(len(data) for data in files.values())}
+
+
+def bench_validation(sizes: list[int]):
+    for rows in sizes:
+        inputs = make_inputs(rows)
+
+        for page, (_, grid, _, _) in FORM_PAGES.items():
+            records = to_records(inputs[f"{page}.csv"], grid)
+            elapsed, errors = timed(validation.validate, page, records)
+            yield {"benchmark": "validate", "config": page, "rows": len(records), "seconds": round(elapsed, 4),
+                   "problems": len(errors)}
+
+        authors = list(inputs["config.json"]["authors"].values())
+        elapsed, errors = timed(validation.validate, "config-json-authors", authors)
+        yield {"benchmark": "validate", "config": "config-json-authors", "rows": len(authors),
+               "seconds": round(elapsed, 4), "problems": len(errors)}
+
+        elapsed, issues = timed(consistency.check_configs, inputs)
+        yield {"benchmark": "consistency", "rows": rows, "seconds": round(elapsed, 4), "issues": len(issues)}
+
+
+def bench_cache(sizes: list[int]):
+    for rows in sizes:
+        files = {name: CONVERTERS[name](repoinfo) for name, repoinfo in make_inputs(rows).items()}
+        files = {name: data if isinstance(data, bytes) else data.encode("utf-8") for name, data in files.items()}
+
+        for sessions in CACHE_SESSIONS:
+            cache = memory.ArtifactCache(budget=2 ** 62, session_budget=2 ** 62)
+            start = time.perf_counter()
+
+            for session in range(sessions):
+                for name, data in files.items():
+                    # every session converts its own copy of the config files, as the data cache returns copies
+                    cache.put(str(session), name, bytes(data))
+
+            elapsed = time.perf_counter() - start
+            usage = cache.usage()
+            yield {"benchmark": "artifact_cache", "rows": rows, "sessions": sessions,
+                   "seconds_per_session": round(elapsed / sessions, 4), "held_bytes": usage.size,
+                   "unshared_bytes": usage.size + usage.saved}
+
+
+def seed_form(at: AppTest, repoinfo: dict[str, dict[str, dict]], count_key: str, page_size: int):
+    """
+    Seeds the repository sections of a configurator page, as if the repositories and their branches had been entered.
+    """
+
+    at.session_state["repo-config-num-repo"] = len(repoinfo)
+
+    for reponumber, (repo_location, entries) in enumerate(repoinfo.items()):
+        at.session_state[f"{reponumber}repo_location"] = repo_location
+        at.session_state[f"{count_key}{reponumber}"] = len(entries)
+
+        for index, name in enumerate(entries):
+            at.session_state[f"{reponumber}{repo_location}{index}branch_name"] = name
+
+    for prefix in FORM_PAGES:
+        at.session_state[f"{prefix}-page-size"] = page_size
+
+
+def time_reruns(at: AppTest, repeat: int) -> dict[str, object]:
+    """
+    Times the first run of a page, which renders it from scratch, and the median of the following reruns.
+    """
+
+    first, _ = timed(at.run)
+    reruns = [timed(at.run)[0] for _ in range(repeat)]
+    return {
+        "first_run_s": round(first, 4),
+        "rerun_s": round(statistics.median(reruns), 4) if reruns else None,
+        "error": at.exception[0].value if at.exception else None,
+    }
+
+
+def bench_pages(num_repos: list[int], branches: list[int], page_size: int, repeat: int):
+    for num_repo in num_repos:
+        for branches_per_repo in branches:
+            for page, (path, grid, make, count_key) in FORM_PAGES.items():
+                repoinfo = make(num_repo * branches_per_repo, branches_per_repo)
+
+                at = AppTest.from_file(path, default_timeout=600)
+                seed_form(at, repoinfo, count_key, page_size)
+                yield {"benchmark": "page_rerun", "page": page, "mode": "form", "num_repo": num_repo,
+                       "branches": branches_per_repo, "page_size": page_size, **time_reruns(at, repeat)}
+
+                at = AppTest.from_file(path, default_timeout=600)
+                at.session_state[f"{page}-grid-mode"] = True
+                at.session_state[f"{page}-grid-rows"] = flatten(repoinfo, grid)
+                yield {"benchmark": "page_rerun", "page": page, "mode": "grid", "num_repo": num_repo,
+                       "branches": branches_per_repo, **time_reruns(at, repeat)}
+
+        authors = make_config_json(num_repo)["authors"]
+
+        at = AppTest.from_file(CONFIG_JSON_PAGE, default_timeout=600)
+        at.session_state["repo-config-num-repo"] = num_repo
+        yield {"benchmark": "page_rerun", "page": "config-json", "mode": "form", "num_repo": num_repo,
+               **time_reruns(at, repeat)}
+
+        at = AppTest.from_file(CONFIG_JSON_PAGE, default_timeout=600)
+        at.session_state["config-json-grid-mode"] = True
+        at.session_state["config-json-grid-rows"] = to_rows(authors.values(), CONFIG_JSON_AUTHORS_GRID)
+        yield {"benchmark": "page_rerun", "page": "config-json", "mode": "grid", "num_repo": num_repo,
+               **time_reruns(at, repeat)}
+
+    at = AppTest.from_file(REPORT_CONFIG_PAGE, default_timeout=600)
+    at.session_state["report-config-report-title"] = "Report"
+    yield {"benchmark": "page_rerun", "page": "report-config", "mode": "form", **time_reruns(at, repeat)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", nargs="+", choices=PARTS, default=PARTS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="rows of the converter and archive inputs")
+    parser.add_argument("--num-repos", type=int, nargs="+", default=[10, 100],
+                        help="repositories entered in the pages")
+    parser.add_argument("--branches", type=int, nargs="+", default=[1, 5],
+                        help="branches or groups of each repository entered in the pages")
+    parser.add_argument("--page-size", type=int, default=10, choices=[5, 10, 25, 50, 100],
+                        help="repositories shown per page of the configurators")
+    parser.add_argument("--repeat", type=int, default=3, help="reruns of each page to time")
+    parser.add_argument("--output", help="path of a JSON file to write all measurements to")
+    args = parser.parse_args()
+
+    parts = {
+        "converters": lambda: bench_converters(args.sizes),
+        "archive": lambda: bench_archive(args.sizes),
+        "validation": lambda: bench_validation(args.sizes),
+        "cache": lambda: bench_cache(args.sizes),
+        "pages": lambda: bench_pages(args.num_repos, args.branches, args.page_size, args.repeat),
+    }
+    results = []
+
+    for part in PARTS:
+        if part not in args.only:
+            continue
+
+        for result in parts[part]():
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "streamlit": streamlit.__version__,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic generators for the form mappings built by the configurator pages, used by the benchmarks.
+"""
+
+import random
+
+
+def make_repo_config(num_rows: int, branches_per_repo: int = 3, seed: int = 0) -> dict[str, dict[str, dict]]:
+    """
+    Generates a repo-config form mapping.
+
+    :param num_rows: Total number of repository/branch rows to generate
+    :param branches_per_repo: Number of branches for each repository
+    :param seed: Seed for the random number generator
+    :return: Mapping in the same shape as the repo-config page's form_returns
+    """
+
+    rng = random.Random(seed)
+    repoinfo = {}
+
+    for row in range(num_rows):
+        repo = f"https://github.com/org{row // branches_per_repo % 97}/repo-{row // branches_per_repo}.git"
+        repoinfo.setdefault(repo, {})[f"branch-{row % branches_per_repo}"] = {
+            "file_size_limits": rng.choice([0, 500000, 1000000]),
+            "file_fmts": rng.sample(["py", "java", "md", "ts", "c"], k=rng.randint(1, 3)),
+            "ignore_glob_lists": ["test/**", f"docs/{row}/**"],
+            "ignore_commits_list": [f"{rng.getrandbits(160):040x}", f"{rng.getrandbits(28):07x}..HEAD"],
+            "ignore_authors_list": [f"bot-{row % 13}", "Jane, \"JD\" Doe"],
+            "find_prev_authors": rng.random() < 0.5,
+            "ignore_standalone_configs": rng.random() < 0.5,
+            "shallow_cloning": rng.random() < 0.5,
+            "ignore_file_size_limits": rng.random() < 0.5,
+            "skip_ignored_file_analysis": rng.random() < 0.5,
+        }
+
+    return repoinfo
+
+
+def make_author_config(num_rows: int, branches_per_repo: int = 3, seed: int = 0) -> dict[str, dict[str, dict]]:
+    """
+    Generates an author-config form mapping.
+
+    :param num_rows: Total number of repository/branch rows to generate
+    :param branches_per_repo: Number of branches for each repository
+    :param seed: Seed for the random number generator
+    :return: Mapping in the same shape as the author-config page's form_returns
+    """
+
+    rng = random.Random(seed)
+    repoinfo = {}
+
+    for row in range(num_rows):
+        repo = f"https://github.com/org{row // branches_per_repo % 97}/repo-{row // branches_per_repo}.git"
+        author = f"user{rng.randint(0, num_rows)}"
+        repoinfo.setdefault(repo, {})[f"branch-{row % branches_per_repo}"] = {
+            "author_git_host_id": author,
+            "author_emails": [f"{author}@example.com", f"{author}@users.noreply.github.com"],
+            "author_display_name": f"{author.title()}, Ünïcode",
+            "git_author_name": [author, author.upper()],
+            "ignore_glob_lists": ["**.md"],
+        }
+
+    return repoinfo
+
+
+def make_group_config(num_rows: int, groups_per_repo: int = 3, seed: int = 0) -> dict[str, dict[str, dict]]:
+    """
+    Generates a group-config form mapping.
+
+    :param num_rows: Total number of repository/group rows to generate
+    :param groups_per_repo: Number of groups for each repository
+    :param seed: Seed for the random number generator
+    :return: Mapping in the same shape as the group-config page's form_returns
+    """
+
+    rng = random.Random(seed)
+    repoinfo = {}
+
+    for row in range(num_rows):
+        repo = f"https://github.com/org{row // groups_per_repo % 97}/repo-{row // groups_per_repo}.git"
+        repoinfo.setdefault(repo, {})[f"group-{row % groups_per_repo}"] = {
+            "glob_lists": rng.sample(["src/**", "test/**", "docs/**", "**.java", "**.py"], k=2),
+        }
+
+    return repoinfo
+
+
+def make_config_json(num_authors: int, seed: int = 0) -> dict:
+    """
+    Generates a config.json form mapping.
+
+    :param num_authors: Number of authors to generate
+    :param seed: Seed for the random number generator
+    :return: Mapping in the same shape as the config.json page's form_returns
+    """
+
+    rng = random.Random(seed)
+    authors = {}
+
+    for index in range(num_authors):
+        author = f"user{rng.randint(0, num_authors)}"
+        authors[index] = {
+            "gitId": author,
+            "emails": [f"{author}@example.com"],
+            "displayName": author.title(),
+            "authorNames": [author],
+            "ignoreGlobList": ["**.md"],
+        }
+
+    return {
+        "ignoreGlobList": ["docs/**"],
+        "formats": ["py", "java"],
+        "ignoreCommitList": [],
+        "ignoreAuthorList": ["bot"],
+        "authors": authors,
+    }
@@ -0,0 +1,139 @@
+# Headless entry point for generating RepoSense config files from a single manifest, without running Streamlit
+import argparse
+import json
+import os
+import sys
+
+from utils import consistency, converters
+
+
+def load_manifest(path: str) -> dict:
+    """
+    Loads a YAML or JSON manifest describing the configs to generate.
+
+    The manifest is keyed by output file name (e.g. ``repo-config.csv``), and each value takes the same shape as the
+    ``form_returns`` mapping built by the matching configurator page.
+
+    :param path: Path to the manifest; files ending in ``.yaml`` or ``.yml`` are parsed as YAML, the rest as JSON
+    :return: Manifest mapping
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("PyYAML is required to read YAML manifests; install it with `pip install pyyaml` "
+                                 "or provide a JSON manifest instead")
+
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            return yaml.load(f, Loader=loader) or {}
+
+        return json.load(f)
+
+
+def fill_defaults(repoinfo: dict[str, dict[str, dict]], defaults: dict) -> dict[str, dict[str, dict]]:
+    """
+    Fills in the fields omitted from a manifest section with the defaults used by the configurator pages.
+
+    The section is updated in place so that large manifests are not copied.
+
+    :param repoinfo: Mapping from repository to branch/group name to configurations
+    :param defaults: Default values of each field
+    :return: The same mapping, with all fields present
+    """
+
+    for repo, entries in repoinfo.items():
+        if entries is None:
+            repoinfo[repo] = entries = {}
+
+        for name, configs in entries.items():
+            if configs is None:
+                entries[name] = configs = {}
+
+            for field, value in defaults.items():
+                configs.setdefault(field, value)
+
+    return repoinfo
+
+
+def generate(manifest: dict, output_dir: str) -> list[str]:
+    """
+    Generates every config file described by the manifest into the output directory.
+
+    CSV files are streamed straight into their output files, one row at a time.
+
+    :param manifest: Manifest mapping, as returned by ``load_manifest``
+    :param output_dir: Directory to write the config files to
+    :return: Paths of the written files
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    csv_writers = {
+        "repo-config.csv": (converters.write_repo_config_csv, converters.REPO_CONFIG_DEFAULTS),
+        "author-config.csv": (converters.write_author_config_csv, converters.AUTHOR_CONFIG_DEFAULTS),
+        "group-config.csv": (converters.write_group_config_csv, converters.GROUP_CONFIG_DEFAULTS),
+    }
+    json_outputs = {}
+
+    if "report-config.json" in manifest:
+        json_outputs["report-config.json"] = converters.convert_report_config_json_to_json(
+            manifest["report-config.json"])
+
+    if "config.json" in manifest:
+        config = dict(manifest["config.json"])
+        authors = config.get("authors", [])
+        # the configurator page keys authors by their index, so mirror that for lists in the manifest
+        config["authors"] = dict(enumerate(authors)) if isinstance(authors, list) else authors
+        json_outputs["config.json"] = converters.convert_config_json_to_json(config)
+
+    written = []
+    for name, (writer, defaults) in csv_writers.items():
+        if name not in manifest:
+            continue
+
+        path = os.path.join(output_dir, name)
+        with open(path, "wb") as f:
+            writer(fill_defaults(manifest[name] or {}, defaults), f)
+
+        written.append(path)
+
+    for name, data in json_outputs.items():
+        path = os.path.join(output_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+
+        written.append(path)
+
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate RepoSense config files from a YAML/JSON manifest without starting the Streamlit app."
+    )
+    parser.add_argument("manifest", help="path to the YAML or JSON manifest")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory to write the config files to")
+    parser.add_argument("--strict", action="store_true",
+                        help="exit with an error when the configs are inconsistent with each other")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+
+    for path in generate(manifest, args.output_dir):
+        print(path)
+
+    config = manifest.get("config.json")
+    if config and isinstance(config.get("authors"), list):
+        config = {**config, "authors": dict(enumerate(config["authors"]))}
+
+    issues = consistency.check_configs({**manifest, "config.json": config})
+
+    for issue in issues:
+        print(f"{issue.severity}: {issue.config}: {issue.entry}: {issue.message}", file=sys.stderr)
+
+    return 1 if args.strict and any(issue.severity == consistency.ERROR for issue in issues) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,65 +1,110 @@
 import streamlit as st
 
-from streamlit_tags import st_tags
-from utils.utils import convert_repo_config_csv_to_csv, check_config_file_state, zip_files
+from utils.grid import REPO_CONFIG_GRID, flatten, from_rows, grid_editor, set_grid_rows, to_records, unflatten
+from utils.identity import RepoIndex, merge_repoinfo
+from utils.models import RepoBranchConfig, rows_from_form
+from utils.parsers import parse_repo_config_csv
+from utils.reachability import check_branch
+from utils.utils import (autosave_draft, convert_repo_config_csv_to_csv, finish_rerun, get_config_table,
+                         get_reachability_checker, profile_phase, render_commit_check, render_duplicates,
+                         render_glob_preview, render_sections, render_sidebar, render_validation_errors, restore_draft,
+                         save_config_file, start_rerun, validate_config)
+from utils.widgets import forget_widgets, kept, paginate, seed_tags, tags_input
 
 st.set_page_config(
     page_title="repo-config.csv",
     page_icon="⚙️",
 )
+start_rerun("repo-config")
 
 
 # define session states to be used
 if "form-submitted-repo-csv" not in st.session_state:
     st.session_state["form-submitted-repo-csv"] = False
 
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
 
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
-    )
+def is_complete(configs: dict) -> bool:
+    """
+    Checks if all the mandatory fields of a branch are filled in.
+    """
 
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+    return all(configs[field] for field in ["file_size_limits", "file_fmts", "ignore_glob_lists",
+                                            "ignore_commits_list", "ignore_authors_list"])
 
-st.header("RepoConfig")
-st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
-         "app up and running in no time!_")
-st.divider()
 
-st.subheader("`repo-config.csv` Configuration Wizard")
-st.write("Select the number of repositories to configure for and how many branches per repository!")
-st.warning("Using duplicate branch names will override the previous branch configurations!")
+def seed_form(repoinfo: dict[str, dict[str, dict]]):
+    """
+    Seeds the widgets of the form with the given configurations, before the widgets are rendered.
+    """
 
-st.write("#### Repo and Branch Configurations")
-num_repo = st.number_input(
-    "Select the number of repositories to include",
-    key="repo-config-num-repo",
-    min_value=1,
-)
+    forget_widgets()
+    st.session_state["repo-config-num-repo"] = max(len(repoinfo), 1)
+    # every branch is kept, including the incomplete ones, so they are validated like the rendered sections
+    st.session_state["repo-config-sections"] = {
+        reponumber: (repo_location, dict(branches))
+        for reponumber, (repo_location, branches) in enumerate(repoinfo.items())
+    }
+
+    for reponumber, (repo_location, branches) in enumerate(repoinfo.items()):
+        st.session_state[f"{reponumber}repo_location"] = repo_location
+        st.session_state[f"repo-config-branch-count{reponumber}"] = max(len(branches), 1)
+
+        for branch, (branch_name, configs) in enumerate(branches.items()):
+            branch_key = f"{reponumber}{repo_location}{branch}"
+            st.session_state[branch_key + "branch_name"] = branch_name
+
+            for field in ["find_prev_authors", "ignore_standalone_configs", "shallow_cloning",
+                          "ignore_file_size_limits", "skip_ignored_file_analysis", "file_size_limits"]:
+                st.session_state[branch_key + field] = configs[field]
+
+            for field in ["file_fmts", "ignore_glob_lists", "ignore_commits_list", "ignore_authors_list"]:
+                seed_tags(branch_key + field, configs[field])
 
-st.divider()
-form_returns: dict[str, dict[str, dict]] = {}
 
-for reponumber in range(num_repo):
+def toggle_grid_mode():
+    # carry the configurations over to the newly selected editing mode
+    repoinfo = st.session_state.get("repo-config-form-returns", {})
+
+    if st.session_state["repo-config-grid-mode"]:
+        set_grid_rows("repo-config-grid", flatten(repoinfo, REPO_CONFIG_GRID))
+    else:
+        seed_form(repoinfo)
+
+
+def render_check_result(repo_location: str, branch_name: str | None = None):
+    """
+    Shows whether a repository, or one of its branches, exists when the reachability checks are enabled.
+    """
+
+    if not st.session_state.get("repo-config-check") or not repo_location:
+        return
+
+    status = get_reachability_checker().check_locations([repo_location])[repo_location]
+    result = check_branch(status, branch_name)
+    st.caption(f":white_check_mark: {result.message}" if result.ok else f":x: :red[{result.message}]")
+
+
+def render_repository(reponumber: int) -> tuple[str, dict[str, dict]]:
+    """
+    Renders the widgets of a repository section.
+
+    :param reponumber: Index of the repository
+    :return: Tuple of the repository location and the configurations of its branches
+    """
+
     base_key = str(reponumber)  # defines the base key for all widgets to avoid key errors
 
     st.markdown(f"### Repository {reponumber + 1}")
-    repo_location = st.text_input(
+    repo_location = kept(
+        st.text_input,
         "Enter in the Remote Repo URL or Disk Path to the `git` repository",
         key=base_key + "repo_location",
         help=r"e.g. https://github.com/foo/bar.git or C:\Users\user\Desktop\GitHub\foo\bar" 
              "\n\nNote that Disk Path only works if the `git` repository is located in the same "
              "directory as this application!")
-    num_branches = st.number_input(
+    render_check_result(repo_location)
+    num_branches = kept(
+        st.number_input,
         label=f"Select the number of branches to include in this repository",
         key=f"repo-config-branch-count{reponumber}",
         min_value=1,
@@ -67,115 +112,251 @@ for reponumber in range(num_repo):
     )
 
     # create a new entry in the dict to for updates
+    branches = {}
     if repo_location and num_branches:
-        form_returns[repo_location] = {}
-
         for branch in range(num_branches):
             st.markdown(f"### Branch {branch + 1}")
             branch_base_key = repo_location + str(branch)  # defines the base key for all widgets in this branch
 
-            branch_name = st.text_input(
+            branch_name = kept(
+                st.text_input,
                 "Enter the name of your branch",
                 key=base_key + branch_base_key + "branch_name",
                 help="Branch to analyze in the target repository, e.g. `master`")
 
             if branch_name:
-                find_prev_authors = st.checkbox(
+                render_check_result(repo_location, branch_name)
+                find_prev_authors = kept(
+                    st.checkbox,
                     "Find Previous Authors?",
                     key=base_key + branch_base_key + "find_prev_authors",
                     value=False,
                     help="If enabled, RepoSense will utilize Git blame's ignore revisions functionality to "
                          "blame the line changes caused by commits in the ignore commit list to the previous "
                          "authors who altered those lines (if available)")
-                ignore_standalone_configs = st.checkbox(
+                ignore_standalone_configs = kept(
+                    st.checkbox,
                     "Ignore Standalone Configs?",
                     key=base_key + branch_base_key + "ignore_standalone_configs",
                     value=False,
                     help="If enabled, RepoSense will ignore the standalone config file (if any) in target "
                          "repository, else the standalone config file will take precedence over configurations "
                          "provided in the CSV files")
-                shallow_cloning = st.checkbox(
+                shallow_cloning = kept(
+                    st.checkbox,
                     "Shallow Cloning?",
                     key=base_key + branch_base_key + "shallow_cloning",
                     value=False,
                     help="If enabled, RepoSense will utilize Git' shallow clone functionality. This option may "
                          "reduce the time taken to clone repositories, but should be disabled for smaller "
                          "`.git` files of size < 500 MB due to overhead incurred")
-                ignore_file_size_limits = st.checkbox(
+                ignore_file_size_limits = kept(
+                    st.checkbox,
                     "Ignore File Size Limits?",
                     key=base_key + branch_base_key + "ignore_file_size_limits",
                     value=False,
                     help="If enabled, RepoSense will ignore both the default file size limit and file size "
                          "limits defined by the user in `repo-config.csv`")
-                skip_ignored_file_analysis = st.checkbox(
+                skip_ignored_file_analysis = kept(
+                    st.checkbox,
                     "Skip Ignored File Analysis?",
                     key=base_key + branch_base_key + "skip_ignored_file_analysis",
                     value=False,
                     help="If enabled, RepoSense will ignore analysis of files exceeding the file size "
                          "entirely. If skipped, all information about the file will be omitted from the "
                          "report [can possibly improve report generation time!]")
-                file_size_limits = st.number_input(
+                file_size_limits = kept(
+                    st.number_input,
                     "Enter a file size limit for the repository in **bytes**",
                     key=base_key + branch_base_key + "file_size_limits",
                     min_value=0,
                     value=500000,
                     help="Files exceeding the file size limit will be marked as ignored and only the file name "
                          "and line count will be reflected in the report")
-                file_fmts = st_tags(
+                file_fmts = tags_input(
                     label="Enter in file extensions to analyse",
                     key=base_key + branch_base_key + "file_fmts",
                     suggestions=["py", "java"],
                     text="Leave blank to analyse all file types...")
-                ignore_glob_lists = st_tags(
+                ignore_glob_lists = tags_input(
                     label="Enter in the list of file path globs to ignore during analysis for each author "
                           "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
                           "#glob) for more info on path glob syntax)",
                     text="e.g. test/**, temp/**...",
                     key=base_key + branch_base_key + "ignore_glob_lists")
-                ignore_commits_list = st_tags(
+                if ignore_glob_lists and st.toggle("Preview the ignored files",
+                                                   key=base_key + branch_base_key + "glob-preview",
+                                                   help="Matches the globs against the files of the branch of a "
+                                                        "repository on the disk"):
+                    render_glob_preview(repo_location, {"Ignored": [gl.strip() for gl in ignore_glob_lists]},
+                                        branch_name, unmatched_label="Files not ignored")
+                ignore_commits_list = tags_input(
                     label="Enter in the list of commit hashes (full or partial) to ignore during analysis",
                     key=base_key + branch_base_key + "ignore_commits_list",
                     text="Use .. to specify range of commits...")
-                ignore_authors_list = st_tags(
+                if ignore_commits_list and st.toggle("Check the ignored commits",
+                                                     key=base_key + branch_base_key + "commit-check",
+                                                     help="Resolves the commits against the branch of a repository "
+                                                          "on the disk"):
+                    render_commit_check(repo_location, branch_name, [cl.strip() for cl in ignore_commits_list],
+                                        base_key + branch_base_key + "ignore_commits_list")
+                ignore_authors_list = tags_input(
                     label="Enter in the list of authors to ignore during analysis, specified by "
                           "[Git Author Name](https://reposense.org/ug/configFiles.html#a-note-about-git-"
                           "author-name)",
                     key=base_key + branch_base_key + "ignore_authors_list",
                     text="e.g. long_Git_author-Name123...")
 
-                # write to return dict each branch
-                if all([branch_name, file_size_limits, file_fmts,
-                        ignore_glob_lists, ignore_commits_list, ignore_authors_list]):
-                    form_returns[repo_location][branch_name] = curr = {}
-                    # convert all file formats to lowercase for easier processing later
-                    curr["file_size_limits"] = file_size_limits
-                    curr["file_fmts"] = [ff.lower() for ff in file_fmts]
-                    curr["ignore_glob_lists"] = [gl.strip() for gl in ignore_glob_lists]
-                    curr["ignore_commits_list"] = [cl.strip() for cl in ignore_commits_list]
-                    curr["ignore_authors_list"] = [al.strip() for al in ignore_authors_list]
-                    curr["find_prev_authors"] = find_prev_authors
-                    curr["ignore_standalone_configs"] = ignore_standalone_configs
-                    curr["shallow_cloning"] = shallow_cloning
-                    curr["ignore_file_size_limits"] = ignore_file_size_limits
-                    curr["skip_ignored_file_analysis"] = skip_ignored_file_analysis
-
-    if reponumber != num_repo - 1:
-        st.divider()
+                # convert all file formats to lowercase for easier processing later
+                curr = {
+                    "file_size_limits": file_size_limits,
+                    "file_fmts": [ff.lower() for ff in file_fmts],
+                    "ignore_glob_lists": [gl.strip() for gl in ignore_glob_lists],
+                    "ignore_commits_list": [cl.strip() for cl in ignore_commits_list],
+                    "ignore_authors_list": [al.strip() for al in ignore_authors_list],
+                    "find_prev_authors": find_prev_authors,
+                    "ignore_standalone_configs": ignore_standalone_configs,
+                    "shallow_cloning": shallow_cloning,
+                    "ignore_file_size_limits": ignore_file_size_limits,
+                    "skip_ignored_file_analysis": skip_ignored_file_analysis,
+                }
+
+                # write to return dict each branch, including the incomplete ones to validate
+                branches[branch_name] = curr
+
+    return repo_location, branches
+
+
+render_sidebar()
+
+st.header("RepoConfig")
+st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
+         "app up and running in no time!_")
+st.divider()
+
+st.subheader("`repo-config.csv` Configuration Wizard")
+st.write("Select the number of repositories to configure for and how many branches per repository!")
+st.warning("Using duplicate branch names will override the previous branch configurations! The same "
+           "repository entered with different URLs, e.g. with and without `.git`, is merged into one.")
+
+draft = restore_draft("repo-config")
+if draft is not None:
+    # seed the widgets below with the draft before they are rendered
+    seed_form(draft)
+    set_grid_rows("repo-config-grid", flatten(draft, REPO_CONFIG_GRID))
+
+st.write("#### Import Existing Configurations")
+uploaded_config = st.file_uploader(
+    "Import an existing `repo-config.csv` to edit it here",
+    type="csv",
+    key="repo-config-import",
+    help="The imported repositories and branches replace the repositories and branches entered below"
+)
+
+if uploaded_config is not None and st.session_state.get("repo-config-imported") != uploaded_config.file_id:
+    try:
+        repo_index = RepoIndex()
+        imported = parse_repo_config_csv(uploaded_config, repo_index)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Unable to import `{uploaded_config.name}`: {e}")
+    else:
+        # seed the widgets below with the imported values before they are rendered
+        seed_form(imported)
+        set_grid_rows("repo-config-grid", flatten(imported, REPO_CONFIG_GRID))
+
+        st.session_state["repo-config-imported"] = uploaded_config.file_id
+        st.success(f"Imported {sum(map(len, imported.values()))} branches from {len(imported)} repositories!")
+        render_duplicates(repo_index.duplicates, "branches")
+
+st.write("#### Repo and Branch Configurations")
+grid_mode = st.toggle(
+    "Grid editing mode",
+    key="repo-config-grid-mode",
+    on_change=toggle_grid_mode,
+    help="Edit all branches as rows of a single table, which stays responsive with many repositories. Lists are "
+         "entered as `;`-separated values"
+)
+batched_mode = st.toggle(
+    "Batched section mode",
+    key="repo-config-batched-mode",
+    disabled=grid_mode,
+    help="Only reruns the repository being edited instead of the whole page, which keeps typing responsive with many "
+         "repositories. The rest of the page is updated when the configurations are created"
+)
+check_reachability = st.toggle(
+    "Check repositories and branches",
+    key="repo-config-check",
+    help="Runs `git ls-remote` on every repository to check that it and its branches exist. Private repositories "
+         "can only be checked if this server has access to them"
+)
+
+if grid_mode:
+    st.divider()
+    grid_rows = grid_editor("repo-config-grid", REPO_CONFIG_GRID)
+    repo_index = RepoIndex()
+    form_returns = unflatten(grid_rows, REPO_CONFIG_GRID, repo_index)
+
+    if check_reachability and form_returns:
+        with st.spinner("Checking repositories..."):
+            results = get_reachability_checker().check(form_returns)
+
+        st.dataframe(
+            [
+                {"Repository's Location": repo, "Branch": branch, "Status": ("✅ " if ok else "❌ ") + message}
+                for repo, branches in results.items()
+                for branch, (ok, message) in branches.items()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+else:
+    num_repo = st.number_input(
+        "Select the number of repositories to include",
+        key="repo-config-num-repo",
+        min_value=1,
+    )
+
+    # only the repositories on the current page are rendered, the rest keep their last rendered configurations
+    sections = st.session_state.setdefault("repo-config-sections", {})
+    visible = paginate("repo-config", num_repo, lambda index: sections.get(index, ("", {}))[0])
+
+    if check_reachability:
+        # check every repository at once, so that the sections below only read the cached results
+        with st.spinner("Checking repositories..."):
+            get_reachability_checker().check_locations(filter(None, (
+                st.session_state.get(f"{reponumber}repo_location") or sections.get(reponumber, ("", {}))[0]
+                for reponumber in range(num_repo)
+            )))
+
+    st.divider()
+    render_sections("repo-config", visible, render_repository, batched_mode)
+
+    # every entered branch, including the incomplete ones left out of the configurations, with the repositories
+    # entered more than once merged
+    repo_index = merge_repoinfo(sections[reponumber] for reponumber in range(num_repo)
+                                if sections.get(reponumber, ("", {}))[0])
+    entered = repo_index.repoinfo
+    form_returns: dict[str, dict[str, dict]] = {
+        repo_location: {name: configs for name, configs in branches.items() if is_complete(configs)}
+        for repo_location, branches in entered.items()
+    }
+
+render_duplicates(repo_index.duplicates)
+
+st.session_state["repo-config-form-returns"] = form_returns
+# the incomplete branches are saved too, so that the draft restores everything entered
+autosave_draft("repo-config", form_returns if grid_mode else entered)
 
 # if st.form_submit_button("Create RepoSense Configuration!"):
 if st.button("Create configurations!"):
+    records = from_rows(grid_rows, REPO_CONFIG_GRID) if grid_mode else to_records(entered, REPO_CONFIG_GRID)
     is_valid = True
-    if len(form_returns) < 1:
+    if len(records) < 1:
         is_valid = False
         st.error("Check your form and ensure that you fill in all mandatory fields for the repositories!")
 
-    for repo, branches in form_returns.items():
-        if len(branches) < 1:
-            is_valid = False
-
-    if not is_valid:
-        st.error("Check your inputs and ensure that you filled in all mandatory fields for the "
-                 "branches!")
+    # every branch is checked, including the incomplete ones that are left out of the configurations
+    is_valid = render_validation_errors(validate_config("repo-config", records)) and is_valid
 
     # set the result of the form validation as the indicator if the form is successfully submitted
     st.session_state["form-submitted-repo-csv"] = is_valid
@@ -183,13 +364,18 @@ if st.button("Create configurations!"):
 if st.session_state["form-submitted-repo-csv"]:
     st.success("Configurations created successfully!")
     st.write("### Preview")
-    st.json(form_returns)
-    st.session_state["configs"]["repo-config.csv"] = convert_repo_config_csv_to_csv(form_returns)
+    with profile_phase("preview"):
+        st.json(form_returns)
+    table = get_config_table("repo-config", RepoBranchConfig)
+    table.sync(rows_from_form(RepoBranchConfig, form_returns))
+    config_file = save_config_file("repo-config.csv", convert_repo_config_csv_to_csv(table))
 
     st.download_button(
         label="Download Configurations",
         key="repo-config-internal-download-button",
-        data=st.session_state["configs"]["repo-config.csv"],
+        data=config_file,
         mime="text/csv",
         file_name='repo-config.csv'
     )
+
+finish_rerun()
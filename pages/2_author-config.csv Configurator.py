@@ -1,65 +1,172 @@
 import streamlit as st
 
-from streamlit_tags import st_tags
-from utils.utils import convert_author_config_csv_to_csv, check_config_file_state, zip_files
+from utils.discovery import AuthorProposal
+from utils.grid import AUTHOR_CONFIG_GRID, flatten, from_rows, grid_editor, set_grid_rows, to_records, unflatten
+from utils.identity import RepoIndex, merge_repoinfo, unique_emails
+from utils.models import AuthorConfig, rows_from_form
+from utils.parsers import parse_author_config_csv
+from utils.reachability import is_remote
+from utils.utils import (autosave_draft, convert_author_config_csv_to_csv, finish_rerun, get_config_table,
+                         profile_phase, render_author_discovery, render_duplicates, render_sections, render_sidebar,
+                         render_validation_errors, restore_draft, save_config_file, start_rerun, validate_config)
+from utils.widgets import forget_widgets, kept, paginate, seed_tags, seed_widget, tags_input, widget_value
 
 st.set_page_config(
     page_title="author-config.csv",
     page_icon="⚙️",
 )
+start_rerun("author-config")
 
 
 # define session states to be used
 if "form-submitted-author-csv" not in st.session_state:
     st.session_state["form-submitted-author-csv"] = False
 
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
 
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
-    )
+def is_complete(configs: dict) -> bool:
+    """
+    Checks if all the mandatory fields of a branch are filled in.
+    """
 
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+    return all(configs[field] for field in ["author_git_host_id", "author_emails", "author_display_name",
+                                            "git_author_name", "ignore_glob_lists"])
 
-st.header("RepoConfig")
-st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
-         "app up and running in no time!_")
-st.divider()
 
-st.subheader("`author-config.csv` Configuration Wizard")
-st.write("Select the number of repositories to configure for and how many branches per repository!")
-st.warning("Using duplicate branch names will override the previous branch configurations!")
+def seed_form(repoinfo: dict[str, dict[str, dict]]):
+    """
+    Seeds the widgets of the form with the given configurations, before the widgets are rendered.
+    """
 
-st.write("#### Repo and Branch Configurations")
-num_repo = st.number_input(
-    "Select the number of repositories to include",
-    key="repo-config-num-repo",
-    min_value=1,
-)
+    forget_widgets()
+    st.session_state["repo-config-num-repo"] = max(len(repoinfo), 1)
+    # every branch is kept, including the incomplete ones, so they are validated like the rendered sections
+    st.session_state["author-config-sections"] = {
+        reponumber: (repo_location, dict(branches))
+        for reponumber, (repo_location, branches) in enumerate(repoinfo.items())
+    }
 
-st.divider()
-form_returns: dict[str, dict[str, dict]] = {}
+    for reponumber, (repo_location, branches) in enumerate(repoinfo.items()):
+        st.session_state[f"{reponumber}repo_location"] = repo_location
+        st.session_state[f"repo-config-branch-count{reponumber}"] = max(len(branches), 1)
+
+        for branch, (branch_name, configs) in enumerate(branches.items()):
+            branch_key = f"{reponumber}{repo_location}{branch}"
+            st.session_state[branch_key + "branch_name"] = branch_name
+
+            for field in ["author_git_host_id", "author_display_name"]:
+                st.session_state[branch_key + field] = configs[field]
+
+            for field in ["author_emails", "git_author_name", "ignore_glob_lists"]:
+                seed_tags(branch_key + field, configs[field])
+
+
+def toggle_grid_mode():
+    # carry the configurations over to the newly selected editing mode
+    repoinfo = st.session_state.get("author-config-form-returns", {})
+
+    if st.session_state["author-config-grid-mode"]:
+        set_grid_rows("author-config-grid", flatten(repoinfo, AUTHOR_CONFIG_GRID))
+    else:
+        seed_form(repoinfo)
+
+
+def find_slot(values: list[str], value: str) -> int:
+    """
+    Returns the index of a value, or else the index of the first empty value, or else the index after the last value.
+    """
+
+    if value in values:
+        return values.index(value)
+
+    return values.index("") if "" in values else len(values)
+
+
+def scan_targets() -> list[tuple[str, str]]:
+    """
+    Returns the repositories on the disk entered in the form together with their branches, for author discovery.
+    """
+
+    if st.session_state.get("author-config-grid-mode"):
+        return [(repo, branch) for repo, branches in st.session_state.get("author-config-form-returns", {}).items()
+                if not is_remote(repo) for branch in branches]
+
+    targets = []
+
+    for reponumber in range(st.session_state.get("repo-config-num-repo", 1)):
+        repo_location = widget_value(f"{reponumber}repo_location")
+
+        if repo_location and not is_remote(repo_location):
+            num_branches = widget_value(f"repo-config-branch-count{reponumber}", 1)
+            branches = [widget_value(f"{reponumber}{repo_location}{branch}branch_name")
+                        for branch in range(num_branches)]
+            targets.extend((repo_location, branch) for branch in dict.fromkeys(filter(None, branches)) or [""])
+
+    return targets
+
+
+def add_discovered_authors(selected: list[tuple[str, str, AuthorProposal]]):
+    """
+    Fills in the selected discovered authors, adding the repositories and branches that are not in the form yet.
+
+    Each branch has a single author, so the last selected author of a branch replaces the others.
+    """
+
+    if st.session_state.get("author-config-grid-mode"):
+        repoinfo = {repo: dict(branches)
+                    for repo, branches in st.session_state.get("author-config-form-returns", {}).items()}
+
+        for repo, branch, proposal in selected:
+            previous = repoinfo.setdefault(repo, {}).get(branch)
+            repoinfo[repo][branch] = proposal.to_author_config(previous["ignore_glob_lists"] if previous else None)
+
+        set_grid_rows("author-config-grid", flatten(repoinfo, AUTHOR_CONFIG_GRID))
+        return
+
+    num_repo = st.session_state.get("repo-config-num-repo", 1)
+
+    for repo, branch, proposal in selected:
+        reponumber = find_slot([widget_value(f"{index}repo_location", "") for index in range(num_repo)], repo)
+        num_repo = max(num_repo, reponumber + 1)
+        seed_widget(f"{reponumber}repo_location", repo)
+
+        num_branches = widget_value(f"repo-config-branch-count{reponumber}", 1)
+        branch_names = [widget_value(f"{reponumber}{repo}{index}branch_name", "") for index in range(num_branches)]
+        branch_number = find_slot(branch_names, branch)
+        seed_widget(f"repo-config-branch-count{reponumber}", max(num_branches, branch_number + 1))
+
+        branch_key = f"{reponumber}{repo}{branch_number}"
+        configs = proposal.to_author_config()
+        seed_widget(branch_key + "branch_name", branch)
+
+        for field in ["author_git_host_id", "author_display_name"]:
+            seed_widget(branch_key + field, configs[field])
+
+        for field in ["author_emails", "git_author_name"]:
+            seed_tags(branch_key + field, configs[field])
+
+    st.session_state["repo-config-num-repo"] = num_repo
+
+
+def render_repository(reponumber: int) -> tuple[str, dict[str, dict]]:
+    """
+    Renders the widgets of a repository section.
+
+    :param reponumber: Index of the repository
+    :return: Tuple of the repository location and the configurations of its branches
+    """
 
-for reponumber in range(num_repo):
     base_key = str(reponumber)  # defines the base key for all widgets to avoid key errors
 
     st.markdown(f"### Repository {reponumber + 1}")
-    repo_location = st.text_input(
+    repo_location = kept(
+        st.text_input,
         "Enter in the Remote Repo URL or Disk Path to the `git` repository",
         key=base_key + "repo_location",
         help=r"e.g. https://github.com/foo/bar.git or C:\Users\user\Desktop\GitHub\foo\bar" 
              "\n\nNote that Disk Path only works if the `git` repository is located in the same "
              "directory as this application!")
-    num_branches = st.number_input(
+    num_branches = kept(
+        st.number_input,
         label=f"Select the number of branches to include in this repository",
         key=f"repo-config-branch-count{reponumber}",
         min_value=1,
@@ -67,72 +174,171 @@ for reponumber in range(num_repo):
     )
 
     # create a new entry in the dict to for updates
+    branches = {}
     if repo_location and num_branches:
-        form_returns[repo_location] = {}
-
         for branch in range(num_branches):
             st.markdown(f"### Branch {branch + 1}")
             branch_base_key = repo_location + str(branch)  # defines the base key for all widgets in this branch
 
-            branch_name = st.text_input(
+            branch_name = kept(
+                st.text_input,
                 "Enter the name of your branch",
                 key=base_key + branch_base_key + "branch_name",
                 help="Branch to analyze in the target repository, e.g. `master`")
 
             if branch_name:
-                author_git_host_id = st.text_input(
+                author_git_host_id = kept(
+                    st.text_input,
                     label="Enter in the Author's Git Host ID",
                     key=base_key + branch_base_key + "author_git_host_id",
                     help="Username of the target author's profile on GitHub, GitLab or Bitbucket, e.g. `JohnDoe`"
                 )
-                author_display_name = st.text_input(
+                author_display_name = kept(
+                    st.text_input,
                     label="Enter the name of the author's display name",
                     key=base_key + branch_base_key + "author_display_name",
                     help="The name to display for the author; defaults to author's username"
                 )
-                author_emails = st_tags(
+                author_emails = tags_input(
                     label="Enter in the email(s) associated with an author",
                     key=base_key + branch_base_key + "author_emails"
                 )
-                git_author_name = st_tags(
+                git_author_name = tags_input(
                     label="Enter in the `git` author name(s)",
                     key=base_key + branch_base_key + "git_author_name"
                 )
-                ignore_glob_lists = st_tags(
+                ignore_glob_lists = tags_input(
                     label="Enter in the list of file path globs to ignore during analysis for each author "
                           "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
                           "#glob) for more info on path glob syntax)",
                     text="e.g. test/**, temp/**...",
                     key=base_key + branch_base_key + "ignore_glob_lists")
 
-                # write to return dict each branch
-                if all([branch_name, author_git_host_id, author_emails,
-                        author_display_name, git_author_name, ignore_glob_lists]):
-                    form_returns[repo_location][branch_name] = curr = {}
-                    # convert all file formats to lowercase for easier processing later
-                    curr["author_git_host_id"] = author_git_host_id
-                    curr["author_emails"] = [ae.strip() for ae in author_emails]
-                    curr["author_display_name"] = author_display_name
-                    curr["git_author_name"] = [an.strip() for an in git_author_name]
-                    curr["ignore_glob_lists"] = [gl.lower() for gl in ignore_glob_lists]
+                # convert all file formats to lowercase for easier processing later
+                curr = {
+                    "author_git_host_id": author_git_host_id,
+                    "author_emails": unique_emails(author_emails),
+                    "author_display_name": author_display_name,
+                    "git_author_name": [an.strip() for an in git_author_name],
+                    "ignore_glob_lists": [gl.lower() for gl in ignore_glob_lists],
+                }
+
+                # write to return dict each branch, including the incomplete ones to validate
+                branches[branch_name] = curr
+
+    return repo_location, branches
+
+
+render_sidebar()
+
+st.header("RepoConfig")
+st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
+         "app up and running in no time!_")
+st.divider()
+
+st.subheader("`author-config.csv` Configuration Wizard")
+st.write("Select the number of repositories to configure for and how many branches per repository!")
+st.warning("Using duplicate branch names will override the previous branch configurations! The same "
+           "repository entered with different URLs, e.g. with and without `.git`, is merged into one.")
+
+draft = restore_draft("author-config")
+if draft is not None:
+    # seed the widgets below with the draft before they are rendered
+    seed_form(draft)
+    set_grid_rows("author-config-grid", flatten(draft, AUTHOR_CONFIG_GRID))
 
-    if reponumber != num_repo - 1:
-        st.divider()
+st.write("#### Import Existing Configurations")
+uploaded_config = st.file_uploader(
+    "Import an existing `author-config.csv` to edit it here",
+    type="csv",
+    key="author-config-import",
+    help="The imported repositories and branches replace the repositories and branches entered below"
+)
+
+if uploaded_config is not None and st.session_state.get("author-config-imported") != uploaded_config.file_id:
+    try:
+        repo_index = RepoIndex()
+        imported = parse_author_config_csv(uploaded_config, repo_index)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Unable to import `{uploaded_config.name}`: {e}")
+    else:
+        # seed the widgets below with the imported values before they are rendered
+        seed_form(imported)
+        set_grid_rows("author-config-grid", flatten(imported, AUTHOR_CONFIG_GRID))
+
+        st.session_state["author-config-imported"] = uploaded_config.file_id
+        st.success(f"Imported {sum(map(len, imported.values()))} branches from {len(imported)} repositories!")
+
+        # the configurator holds a single author per branch, so every later author of a branch replaces the earlier
+        dropped = sum(1 for duplicate in repo_index.duplicates if duplicate.key)
+        if dropped:
+            st.warning(f"Dropped {dropped} rows of `{uploaded_config.name}`: only the last author of each repository "
+                       f"and branch was imported, as the configurator holds a single author per branch.")
+        render_duplicates([duplicate for duplicate in repo_index.duplicates if not duplicate.key], "branches")
+
+render_author_discovery("author-config", scan_targets(), add_discovered_authors)
+
+st.write("#### Repo and Branch Configurations")
+grid_mode = st.toggle(
+    "Grid editing mode",
+    key="author-config-grid-mode",
+    on_change=toggle_grid_mode,
+    help="Edit all branches as rows of a single table, which stays responsive with many repositories. Lists are "
+         "entered as `;`-separated values"
+)
+batched_mode = st.toggle(
+    "Batched section mode",
+    key="author-config-batched-mode",
+    disabled=grid_mode,
+    help="Only reruns the repository being edited instead of the whole page, which keeps typing responsive with many "
+         "repositories. The rest of the page is updated when the configurations are created"
+)
+
+if grid_mode:
+    st.divider()
+    grid_rows = grid_editor("author-config-grid", AUTHOR_CONFIG_GRID)
+    repo_index = RepoIndex()
+    form_returns = unflatten(grid_rows, AUTHOR_CONFIG_GRID, repo_index)
+else:
+    num_repo = st.number_input(
+        "Select the number of repositories to include",
+        key="repo-config-num-repo",
+        min_value=1,
+    )
+
+    # only the repositories on the current page are rendered, the rest keep their last rendered configurations
+    sections = st.session_state.setdefault("author-config-sections", {})
+    visible = paginate("author-config", num_repo, lambda index: sections.get(index, ("", {}))[0])
+
+    st.divider()
+    render_sections("author-config", visible, render_repository, batched_mode)
+
+    # every entered branch, including the incomplete ones left out of the configurations, with the repositories
+    # entered more than once merged
+    repo_index = merge_repoinfo(sections[reponumber] for reponumber in range(num_repo)
+                                if sections.get(reponumber, ("", {}))[0])
+    entered = repo_index.repoinfo
+    form_returns: dict[str, dict[str, dict]] = {
+        repo_location: {name: configs for name, configs in branches.items() if is_complete(configs)}
+        for repo_location, branches in entered.items()
+    }
+
+render_duplicates(repo_index.duplicates)
+
+st.session_state["author-config-form-returns"] = form_returns
+# the incomplete branches are saved too, so that the draft restores everything entered
+autosave_draft("author-config", form_returns if grid_mode else entered)
 
 # if st.form_submit_button("Create RepoSense Configuration!"):
 if st.button("Create configurations!"):
+    records = from_rows(grid_rows, AUTHOR_CONFIG_GRID) if grid_mode else to_records(entered, AUTHOR_CONFIG_GRID)
     is_valid = True
-    if len(form_returns) < 1:
+    if len(records) < 1:
         is_valid = False
         st.error("Check your form and ensure that you fill in all mandatory fields for the repositories!")
 
-    for repo, branches in form_returns.items():
-        if len(branches) < 1:
-            is_valid = False
-
-    if not is_valid:
-        st.error("Check your inputs and ensure that you filled in all mandatory fields for the "
-                 "branches!")
+    # every branch is checked, including the incomplete ones that are left out of the configurations
+    is_valid = render_validation_errors(validate_config("author-config", records)) and is_valid
 
     # set the result of the form validation as the indicator if the form is successfully submitted
     st.session_state["form-submitted-author-csv"] = is_valid
@@ -140,13 +346,18 @@ if st.button("Create configurations!"):
 if st.session_state["form-submitted-author-csv"]:
     st.success("Configurations created successfully!")
     st.write("### Preview")
-    st.json(form_returns)
-    st.session_state["configs"]["author-config.csv"] = convert_author_config_csv_to_csv(form_returns)
+    with profile_phase("preview"):
+        st.json(form_returns)
+    table = get_config_table("author-config", AuthorConfig)
+    table.sync(rows_from_form(AuthorConfig, form_returns))
+    config_file = save_config_file("author-config.csv", convert_author_config_csv_to_csv(table))
 
     st.download_button(
         label="Download Configurations",
         key="repo-config-internal-download-button",
-        data=st.session_state["configs"]["author-config.csv"],
+        data=config_file,
         mime="text/csv",
         file_name='author-config.csv'
     )
+
+finish_rerun()
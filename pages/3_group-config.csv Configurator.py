@@ -1,65 +1,78 @@
 import streamlit as st
 
-from streamlit_tags import st_tags
-from utils.utils import convert_group_config_csv_to_csv, check_config_file_state, zip_files
+from utils.grid import GROUP_CONFIG_GRID, flatten, from_rows, grid_editor, set_grid_rows, to_records, unflatten
+from utils.identity import RepoIndex, merge_repoinfo
+from utils.models import GroupConfig, rows_from_form
+from utils.parsers import parse_group_config_csv
+from utils.utils import (autosave_draft, convert_group_config_csv_to_csv, finish_rerun, get_config_table, profile_phase,
+                         render_duplicates, render_glob_preview, render_sections, render_sidebar,
+                         render_validation_errors, restore_draft, save_config_file, start_rerun, validate_config)
+from utils.widgets import forget_widgets, kept, paginate, seed_tags, tags_input
 
 st.set_page_config(
     page_title="group-config.csv",
     page_icon="⚙️",
 )
+start_rerun("group-config")
 
 
 # define session states to be used
 if "form-submitted-group-csv" not in st.session_state:
     st.session_state["form-submitted-group-csv"] = False
 
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
 
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
-    )
+def seed_form(repoinfo: dict[str, dict[str, dict]]):
+    """
+    Seeds the widgets of the form with the given configurations, before the widgets are rendered.
+    """
 
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+    forget_widgets()
+    st.session_state["repo-config-num-repo"] = max(len(repoinfo), 1)
+    st.session_state["group-config-sections"] = {
+        reponumber: (repo_location, groups)
+        for reponumber, (repo_location, groups) in enumerate(repoinfo.items())
+    }
 
-st.header("RepoConfig")
-st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
-         "app up and running in no time!_")
-st.divider()
+    for reponumber, (repo_location, groups) in enumerate(repoinfo.items()):
+        st.session_state[f"{reponumber}repo_location"] = repo_location
+        st.session_state[f"repo-config-group-count{reponumber}"] = max(len(groups), 1)
 
-st.subheader("`group-config.csv` Configuration Wizard")
-st.write("Select the number of repositories to configure for and how many branches per repository!")
-st.warning("Using duplicate branch names will override the previous branch configurations!")
+        for group_num, (group_name, configs) in enumerate(groups.items()):
+            group_key = f"{reponumber}{repo_location}{group_num}"
+            st.session_state[group_key + "branch_name"] = group_name
+            seed_tags(group_key + "ignore_glob_lists", configs["glob_lists"])
 
-st.write("#### Repo and Branch Configurations")
-num_repo = st.number_input(
-    "Select the number of repositories to include",
-    key="repo-config-num-repo",
-    min_value=1,
-)
 
-st.divider()
-form_returns: dict[str, dict[str, dict]] = {}
+def toggle_grid_mode():
+    # carry the configurations over to the newly selected editing mode
+    repoinfo = st.session_state.get("group-config-form-returns", {})
+
+    if st.session_state["group-config-grid-mode"]:
+        set_grid_rows("group-config-grid", flatten(repoinfo, GROUP_CONFIG_GRID))
+    else:
+        seed_form(repoinfo)
+
+
+def render_repository(reponumber: int) -> tuple[str, dict[str, dict]]:
+    """
+    Renders the widgets of a repository section.
+
+    :param reponumber: Index of the repository
+    :return: Tuple of the repository location and the configurations of its groups
+    """
 
-for reponumber in range(num_repo):
     base_key = str(reponumber)  # defines the base key for all widgets to avoid key errors
 
     st.markdown(f"### Repository {reponumber + 1}")
-    repo_location = st.text_input(
+    repo_location = kept(
+        st.text_input,
         "Enter in the Remote Repo URL or Disk Path to the `git` repository",
         key=base_key + "repo_location",
         help=r"e.g. https://github.com/foo/bar.git or C:\Users\user\Desktop\GitHub\foo\bar" 
              "\n\nNote that Disk Path only works if the `git` repository is located in the same "
              "directory as this application!")
-    num_groups = st.number_input(
+    num_groups = kept(
+        st.number_input,
         label=f"Select the number of groups in this repository",
         key=f"repo-config-group-count{reponumber}",
         min_value=1,
@@ -67,20 +80,20 @@ for reponumber in range(num_repo):
     )
 
     # create a new entry in the dict to for updates
+    groups = {}
     if repo_location and num_groups:
-        form_returns[repo_location] = {}
-
         for group_num in range(num_groups):
             st.markdown(f"### Group {group_num + 1}")
             group_key = repo_location + str(group_num)  # defines the base key for all widgets in this branch
 
-            group_name = st.text_input(
+            group_name = kept(
+                st.text_input,
                 "Enter the name of the group",
                 key=base_key + group_key + "branch_name",
                 help="Branch to analyze in the target repository, e.g. `master`")
 
             if group_name:
-                glob_lists = st_tags(
+                glob_lists = tags_input(
                     label="Enter in the list of file path globs to include for this group "
                           "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
                           "#glob) for more info on path glob syntax)",
@@ -88,27 +101,114 @@ for reponumber in range(num_repo):
                     key=base_key + group_key + "ignore_glob_lists")
 
                 # write to return dict each branch
-                form_returns[repo_location][group_name] = curr = {}
+                groups[group_name] = curr = {}
                 # convert all file formats to lowercase for easier processing later
                 curr["glob_lists"] = [gl.strip() for gl in glob_lists]
 
-    if reponumber != num_repo - 1:
-        st.divider()
+        if groups and st.toggle("Preview the files matched by the groups", key=base_key + "glob-preview",
+                                help="Matches the globs against the files of the checked out branch of a "
+                                     "repository on the disk"):
+            render_glob_preview(repo_location, {name: configs["glob_lists"] for name, configs in groups.items()},
+                                unmatched_label="Files in no group")
+
+    return repo_location, groups
+
+
+render_sidebar()
+
+st.header("RepoConfig")
+st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
+         "app up and running in no time!_")
+st.divider()
+
+st.subheader("`group-config.csv` Configuration Wizard")
+st.write("Select the number of repositories to configure for and how many branches per repository!")
+st.warning("Using duplicate group names will override the previous group configurations! The same "
+           "repository entered with different URLs, e.g. with and without `.git`, is merged into one.")
+
+draft = restore_draft("group-config")
+if draft is not None:
+    # seed the widgets below with the draft before they are rendered
+    seed_form(draft)
+    set_grid_rows("group-config-grid", flatten(draft, GROUP_CONFIG_GRID))
+
+st.write("#### Import Existing Configurations")
+uploaded_config = st.file_uploader(
+    "Import an existing `group-config.csv` to edit it here",
+    type="csv",
+    key="group-config-import",
+    help="The imported repositories and groups replace the repositories and groups entered below"
+)
+
+if uploaded_config is not None and st.session_state.get("group-config-imported") != uploaded_config.file_id:
+    try:
+        repo_index = RepoIndex()
+        imported = parse_group_config_csv(uploaded_config, repo_index)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Unable to import `{uploaded_config.name}`: {e}")
+    else:
+        # seed the widgets below with the imported values before they are rendered
+        seed_form(imported)
+        set_grid_rows("group-config-grid", flatten(imported, GROUP_CONFIG_GRID))
+
+        st.session_state["group-config-imported"] = uploaded_config.file_id
+        st.success(f"Imported {sum(map(len, imported.values()))} groups from {len(imported)} repositories!")
+        render_duplicates(repo_index.duplicates, "groups")
+
+st.write("#### Repo and Branch Configurations")
+grid_mode = st.toggle(
+    "Grid editing mode",
+    key="group-config-grid-mode",
+    on_change=toggle_grid_mode,
+    help="Edit all groups as rows of a single table, which stays responsive with many repositories. Lists are "
+         "entered as `;`-separated values"
+)
+batched_mode = st.toggle(
+    "Batched section mode",
+    key="group-config-batched-mode",
+    disabled=grid_mode,
+    help="Only reruns the repository being edited instead of the whole page, which keeps typing responsive with many "
+         "repositories. The rest of the page is updated when the configurations are created"
+)
+
+if grid_mode:
+    st.divider()
+    grid_rows = grid_editor("group-config-grid", GROUP_CONFIG_GRID)
+    repo_index = RepoIndex()
+    form_returns = unflatten(grid_rows, GROUP_CONFIG_GRID, repo_index)
+else:
+    num_repo = st.number_input(
+        "Select the number of repositories to include",
+        key="repo-config-num-repo",
+        min_value=1,
+    )
+
+    # only the repositories on the current page are rendered, the rest keep their last rendered configurations
+    sections = st.session_state.setdefault("group-config-sections", {})
+    visible = paginate("group-config", num_repo, lambda index: sections.get(index, ("", {}))[0])
+
+    st.divider()
+    render_sections("group-config", visible, render_repository, batched_mode)
+
+    # the repositories entered more than once are merged
+    repo_index = merge_repoinfo(sections[reponumber] for reponumber in range(num_repo)
+                                if sections.get(reponumber, ("", {}))[0])
+    form_returns = repo_index.repoinfo
+
+render_duplicates(repo_index.duplicates, "groups")
+
+st.session_state["group-config-form-returns"] = form_returns
+autosave_draft("group-config", form_returns)
 
 # if st.form_submit_button("Create RepoSense Configuration!"):
 if st.button("Create configurations!"):
+    records = from_rows(grid_rows, GROUP_CONFIG_GRID) if grid_mode else to_records(form_returns, GROUP_CONFIG_GRID)
     is_valid = True
-    if len(form_returns) < 1:
+    if len(records) < 1:
         is_valid = False
         st.error("Check your form and ensure that you fill in all mandatory fields for the repositories!")
 
-    for repo, groups in form_returns.items():
-        if len(groups) < 1:
-            is_valid = False
-
-    if not is_valid:
-        st.error("Check your inputs and ensure that you filled in all mandatory fields for the "
-                 "branches!")
+    is_valid = render_validation_errors(validate_config("group-config", records)) and is_valid
 
     # set the result of the form validation as the indicator if the form is successfully submitted
     st.session_state["form-submitted-group-csv"] = is_valid
@@ -116,13 +216,18 @@ if st.button("Create configurations!"):
 if st.session_state["form-submitted-group-csv"]:
     st.success("Configurations created successfully!")
     st.write("### Preview")
-    st.json(form_returns)
-    st.session_state["configs"]["group-config.csv"] = convert_group_config_csv_to_csv(form_returns)
+    with profile_phase("preview"):
+        st.json(form_returns)
+    table = get_config_table("group-config", GroupConfig)
+    table.sync(rows_from_form(GroupConfig, form_returns))
+    config_file = save_config_file("group-config.csv", convert_group_config_csv_to_csv(table))
 
     st.download_button(
         label="Download Configurations",
         key="repo-config-internal-download-button",
-        data=st.session_state["configs"]["group-config.csv"],
+        data=config_file,
         mime="text/csv",
         file_name='group-config.csv'
     )
+
+finish_rerun()
@@ -1,33 +1,23 @@
 import streamlit as st
 
-from utils.utils import convert_report_config_json_to_json, check_config_file_state, zip_files
+from utils.models import ReportConfig
+from utils.parsers import parse_report_config_json
+from utils.utils import (autosave_draft, convert_report_config_json_to_json, finish_rerun, profile_phase,
+                         render_sidebar, render_validation_errors, restore_draft, save_config_file, start_rerun,
+                         validate_config)
 
 st.set_page_config(
     page_title="report-config.json",
     page_icon="⚙️",
 )
+start_rerun("report-config")
 
 
 # define session states to be used
 if "form-submitted-report-json" not in st.session_state:
     st.session_state["form-submitted-report-json"] = False
 
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
-
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
-    )
-
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+render_sidebar()
 
 st.header("RepoConfig")
 st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
@@ -37,6 +27,28 @@ st.divider()
 st.subheader("`report-config.json` Configuration Wizard")
 st.write("Enter in the following details to create a `report-config.json` config!")
 
+draft = restore_draft("report-config")
+if draft is not None:
+    # seed the widget below with the draft before it is rendered
+    st.session_state["report-config-report-title"] = draft["title"]
+
+st.write("#### Import Existing Configurations")
+uploaded_config = st.file_uploader(
+    "Import an existing `report-config.json` to edit it here",
+    type="json",
+    key="report-config-import"
+)
+
+if uploaded_config is not None and st.session_state.get("report-config-imported") != uploaded_config.file_id:
+    try:
+        imported = parse_report_config_json(uploaded_config)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Unable to import `{uploaded_config.name}`: {e}")
+    else:
+        # seed the widgets below with the imported values before they are rendered
+        st.session_state["report-config-report-title"] = imported["title"]
+        st.session_state["report-config-imported"] = uploaded_config.file_id
+
 st.write("#### Repo and Branch Configurations")
 report_title = st.text_input(
     "Enter in the report title",
@@ -45,21 +57,11 @@ report_title = st.text_input(
 )
 
 form_returns = {"title": report_title}
+autosave_draft("report-config", form_returns)
 
 # if st.form_submit_button("Create RepoSense Configuration!"):
 if st.button("Create configurations!"):
-    is_valid = True
-
-    if not report_title or len(report_title) < 1:
-        is_valid = False
-
-    if not is_valid:
-        st.error("Check your inputs and ensure that you filled in all mandatory fields for the "
-                 "branches!")
-
-    form_returns = {
-        "title": report_title
-    }
+    is_valid = render_validation_errors(validate_config("report-config", [form_returns]))
 
     # set the result of the form validation as the indicator if the form is successfully submitted
     st.session_state["form-submitted-report-json"] = is_valid
@@ -67,13 +69,17 @@ if st.button("Create configurations!"):
 if st.session_state["form-submitted-report-json"]:
     st.success("Configurations created successfully!")
     st.write("### Preview")
-    st.json(form_returns)
-    st.session_state["configs"]["report-config.json"] = convert_report_config_json_to_json(form_returns)
+    with profile_phase("preview"):
+        st.json(form_returns)
+    config_file = save_config_file("report-config.json",
+                                   convert_report_config_json_to_json(ReportConfig.from_form(form_returns)))
 
     st.download_button(
         label="Download Configurations",
         key="repo-config-internal-download-button",
-        data=st.session_state["configs"]["report-config.json"],
+        data=config_file,
         mime="application/octet-stream",
         file_name='report-config.json'
     )
+
+finish_rerun()
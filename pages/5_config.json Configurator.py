@@ -1,34 +1,144 @@
 import streamlit as st
 
-from streamlit_tags import st_tags
-from utils.utils import convert_config_json_to_json, check_config_file_state, zip_files
+from utils.discovery import AuthorProposal
+from utils.grid import CONFIG_JSON_AUTHORS_GRID, from_rows, grid_editor, set_grid_rows, to_rows
+from utils.identity import unique_emails
+from utils.parsers import parse_config_json
+from utils.utils import (autosave_draft, convert_config_json_to_json, finish_rerun, profile_phase,
+                         render_author_discovery, render_sections, render_sidebar, render_validation_errors,
+                         restore_draft, save_config_file, start_rerun, validate_config)
+from utils.widgets import seed_tags, tags_input
 
 st.set_page_config(
     page_title="repo-config.csv",
     page_icon="⚙️",
 )
+start_rerun("config-json")
 
 
 # define session states to be used
 if "form-submitted-config-json" not in st.session_state:
     st.session_state["form-submitted-config-json"] = False
 
-if "configs" not in st.session_state:
-    st.session_state["configs"] = {}
 
-with st.sidebar:
-    st.write("## Download Config Files")
-    st.download_button(
-        on_click=lambda: check_config_file_state(st.session_state["configs"]),
-        label="Download Config Files",
-        data=zip_files(st.session_state["configs"]),
-        mime="application/octet-stream",
-        file_name="configs.zip",
-        key="config-file-download"
+def is_complete(configs: dict) -> bool:
+    """
+    Checks if all the mandatory fields of an author are filled in.
+    """
+
+    return all(configs[field] for field in ["gitId", "emails", "displayName", "authorNames", "ignoreGlobList"])
+
+
+def seed_form(config: dict):
+    """
+    Seeds the widgets of the form with the given configurations, before the widgets are rendered.
+    """
+
+    seed_tags("ignore_glob_lists", config["ignoreGlobList"])
+    seed_tags("file_fmts", config["formats"])
+    seed_tags("ignore_commits_list", config["ignoreCommitList"])
+    seed_tags("ignore_authors_list", config["ignoreAuthorList"])
+    st.session_state["repo-config-num-repo"] = max(len(config["authors"]), 1)
+
+    for author, configs in enumerate(config["authors"].values()):
+        st.session_state[f"{author}author_git_host_id"] = configs["gitId"]
+        st.session_state[f"{author}author_display_name"] = configs["displayName"]
+        seed_tags(f"{author}author_emails", configs["emails"])
+        seed_tags(f"{author}git_author_name", configs["authorNames"])
+        seed_tags(f"{author}ignore_glob_lists", configs["ignoreGlobList"])
+
+
+def toggle_grid_mode():
+    # carry the configurations over to the newly selected editing mode
+    config = st.session_state.get("config-json-form-returns")
+
+    if st.session_state["config-json-grid-mode"]:
+        authors = config["authors"].values() if config else []
+        set_grid_rows("config-json-grid", to_rows(authors, CONFIG_JSON_AUTHORS_GRID))
+    elif config:
+        seed_form(config)
+
+
+def add_discovered_authors(selected: list[tuple[str, str, AuthorProposal]]):
+    """
+    Adds the selected discovered authors after the authors in the form, skipping authors already in the form.
+    """
+
+    config = st.session_state.get("config-json-form-returns")
+
+    if st.session_state.get("config-json-grid-mode"):
+        authors = list(config["authors"].values()) if config else []
+        git_ids = {author["gitId"] for author in authors}
+        authors.extend(proposal.to_config_json() for _, _, proposal in selected if proposal.git_host_id not in git_ids)
+        set_grid_rows("config-json-grid", to_rows(authors, CONFIG_JSON_AUTHORS_GRID))
+        return
+
+    num_authors = st.session_state.get("repo-config-num-repo", 1)
+    git_ids = [st.session_state.get(f"{author}author_git_host_id", "") for author in range(num_authors)]
+    # fill in the empty authors at the end of the form before adding new ones
+    while git_ids and not git_ids[-1]:
+        git_ids.pop()
+
+    for _, _, proposal in selected:
+        if proposal.git_host_id in git_ids:
+            continue
+
+        author = len(git_ids)
+        git_ids.append(proposal.git_host_id)
+        st.session_state[f"{author}author_git_host_id"] = proposal.git_host_id
+        st.session_state[f"{author}author_display_name"] = proposal.display_name
+        seed_tags(f"{author}author_emails", list(proposal.emails))
+        seed_tags(f"{author}git_author_name", list(proposal.git_author_names))
+
+    st.session_state["repo-config-num-repo"] = max(num_authors, len(git_ids))
+
+
+def render_author(author: int) -> dict:
+    """
+    Renders the widgets of an author section.
+
+    :param author: Index of the author
+    :return: Configurations of the author, including the mandatory fields that are not filled in
+    """
+
+    base_key = str(author)  # defines the base key for all widgets to avoid key errors
+
+    st.markdown(f"### Author {author + 1}")
+    author_git_host_id = st.text_input(
+        label="Enter in the Author's Git Host ID",
+        key=base_key + "author_git_host_id",
+        help="Username of the target author's profile on GitHub, GitLab or Bitbucket, e.g. `JohnDoe`"
     )
+    author_display_name = st.text_input(
+        label="Enter the name of the author's display name",
+        key=base_key + "author_display_name",
+        help="The name to display for the author; defaults to author's username"
+    )
+    author_emails = tags_input(
+        label="Enter in the email(s) associated with an author",
+        key=base_key + "author_emails"
+    )
+    git_author_name = tags_input(
+        label="Enter in the `git` author name(s)",
+        key=base_key + "git_author_name"
+    )
+    ignore_glob_lists = tags_input(
+        label="Enter in the list of file path globs to ignore during analysis for each author "
+              "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
+              "#glob) for more info on path glob syntax)",
+        text="e.g. test/**, temp/**...",
+        key=base_key + "ignore_glob_lists")
 
-    st.write("## Export as RepoSense Scaffold")
-    st.button("Export...")
+    return {
+        "gitId": author_git_host_id,
+        "emails": unique_emails(author_emails),
+        "displayName": author_display_name,
+        "authorNames": [an.strip() for an in git_author_name],
+        "ignoreGlobList": [gl.lower() for gl in ignore_glob_lists],
+    }
+
+
+render_sidebar()
 
 st.header("RepoConfig")
 st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
@@ -37,99 +147,117 @@ st.divider()
 
 st.subheader("`config.json` Configuration Wizard")
 st.write("Enter in the following details to get started!")
+
+draft = restore_draft("config-json")
+if draft is not None:
+    # seed the widgets below with the draft before they are rendered
+    seed_form(draft)
+    set_grid_rows("config-json-grid", to_rows(draft["authors"].values(), CONFIG_JSON_AUTHORS_GRID))
+
+st.write("#### Import Existing Configurations")
+uploaded_config = st.file_uploader(
+    "Import an existing `config.json` to edit it here",
+    type="json",
+    key="config-json-import",
+    help="The imported settings and authors replace the settings and authors entered below"
+)
+
+if uploaded_config is not None and st.session_state.get("config-json-imported") != uploaded_config.file_id:
+    try:
+        imported = parse_config_json(uploaded_config)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Unable to import `{uploaded_config.name}`: {e}")
+    else:
+        # seed the widgets below with the imported values before they are rendered
+        seed_form(imported)
+        set_grid_rows("config-json-grid", to_rows(imported["authors"].values(), CONFIG_JSON_AUTHORS_GRID))
+
+        st.session_state["config-json-imported"] = uploaded_config.file_id
+        st.success(f"Imported {len(imported['authors'])} authors!")
+
+render_author_discovery("config-json", [], add_discovered_authors)
+
 st.write("#### Repo and Branch Configurations")
 
-ignore_glob_lists = st_tags(
+ignore_glob_lists = tags_input(
     label="Enter in the list of file path globs to ignore during analysis for each author "
           "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
           "#glob) for more info on path glob syntax)",
     text="e.g. test/**, temp/**...",
     key="ignore_glob_lists")
-file_fmts = st_tags(
+file_fmts = tags_input(
     label="Enter in file extensions to analyse",
     key="file_fmts",
     suggestions=["py", "java"],
     text="Leave blank to analyse all file types...")
-ignore_commits_list = st_tags(
+ignore_commits_list = tags_input(
     label="Enter in the list of commit hashes (full or partial) to ignore during analysis",
     key="ignore_commits_list",
     text="Use .. to specify range of commits...")
-ignore_authors_list = st_tags(
+ignore_authors_list = tags_input(
     label="Enter in the list of authors to ignore during analysis, specified by "
           "[Git Author Name](https://reposense.org/ug/configFiles.html#a-note-about-git-"
           "author-name)",
     key="ignore_authors_list",
     text="e.g. long_Git_author-Name123...")
-num_authors = st.number_input(
-    "Select the number of repositories to include",
-    key="repo-config-num-repo",
-    min_value=1,
-)
 
 form_returns: dict = {
     "ignoreGlobList": [gl.strip() for gl in ignore_glob_lists],
     "formats": [ff.lower().strip() for ff in file_fmts],
     "ignoreCommitList": [cl.strip() for cl in ignore_commits_list],
     "ignoreAuthorList": [al.strip() for al in ignore_authors_list],
+    "authors": {},
 }
 
-for author in range(num_authors):
-    base_key = str(author)  # defines the base key for all widgets to avoid key errors
+grid_mode = st.toggle(
+    "Grid editing mode",
+    key="config-json-grid-mode",
+    on_change=toggle_grid_mode,
+    help="Edit all authors as rows of a single table, which stays responsive with many authors. Lists are entered as "
+         "`;`-separated values"
+)
+batched_mode = st.toggle(
+    "Batched section mode",
+    key="config-json-batched-mode",
+    disabled=grid_mode,
+    help="Only reruns the author being edited instead of the whole page, which keeps typing responsive with many "
+         "authors. The rest of the page is updated when the configurations are created"
+)
 
-    st.markdown(f"### Author {author + 1}")
-    author_git_host_id = st.text_input(
-        label="Enter in the Author's Git Host ID",
-        key=base_key + "author_git_host_id",
-        help="Username of the target author's profile on GitHub, GitLab or Bitbucket, e.g. `JohnDoe`"
+if grid_mode:
+    # every entered author, including the incomplete ones left out of the configurations
+    entered = from_rows(grid_editor("config-json-grid", CONFIG_JSON_AUTHORS_GRID), CONFIG_JSON_AUTHORS_GRID)
+    form_returns["authors"] = dict(enumerate(author for author in entered if author["gitId"]))
+else:
+    num_authors = st.number_input(
+        "Select the number of repositories to include",
+        key="repo-config-num-repo",
+        min_value=1,
     )
-    author_display_name = st.text_input(
-        label="Enter the name of the author's display name",
-        key=base_key + "author_display_name",
-        help="The name to display for the author; defaults to author's username"
-    )
-    author_emails = st_tags(
-        label="Enter in the email(s) associated with an author",
-        key=base_key + "author_emails"
-    )
-    git_author_name = st_tags(
-        label="Enter in the `git` author name(s)",
-        key=base_key + "git_author_name"
-    )
-    ignore_glob_lists = st_tags(
-        label="Enter in the list of file path globs to ignore during analysis for each author "
-              "(Refer to [this](https://docs.oracle.com/javase/tutorial/essential/io/fileOps.html"
-              "#glob) for more info on path glob syntax)",
-        text="e.g. test/**, temp/**...",
-        key=base_key + "ignore_glob_lists")
 
-    # write to return dict each branch
-    if all([file_fmts, ignore_glob_lists, ignore_commits_list, ignore_authors_list, author_git_host_id,
-            author_display_name, author_emails, git_author_name, ignore_glob_lists]):
-        form_returns["authors"] = {}
-        form_returns["authors"][author] = curr = {}
-        curr["gitId"] = author_git_host_id
-        curr["emails"] = [ae.strip() for ae in author_emails]
-        curr["displayName"] = author_display_name
-        curr["authorNames"] = [an.strip() for an in git_author_name]
-        curr["ignoreGlobList"] = [gl.lower() for gl in ignore_glob_lists]
+    render_sections("config-json", list(range(num_authors)), render_author, batched_mode)
+
+    sections = st.session_state["config-json-sections"]
+    entered = [sections[author] for author in range(num_authors) if author in sections]
+
+    # the ignore lists of the whole config are mandatory for every author
+    if all([file_fmts, ignore_commits_list, ignore_authors_list]):
+        form_returns["authors"] = {author: configs for author, configs in enumerate(entered) if is_complete(configs)}
 
-    if author != num_authors - 1:
-        st.divider()
+st.session_state["config-json-form-returns"] = form_returns
+# the incomplete authors are saved too, so that the draft restores everything entered
+autosave_draft("config-json", {**form_returns, "authors": dict(enumerate(entered))})
 
 # if st.form_submit_button("Create RepoSense Configuration!"):
 if st.button("Create configurations!"):
     is_valid = True
-    if len(form_returns) < 1:
+    if len(entered) < 1:
         is_valid = False
-        st.error("Check your form and ensure that you fill in all mandatory fields for the repositories!")
+        st.error("Check your form and ensure that you fill in all mandatory fields for the authors!")
 
-    for repo, branches in form_returns.items():
-        if len(branches) < 1:
-            is_valid = False
-
-    if not is_valid:
-        st.error("Check your inputs and ensure that you filled in all mandatory fields for the "
-                 "branches!")
+    # every author is checked, including the incomplete ones that are left out of the configurations
+    errors = validate_config("config-json", [form_returns]) + validate_config("config-json-authors", entered)
+    is_valid = render_validation_errors(errors) and is_valid
 
     # set the result of the form validation as the indicator if the form is successfully submitted
     st.session_state["form-submitted-config-json"] = is_valid
@@ -137,13 +265,16 @@ if st.button("Create configurations!"):
 if st.session_state["form-submitted-config-json"]:
     st.success("Configurations created successfully!")
     st.write("### Preview")
-    st.json(form_returns)
-    st.session_state["configs"]["config.json"] = convert_config_json_to_json(form_returns)
+    with profile_phase("preview"):
+        st.json(form_returns)
+    config_file = save_config_file("config.json", convert_config_json_to_json(form_returns))
 
     st.download_button(
         label="Download Configurations",
         key="repo-config-internal-download-button",
-        data=st.session_state["configs"]["config.json"],
+        data=config_file,
         mime="application/octet-stream",
         file_name='config.json'
     )
+
+finish_rerun()
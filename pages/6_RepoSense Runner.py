@@ -0,0 +1,156 @@
+import shlex
+import time
+
+import streamlit as st
+
+from utils import runs
+from utils.utils import finish_rerun, get_config_files, get_draft_id, get_run_queue, render_sidebar, start_rerun
+
+st.set_page_config(
+    page_title="RepoSense Runner",
+    page_icon="🚀",
+)
+start_rerun("reposense-runner")
+
+# most log lines shown for each run
+LOG_LINES = 200
+
+
+def format_time(timestamp: float | None) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp is not None else "-"
+
+
+def format_duration(seconds: float | None) -> str:
+    return f"{seconds:.1f} s" if seconds is not None else "-"
+
+
+def queue_run(configs: dict[str, bytes], args: str):
+    """
+    Queues a run of RepoSense on the config files of the session, with the extra arguments entered.
+    """
+
+    try:
+        run = get_run_queue().submit(get_draft_id(), configs, shlex.split(args))
+    except ValueError as e:
+        st.error(f"Unable to read the RepoSense options: {e}")
+    except runs.RunQueueFull as e:
+        st.error(f"Unable to queue the run: {e}")
+    else:
+        st.session_state["reposense-runner-shown"] = run.id
+        st.success(f"Queued run `{run.id}`!")
+
+
+def render_active_run(run: runs.Run):
+    """
+    Shows the progress and the latest log lines of a queued or running run.
+    """
+
+    record = run.record
+    st.write(f"**`{run.id}`** is {record.status}, queued at {format_time(record.submitted)}")
+
+    if record.status == runs.RUNNING:
+        done, total = run.progress or (0, 0)
+        st.progress(done / total if total else 0.0,
+                    text=f"{done} of {total} ({format_duration(record.duration)})" if total else
+                    f"Starting ({format_duration(record.duration)})")
+        st.code("\n".join(run.tail(LOG_LINES)) or " ", language="text")
+
+    st.button("Cancel", key=f"reposense-runner-cancel-{run.id}", on_click=get_run_queue().cancel,
+              args=(run.id, get_draft_id()))
+
+
+def render_runs():
+    """
+    Shows the queued and running runs, and the history of the finished runs of the draft, refreshed while any of them
+    is unfinished.
+    """
+
+    queue = get_run_queue()
+    draft = get_draft_id()
+    history = queue.runs(draft)
+    active = [run for run in history if run.record.status not in runs.FINISHED]
+
+    st.write("#### Queued and Running")
+    if not active:
+        st.caption("No runs are queued or running.")
+
+    for run in reversed(active):
+        render_active_run(run)
+
+    st.write("#### History")
+    finished = [run for run in history if run.record.status in runs.FINISHED]
+
+    if not finished:
+        st.caption("No runs have finished yet.")
+        return
+
+    st.dataframe(
+        [
+            {
+                "Run": run.id,
+                "Status": ("✅ " if run.record.status == runs.SUCCEEDED else "❌ ") + run.record.status,
+                "Queued": format_time(run.record.submitted),
+                "Duration": format_duration(run.record.duration),
+                "Exit Code": run.record.returncode,
+                "Options": shlex.join(run.record.args),
+                "Message": run.record.message,
+            }
+            for run in finished
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    ids = [run.id for run in finished]
+    shown = st.session_state.get("reposense-runner-shown")
+    run_id = st.selectbox("Show the log of the run", ids, index=ids.index(shown) if shown in ids else 0,
+                          key="reposense-runner-log")
+    run = queue.get(run_id, draft)
+
+    if run is not None:
+        st.code("\n".join(run.tail(LOG_LINES)) or " ", language="text")
+
+        if run.record.status == runs.SUCCEEDED:
+            st.caption(f"The report is in `{run.reports_dir}`")
+
+
+render_sidebar()
+
+st.header("RepoConfig")
+st.write("_Your one-stop shop for creating RepoSense configurations and scaffolding to get your RepoSense "
+         "app up and running in no time!_")
+st.divider()
+
+st.subheader("RepoSense Runner")
+st.write("Queue RepoSense runs on the config files created in this session, and follow their progress here! Runs are "
+         "kept with the draft they were queued from, and only shown to the link of that draft.")
+st.caption(f"Runs `{shlex.join(get_run_queue().command)} --config configs --output reports`, at most "
+           f"{get_run_queue().max_concurrent} at a time.")
+
+configs = get_config_files()
+
+if configs:
+    st.write("Config files: " + ", ".join(f"`{name}`" for name in configs))
+else:
+    st.info("Create config files in the Configurators first, to run RepoSense on them!")
+
+run_args = st.text_input(
+    "Enter in any other RepoSense options",
+    key="reposense-runner-args",
+    placeholder="e.g. --since 01/01/2024 --until 31/12/2024",
+    help="[RepoSense options](https://reposense.org/ug/cli.html), by their long names: "
+         f"{', '.join(f'`{option}`' for option in runs.ALLOWED_OPTIONS)}. The config files and the output are set to "
+         "the directories of the run"
+)
+
+if st.button("Queue run", key="reposense-runner-queue", disabled=not configs):
+    queue_run(configs, run_args)
+
+st.divider()
+
+# the runs are refreshed on their own, without rerunning the page, while any run is unfinished
+unfinished = any(run.record.status not in runs.FINISHED
+                 for run in get_run_queue().runs(get_draft_id()))
+st.experimental_fragment(render_runs, run_every=runs.RUN_REFRESH if unfinished else None)()
+
+finish_rerun()
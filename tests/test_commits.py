@@ -0,0 +1,46 @@
+import shutil
+import subprocess
+
+import pytest
+
+from utils import commits
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+
+
+@pytest.fixture
+def repo(tmp_path) -> str:
+    path = str(tmp_path / "repo")
+    subprocess.run(["git", "init", "-q", "-b", "master", path], check=True)
+
+    for _ in range(3):
+        subprocess.run(["git", "-C", path, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit",
+                        "-q", "--allow-empty", "-m", "commit"], check=True)
+
+    return path
+
+
+def history(repo: str) -> list[str]:
+    return subprocess.run(["git", "-C", repo, "rev-list", "--reverse", "HEAD"], capture_output=True, text=True,
+                          check=True).stdout.split()
+
+
+def test_validate_entries(repo):
+    first, second, third = history(repo)
+    checks = commits.CommitValidator().validate(repo, "master", [second[:7], f"{first}..{third}", "0000000"],
+                                                expand=True)
+
+    assert checks[second[:7]].ok
+    assert checks[f"{first}..{third}"].commits == (third, second)
+    assert not checks["0000000"].ok
+
+
+@pytest.mark.parametrize("branch", ["--output=/tmp/x", "-h", "a..b", "a b"])
+def test_resolve_head_rejects_invalid_branches(repo, branch):
+    with pytest.raises(commits.CommitError, match="not a valid branch name"):
+        commits.resolve_head(repo, branch)
+
+
+def test_resolve_head_of_missing_branch(repo):
+    with pytest.raises(commits.CommitError, match="does not exist"):
+        commits.resolve_head(repo, "missing")
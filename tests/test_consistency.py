@@ -0,0 +1,97 @@
+import json
+
+from utils import consistency
+from utils.consistency import ERROR, WARNING, Issue
+
+REPO_CONFIG = ("Repository's Location,Branch,Ignore Authors List\n"
+               "https://github.com/foo/bar,master,bot\n"
+               "https://github.com/foo/bar,dev,\n")
+AUTHOR_HEADER = "Repository's Location,Branch,Author's Git Host ID,Author's Emails,Author's Display Name\n"
+GROUP_HEADER = "Repository's Location,Group Name,Globs\n"
+
+
+def check(files: dict[str, str]) -> list[Issue]:
+    return consistency.check_configs(consistency.parse_config_files(files))
+
+
+def test_consistent_configs():
+    assert check({
+        "repo-config.csv": REPO_CONFIG,
+        "author-config.csv": AUTHOR_HEADER + "https://github.com/foo/bar,master,alice,alice@example.com,Alice\n"
+                                             "https://github.com/foo/bar,,bob,bob@example.com,Bob\n",
+        "group-config.csv": GROUP_HEADER + "https://github.com/foo/bar,code,src/**\n",
+        "config.json": json.dumps({"authors": [{"gitId": "alice", "displayName": "Alice"}]}),
+    }) == []
+
+
+def test_configs_are_only_checked_against_present_configs():
+    assert check({"author-config.csv": AUTHOR_HEADER + "https://github.com/foo/baz,master,alice,,\n",
+                  "group-config.csv": GROUP_HEADER + "https://github.com/foo/baz,code,src/**\n"}) == []
+
+
+def test_unknown_repositories_and_branches():
+    issues = check({
+        "repo-config.csv": REPO_CONFIG,
+        "author-config.csv": AUTHOR_HEADER + "https://github.com/foo/baz,master,alice,,\n"
+                                             "https://github.com/foo/bar,release,alice,,\n",
+        "group-config.csv": GROUP_HEADER + "https://github.com/foo/baz,code,src/**\n",
+    })
+
+    assert issues == [
+        Issue(ERROR, "author-config.csv", "https://github.com/foo/baz",
+              "Repository is not in repo-config.csv, so it is not analysed"),
+        Issue(ERROR, "author-config.csv", "https://github.com/foo/bar / release",
+              "Branch `release` is not in repo-config.csv for this repository, so it is not analysed"),
+        Issue(ERROR, "group-config.csv", "https://github.com/foo/baz",
+              "Repository is not in repo-config.csv, so it is not analysed"),
+    ]
+
+
+def test_repository_entered_with_another_location():
+    issues = check({"repo-config.csv": REPO_CONFIG,
+                    "group-config.csv": GROUP_HEADER + "https://github.com/Foo/bar.git,code,src/**\n"})
+
+    assert issues == [Issue(ERROR, "group-config.csv", "https://github.com/Foo/bar.git",
+                            "Repository is entered as `https://github.com/foo/bar` in repo-config.csv, which RepoSense "
+                            "treats as a different repository")]
+
+
+def test_author_conflicts():
+    issues = check({
+        "repo-config.csv": REPO_CONFIG,
+        "author-config.csv": AUTHOR_HEADER + "https://github.com/foo/bar,master,alice,alice@example.com,\n"
+                                             "https://github.com/foo/bar,dev,bob,Alice@Example.com,\n"
+                                             "https://github.com/foo/bar,,bot,,\n",
+    })
+
+    assert issues == [
+        Issue(ERROR, "author-config.csv", "https://github.com/foo/bar / dev",
+              "Email `Alice@Example.com` of `bob` is also an email of `alice` in this repository"),
+        # an author without a branch is ignored if any branch ignores it
+        Issue(WARNING, "author-config.csv", "https://github.com/foo/bar",
+              "Author `bot` is ignored by the Ignore Authors List of repo-config.csv as `bot`"),
+    ]
+
+
+def test_config_json_conflicts():
+    config = {"ignoreAuthorList": ["carol"], "authors": [
+        {"gitId": "alice", "emails": ["alice@example.com"], "displayName": "Al"},
+        {"gitId": "carol", "emails": ["ALICE@example.com"]},
+    ]}
+    issues = check({"author-config.csv": AUTHOR_HEADER + "https://github.com/foo/bar,master,alice,,Alice\n",
+                    "config.json": json.dumps(config)})
+
+    assert [(issue.severity, issue.config, issue.entry) for issue in issues] == [
+        (WARNING, "config.json", "alice"),
+        (WARNING, "config.json", "carol"),
+        (ERROR, "config.json", "carol"),
+    ]
+
+
+def test_ignored_file_size_limit():
+    issues = check({"repo-config.csv": "Repository's Location,Branch,File Size Limit,Ignore File Size Limit\n"
+                                       "https://github.com/foo/bar,master,100,yes\n"
+                                       "https://github.com/foo/bar,dev,,yes\n"})
+
+    assert issues == [Issue(WARNING, "repo-config.csv", "https://github.com/foo/bar / master",
+                            "File Size Limit has no effect, since Ignore File Size Limit is set")]
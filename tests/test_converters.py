@@ -0,0 +1,73 @@
+import pytest
+
+from benchmarks.synthetic import make_author_config, make_group_config, make_repo_config
+from utils import converters
+
+pd = pytest.importorskip("pandas")
+
+# values the csv module and pandas have to quote or escape the same way
+TRICKY = ["plain", "with, comma", 'with "quotes"', "with\nnewline", "Ünïcode", " spaces ", ""]
+
+
+def legacy_convert(rows: list[list], headers: list[str]) -> bytes:
+    # the list of lists -> DataFrame -> to_csv conversion the converters replaced
+    return pd.DataFrame(rows, columns=headers).to_csv(index=False).encode("utf-8")
+
+
+def legacy_repo_rows(repoinfo: dict[str, dict[str, dict]]) -> list[list]:
+    return [[repo_url, branch, ";".join(configs["file_fmts"]), ";".join(configs["ignore_glob_lists"]),
+             "yes" if configs["ignore_standalone_configs"] else "", ";".join(configs["ignore_commits_list"]),
+             ";".join(configs["ignore_authors_list"]), "yes" if configs["shallow_cloning"] else "",
+             "yes" if configs["find_prev_authors"] else "",
+             0 if configs["file_size_limits"] < 0 else configs["file_size_limits"],
+             "yes" if configs["ignore_file_size_limits"] else "",
+             "yes" if configs["skip_ignored_file_analysis"] else ""]
+            for repo_url, branches in repoinfo.items() for branch, configs in branches.items()]
+
+
+def legacy_author_rows(repoinfo: dict[str, dict[str, dict]]) -> list[list]:
+    return [[repo_url, branch, configs["author_git_host_id"], ";".join(configs["author_emails"]),
+             configs["author_display_name"], ";".join(configs["git_author_name"]),
+             ";".join(configs["ignore_glob_lists"])]
+            for repo_url, branches in repoinfo.items() for branch, configs in branches.items()]
+
+
+def legacy_group_rows(repoinfo: dict[str, dict[str, dict]]) -> list[list]:
+    return [[repo_url, group, ";".join(configs["glob_lists"])]
+            for repo_url, groups in repoinfo.items() for group, configs in groups.items()]
+
+
+def test_repo_config_matches_pandas():
+    repoinfo = make_repo_config(300)
+    repoinfo["https://github.com/foo/bar"] = {
+        value: {**converters.REPO_CONFIG_DEFAULTS, "file_fmts": [value], "ignore_authors_list": [value, value],
+                "file_size_limits": -1}
+        for value in TRICKY
+    }
+
+    assert (converters.convert_repo_config_csv_to_csv(repoinfo) ==
+            legacy_convert(legacy_repo_rows(repoinfo), converters.REPO_CONFIG_HEADERS))
+
+
+def test_author_config_matches_pandas():
+    repoinfo = make_author_config(300)
+    repoinfo["https://github.com/foo/bar"] = {
+        value: {**converters.AUTHOR_CONFIG_DEFAULTS, "author_git_host_id": value, "author_display_name": value}
+        for value in TRICKY
+    }
+
+    assert (converters.convert_author_config_csv_to_csv(repoinfo) ==
+            legacy_convert(legacy_author_rows(repoinfo), converters.AUTHOR_CONFIG_HEADERS))
+
+
+def test_group_config_matches_pandas():
+    repoinfo = make_group_config(300)
+    repoinfo["https://github.com/foo/bar"] = {value: {"glob_lists": [value]} for value in TRICKY}
+
+    assert (converters.convert_group_config_csv_to_csv(repoinfo) ==
+            legacy_convert(legacy_group_rows(repoinfo), converters.GROUP_CONFIG_HEADERS))
+
+
+def test_empty_configs_match_pandas():
+    assert converters.convert_repo_config_csv_to_csv({}) == legacy_convert([], converters.REPO_CONFIG_HEADERS)
+    assert converters.convert_group_config_csv_to_csv({}) == legacy_convert([], converters.GROUP_CONFIG_HEADERS)
@@ -0,0 +1,56 @@
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import discovery
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+
+
+def commit(repo: str, name: str, count: int = 1):
+    for _ in range(count):
+        subprocess.run(["git", "-C", repo, "-c", f"user.name={name}", "-c", f"user.email={name}@example.com",
+                        "commit", "-q", "--allow-empty", "-m", "commit"], check=True)
+
+
+@pytest.fixture
+def repo(tmp_path) -> str:
+    path = str(tmp_path / "repo")
+    subprocess.run(["git", "init", "-q", "-b", "master", path], check=True)
+    commit(path, "alice", 2)
+    return path
+
+
+def test_rescan_only_counts_new_commits(repo):
+    author_discovery = discovery.AuthorDiscovery(max_workers=2)
+    author_discovery.scan([(repo, "")])
+    commit(repo, "bob")
+
+    result = author_discovery.scan([(repo, "master")])[repo, "master"]
+
+    assert result.identities == {"alice\0alice@example.com": 2, "bob\0bob@example.com": 1}
+
+
+def test_concurrent_scans_count_each_commit_once(repo):
+    author_discovery = discovery.AuthorDiscovery(max_workers=4)
+    author_discovery.scan([(repo, "master")])
+    commit(repo, "alice", 3)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: author_discovery.scan([(repo, "master")])[repo, "master"], range(8)))
+
+    assert all(result.identities == {"alice\0alice@example.com": 5} for result in results)
+
+
+@pytest.mark.parametrize("branch", ["--output=/tmp/x", "-h", "a..b", "a b"])
+def test_scan_rejects_invalid_branches(repo, branch):
+    with pytest.raises(discovery.DiscoveryError, match="not a valid branch name"):
+        discovery.scan_repository(repo, branch)
+
+
+def test_scan_missing_branch(repo):
+    result = discovery.AuthorDiscovery(max_workers=1).scan([(repo, "missing")])
+
+    assert result[repo, "missing"] == "Branch `missing` does not exist"
@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+from utils import drafts
+
+FIELDS = {"repo-0": {"repo": "https://github.com/foo/bar", "branches": ["master"]}, "title": "Ünïcode", "size": 3}
+
+
+@pytest.fixture
+def store(tmp_path) -> drafts.DraftStore:
+    return drafts.DraftStore(str(tmp_path / "drafts" / "drafts.sqlite3"))
+
+
+def spy_writes(store: drafts.DraftStore, monkeypatch) -> list[tuple]:
+    writes = []
+    write = store.write
+
+    def spy(draft, page, changed, removed=()):
+        writes.append((page, dict(changed), list(removed)))
+        write(draft, page, changed, removed)
+
+    monkeypatch.setattr(store, "write", spy)
+    return writes
+
+
+def test_autosave_round_trip(store):
+    saver = drafts.Autosaver(store, delay=0.01)
+    saver.schedule("a", "repo-config", FIELDS)
+
+    deadline = time.monotonic() + 10
+    while not store.read("a", "repo-config"):
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+    assert saver.error is None
+    assert drafts.Autosaver(store).restore("a", "repo-config") == FIELDS
+    assert list(store.load("a", "repo-config")) == list(FIELDS)
+    assert store.load("a", "author-config") == {}
+
+
+def test_autosave_writes_only_changed_fields(store, monkeypatch):
+    writes = spy_writes(store, monkeypatch)
+    saver = drafts.Autosaver(store, delay=60)
+
+    saver.schedule("a", "repo-config", FIELDS)
+    saver.flush()
+    saver.schedule("a", "repo-config", {**FIELDS, "title": "Report"})
+    saver.schedule("a", "repo-config", {**FIELDS, "title": "Report"})
+    saver.flush()
+    saver.schedule("a", "repo-config", {"title": "Report", "size": 3})
+    saver.flush()
+    saver.schedule("a", "repo-config", {"title": "Report", "size": 3})
+    saver.flush()
+
+    assert [(sorted(changed), removed) for _, changed, removed in writes] == [
+        (sorted(FIELDS), []),
+        (["title"], []),
+        # the remaining fields moved up, so they are written again with their new position
+        (["size", "title"], ["repo-0"]),
+    ]
+    assert store.load("a", "repo-config") == {"title": "Report", "size": 3}
+
+
+def test_restored_fields_are_neither_read_nor_written_again(store, monkeypatch):
+    store.write("a", "repo-config", {name: (position, drafts.encode(value))
+                                     for position, (name, value) in enumerate(FIELDS.items())})
+    saver = drafts.Autosaver(store, delay=60)
+    fields = saver.restore("a", "repo-config")
+    writes = spy_writes(store, monkeypatch)
+    monkeypatch.setattr(store, "read", lambda *args: pytest.fail("read a remembered page"))
+
+    saver.schedule("a", "repo-config", fields)
+    saver.flush()
+
+    assert writes == []
+
+
+def test_forget_drops_pending_forms(store, monkeypatch):
+    writes = spy_writes(store, monkeypatch)
+    saver = drafts.Autosaver(store, delay=60)
+
+    saver.schedule("a", "repo-config", FIELDS)
+    saver.forget("a")
+    saver.flush()
+
+    assert writes == []
+
+
+def test_list_drafts_only_lists_the_given_drafts(store):
+    store.write("a", "repo-config", {"title": (0, '"x"')})
+    store.write("a", "group-config", {"title": (0, '"yz"')})
+    store.write("b", "repo-config", {"title": (0, '"x"')})
+    store.write("c", "repo-config", {})
+
+    assert [(info.id, info.pages, info.size) for info in store.list_drafts(["c", "a", "a", "missing"])] == [
+        ("c", [], 0),
+        ("a", ["group-config", "repo-config"], 7),
+    ]
+    assert [info.id for info in store.list_drafts(["a", "b", "c"], limit=1)] == ["c"]
+    assert store.list_drafts([]) == []
+
+
+def test_delete_and_purge(store):
+    store.write("a", "repo-config", {"title": (0, '"x"')})
+    store.write("b", "repo-config", {"title": (0, '"x"')})
+
+    store.delete("a")
+    assert store.read("a", "repo-config") == {}
+    assert [info.id for info in store.list_drafts(["a", "b"])] == ["b"]
+
+    assert store.purge(ttl=60) == 0
+    assert store.purge(ttl=-1) == 1
+    assert store.list_drafts(["b"]) == []
+    assert store.read("b", "repo-config") == {}
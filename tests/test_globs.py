@@ -0,0 +1,41 @@
+import shutil
+import subprocess
+
+import pytest
+
+from utils import globs
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+
+
+@pytest.fixture
+def repo(tmp_path) -> str:
+    path = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", "-b", "master", str(path)], check=True)
+
+    for name in ["src/Main.java", "src/util/Util.java", "docs/README.md"]:
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(name)
+
+    subprocess.run(["git", "-C", str(path), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(path), "-c", "user.name=test", "-c", "user.email=test@example.com", "commit",
+                    "-q", "-m", "init"], check=True)
+    return str(path)
+
+
+def test_index_of_branch(repo):
+    index = globs.PathIndexCache().get(repo, "master")
+
+    assert len(index) == 3
+    assert index.preview(["**/*.java"]).counts == {"**/*.java": 2}
+
+
+@pytest.mark.parametrize("branch", ["--output=/tmp/x", "-h", "a..b", "a b"])
+def test_index_rejects_invalid_branches(repo, branch):
+    with pytest.raises(globs.GlobError, match="not a valid branch name"):
+        globs.PathIndexCache().get(repo, branch)
+
+
+def test_index_of_missing_branch(repo):
+    with pytest.raises(globs.GlobError, match="does not exist"):
+        globs.PathIndexCache().get(repo, "missing")
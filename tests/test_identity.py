@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from utils import identity
+from utils.identity import Duplicate
+
+
+@pytest.mark.parametrize("location", [
+    "https://github.com/foo/bar",
+    "https://github.com/foo/bar.git",
+    "https://github.com/foo/bar/",
+    " https://github.com/foo/bar.git/ ",
+    "https://GitHub.com/Foo/Bar",
+    "https://github.com:443/foo/bar",
+    "https://user@github.com/foo/bar",
+    "http://github.com/foo/bar",
+    "ssh://git@github.com/foo/bar.git",
+    "ssh://git@github.com:22/foo/bar.git",
+    "git@github.com:foo/bar.git",
+    "git@github.com:/foo/bar",
+    "https://github.com/foo//bar",
+])
+def test_locations_of_the_same_remote(location):
+    assert identity.canonical_repo(location) == identity.canonical_repo("https://github.com/foo/bar")
+
+
+@pytest.mark.parametrize("location, other", [
+    ("https://github.com/foo/bar", "https://github.com/foo/baz"),
+    ("https://github.com/foo/bar", "https://gitlab.com/foo/bar"),
+    ("https://github.com/foo/bar", "https://github.com:8443/foo/bar"),
+    # only the paths of the hosts known to be case-insensitive are case-folded
+    ("https://example.com/Foo/Bar", "https://example.com/foo/bar"),
+])
+def test_locations_of_different_remotes(location, other):
+    assert identity.canonical_repo(location) != identity.canonical_repo(other)
+
+
+def test_locations_of_the_same_path(tmp_path):
+    path = str(tmp_path / "repo")
+    locations = [path, path + os.sep, os.path.join(path, ".git"), os.path.join(path, "src", os.pardir),
+                 f"file://{path}"]
+
+    assert {identity.canonical_repo(location) for location in locations} == {identity.canonical_repo(path)}
+
+
+def test_repo_index_merges_locations():
+    index = identity.merge_repoinfo([
+        ("https://github.com/foo/bar", {"master": {"n": 1}}),
+        ("git@github.com:Foo/bar.git", {"dev": {"n": 2}, "master ": {"n": 3}}),
+        ("https://github.com/foo/baz", {}),
+    ])
+
+    assert index.repoinfo == {"https://github.com/foo/bar": {"master": {"n": 3}, "dev": {"n": 2}},
+                              "https://github.com/foo/baz": {}}
+    assert index.duplicates == [Duplicate("git@github.com:Foo/bar.git", "", "https://github.com/foo/bar"),
+                                Duplicate("git@github.com:Foo/bar.git", "master", "https://github.com/foo/bar")]
+    assert index.location("https://github.com/foo/bar.git") == "https://github.com/foo/bar"
+
+
+@pytest.mark.parametrize("name, valid", [
+    ("master", True), ("release/1.0", True), ("feature-x", True),
+    ("", False), ("-x", False), ("@", False), ("a..b", False), ("a b", False), ("a:b", False), ("a/", False),
+    ("a.lock", False), ("a//b", False), ("a@{1}", False), (".a", False),
+])
+def test_is_valid_branch(name, valid):
+    assert identity.is_valid_branch(name) is valid
+
+
+def test_unique_emails():
+    assert identity.unique_emails([" Alice@Example.com", "alice@example.com ", "bob@example.com"]) == [
+        "Alice@Example.com", "bob@example.com"]
@@ -0,0 +1,49 @@
+import pytest
+
+from utils import memory, models
+
+
+def test_accounted_state_counts_towards_session_budget():
+    cache = memory.ArtifactCache(budget=1000, session_budget=100)
+    cache.put("a", "repo-config.csv", b"x" * 40)
+    cache.account("a", 50)
+
+    assert cache.session_size("a") == 90
+    assert cache.usage().state == 50
+
+    with pytest.raises(memory.SessionBudgetError):
+        cache.put("a", "author-config.csv", b"y" * 20)
+
+    with pytest.raises(memory.SessionBudgetError):
+        cache.account("a", 70)
+
+    # the state of other sessions is accounted separately
+    cache.put("b", "author-config.csv", b"y" * 20)
+
+    cache.release("a")
+    assert cache.session_size("a") == 0
+    assert cache.usage().state == 0
+
+
+def test_get_only_returns_artifacts_of_the_given_key():
+    cache = memory.ArtifactCache()
+    cache.put("a", "scaffold.zip", b"old", "scaffold.zip:1")
+
+    assert cache.get("a", "scaffold.zip", "scaffold.zip:1") == b"old"
+    assert cache.get("a", "scaffold.zip", "scaffold.zip:2") is None
+    assert cache.get("a", "scaffold.zip") == b"old"
+
+
+def test_config_table_forgets_encoded_lines():
+    table = models.ConfigTable(models.RepoBranchConfig, [models.RepoBranchConfig("https://x/y.git", "master"),
+                                                         models.RepoBranchConfig("https://x/z.git", "master")])
+    data = table.to_csv()
+    assert table.encoded_size == len(data) - len(data.splitlines(keepends=True)[0])
+
+    table.forget_encoded()
+    assert table.encoded_size == 0
+    assert table.to_csv() == data
+
+    table.discard(("https://x/z.git", "master"))
+    data = table.to_csv()
+    assert table.encoded_size == len(data) - len(data.splitlines(keepends=True)[0])
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+from benchmarks import synthetic
+from utils import converters, parsers
+from utils.identity import Duplicate, RepoIndex
+
+CSV_CONFIGS = [
+    (synthetic.make_repo_config, converters.convert_repo_config_csv_to_csv, parsers.parse_repo_config_csv),
+    (synthetic.make_author_config, converters.convert_author_config_csv_to_csv, parsers.parse_author_config_csv),
+    (synthetic.make_group_config, converters.convert_group_config_csv_to_csv, parsers.parse_group_config_csv),
+]
+
+
+@pytest.mark.parametrize("make, convert, parse", CSV_CONFIGS)
+def test_csv_round_trip(make, convert, parse):
+    data = convert(make(500))
+
+    assert convert(parse(data)) == data
+    assert convert(parse(io.BytesIO(data))) == data
+
+
+def test_csv_round_trip_across_chunks(monkeypatch):
+    monkeypatch.setattr(parsers, "CHUNK_SIZE", 7)
+    repoinfo = synthetic.make_repo_config(50)
+
+    assert parsers.parse_repo_config_csv(converters.convert_repo_config_csv_to_csv(repoinfo)) == repoinfo
+
+
+def test_json_round_trip():
+    report = converters.convert_report_config_json_to_json({"title": "Ünïcode \"report\""})
+    config = converters.convert_config_json_to_json(synthetic.make_config_json(50))
+
+    assert converters.convert_report_config_json_to_json(parsers.parse_report_config_json(report.encode())) == report
+    assert converters.convert_config_json_to_json(parsers.parse_config_json(config.encode())) == config
+
+
+def test_missing_columns_take_defaults():
+    repoinfo = parsers.parse_repo_config_csv(b"Repository's Location,BRANCH ,File Formats\n"
+                                             b"https://github.com/foo/bar,master,java;py\n")
+
+    assert repoinfo == {"https://github.com/foo/bar": {
+        "master": {**converters.REPO_CONFIG_DEFAULTS, "file_fmts": ["java", "py"]}}}
+
+
+@pytest.mark.parametrize("parse, data, message", [
+    (parsers.parse_repo_config_csv, b"Location,Branch\nx,master\n", "Expected the columns"),
+    (parsers.parse_group_config_csv, b"Repository's Location,Branch\nx,master\n", "Group Name"),
+    (parsers.parse_repo_config_csv, b"Repository's Location,Branch,File Size Limit\nx,master,big\n",
+     "Invalid value in CSV file"),
+    (parsers.parse_report_config_json, b"[]", "JSON object"),
+    (parsers.parse_config_json, b'{"authors": [1]}', "list of objects"),
+    (parsers.parse_config_json, b'{"formats": "java"}', "`formats` to be a list of strings"),
+    (parsers.parse_config_json, b'{"authors": [{"gitId": 1}]}', "`gitId` of author 1 to be a string"),
+])
+def test_invalid_configs_raise(parse, data, message):
+    with pytest.raises(ValueError, match=message):
+        parse(data)
+
+
+def test_overridden_authors_are_recorded():
+    index = RepoIndex()
+    repoinfo = parsers.parse_author_config_csv(b"Repository's Location,Branch,Author's Git Host ID\n"
+                                               b"https://github.com/foo/bar,master,alice\n"
+                                               b"https://github.com/Foo/bar.git,master ,bob\n", index)
+
+    assert repoinfo == {"https://github.com/foo/bar": {
+        "master": {**converters.AUTHOR_CONFIG_DEFAULTS, "author_git_host_id": "bob"}}}
+    assert index.duplicates == [Duplicate("https://github.com/Foo/bar.git", "", "https://github.com/foo/bar"),
+                                Duplicate("https://github.com/Foo/bar.git", "master", "https://github.com/foo/bar")]
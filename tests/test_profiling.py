@@ -0,0 +1,41 @@
+import json
+
+from utils import profiling
+
+
+def record(page: str = "repo-config", seconds: float = 0.1) -> profiling.RerunRecord:
+    return profiling.RerunRecord(page, 0.0, seconds, {"widgets": seconds}, {"repo-config.csv": 10})
+
+
+def test_record_appends_log(tmp_path):
+    log = tmp_path / "reruns.jsonl"
+    profiler = profiling.Profiler(log_path=str(log))
+
+    profiler.record(record(seconds=0.1))
+    profiler.record(record(seconds=0.2))
+
+    assert [json.loads(line)["seconds"] for line in log.read_text().splitlines()] == [0.1, 0.2]
+
+
+def test_record_throttles_metrics(tmp_path):
+    metrics = tmp_path / "repoconfig.prom"
+    profiler = profiling.Profiler(metrics_path=str(metrics), metrics_interval=60)
+
+    profiler.record(record())
+    profiler.record(record())
+
+    assert 'repoconfig_rerun_seconds_count{page="repo-config"} 1' in metrics.read_text()
+    assert 'repoconfig_rerun_seconds_count{page="repo-config"} 2' in profiler.to_prometheus()
+
+
+def test_record_writes_metrics_after_interval(tmp_path):
+    metrics = tmp_path / "repoconfig.prom"
+    profiler = profiling.Profiler(metrics_path=str(metrics), metrics_interval=0)
+    profiler.add_collector(lambda: "extra_metric 1\n")
+
+    profiler.record(record())
+    profiler.record(record())
+
+    text = metrics.read_text()
+    assert 'repoconfig_rerun_seconds_count{page="repo-config"} 2' in text
+    assert text.endswith("extra_metric 1\n")
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from utils import reachability
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+
+
+@pytest.fixture
+def bare_repo(tmp_path) -> str:
+    """
+    :return: file:// URL of a bare repository with a ``master`` and a ``dev`` branch
+    """
+
+    work = tmp_path / "work"
+    bare = tmp_path / "repo.git"
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+    subprocess.run(git + ["init", "-q", "-b", "master", str(work)], check=True)
+    subprocess.run(git + ["-C", str(work), "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    subprocess.run(git + ["-C", str(work), "branch", "dev"], check=True)
+    subprocess.run(git + ["clone", "-q", "--bare", str(work), str(bare)], check=True)
+
+    return f"file://{bare}"
+
+
+def test_list_heads_of_file_url(bare_repo):
+    status = reachability.list_heads(bare_repo)
+
+    assert status.reachable
+    assert status.branches == {"master", "dev"}
+
+
+def test_list_heads_of_disk_path(bare_repo):
+    status = reachability.list_heads(bare_repo.removeprefix("file://"))
+
+    assert status.reachable
+    assert status.branches == {"master", "dev"}
+
+
+def test_list_heads_of_missing_repositories(tmp_path):
+    assert not reachability.list_heads(str(tmp_path / "missing")).reachable
+    assert not reachability.list_heads(f"file://{tmp_path / 'missing.git'}").reachable
+
+
+@pytest.mark.parametrize("option", ["--upload-pack=touch {marker}; git-upload-pack #://x",
+                                    "-u touch {marker} #://x"])
+def test_list_heads_never_runs_options(bare_repo, tmp_path, monkeypatch, option):
+    # without a repository, git ls-remote lists the origin of the working directory, running the option's command
+    clone = tmp_path / "clone"
+    subprocess.run(["git", "clone", "-q", bare_repo, str(clone)], check=True)
+    monkeypatch.chdir(clone)
+
+    marker = tmp_path / "PWNED"
+    status = reachability.list_heads(option.format(marker=marker))
+
+    assert not status.reachable
+    assert not marker.exists()
+
+
+def test_list_heads_never_runs_ext_transport(tmp_path):
+    marker = tmp_path / "PWNED"
+    status = reachability.list_heads(f"ext::sh -c touch% {marker}")
+
+    assert not status.reachable
+    assert not marker.exists()
+
+
+def test_check_branches(bare_repo):
+    missing = bare_repo + "-missing"
+    results = reachability.ReachabilityChecker(max_workers=2).check({bare_repo: ["master", "devv", ""],
+                                                                        missing: ["master"]})
+
+    assert results[bare_repo]["master"].ok
+    assert not results[bare_repo]["devv"].ok
+    assert results[bare_repo][""].ok
+    assert not results[missing]["master"].ok
+
+
+def test_checker_caches_listings(bare_repo, monkeypatch):
+    checker = reachability.ReachabilityChecker(max_workers=2)
+    listed = []
+    list_heads = reachability.list_heads
+
+    def counting_list_heads(location, timeout):
+        listed.append(location)
+        return list_heads(location, timeout)
+
+    monkeypatch.setattr(reachability, "list_heads", counting_list_heads)
+
+    checker.check({bare_repo: ["master"]})
+    checker.check({bare_repo: ["dev"]})
+    assert listed == [bare_repo]
+
+    checker.clear()
+    checker.check({bare_repo: ["dev"]})
+    assert listed == [bare_repo, bare_repo]
+
+
+def test_checker_expires_listings(bare_repo):
+    checker = reachability.ReachabilityChecker(max_workers=2, ttl=0)
+    checker.check({bare_repo: ["master"]})
+
+    assert checker.lookup(bare_repo) is None
+    assert os.path.isdir(bare_repo.removeprefix("file://"))
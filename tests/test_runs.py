@@ -0,0 +1,152 @@
+import shlex
+import sys
+import time
+
+import pytest
+
+from utils import runs
+
+# prints the progress counters RepoSense prints, waiting for the given seconds in between, then its other arguments
+STUB = """
+import sys
+import time
+
+print("(1/2) cloning", flush=True)
+time.sleep(float(sys.argv[1]))
+print("(2/2) analysing", flush=True)
+print(" ".join(sys.argv[2:]), flush=True)
+"""
+CONFIGS = {"repo-config.csv": b"Repository's Location,Branch\n"}
+
+
+def wait_for(predicate, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    stub = tmp_path / "stub.py"
+    stub.write_text(STUB)
+    queues = []
+
+    def make_queue(delay: float = 0, **kwargs) -> runs.RunQueue:
+        queue = runs.RunQueue(shlex.join([sys.executable, str(stub), str(delay)]), str(tmp_path / "runs"), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make_queue
+
+    for queue in queues:
+        for run in queue.runs("a"):
+            queue.cancel(run.id, "a")
+        wait_for(lambda: all(run.record.status in runs.FINISHED for run in queue.runs("a")))
+
+
+def test_run_succeeds(make_queue):
+    queue = make_queue()
+    run = queue.submit("a", CONFIGS, ["--since", "01/01/2024"])
+    wait_for(lambda: run.record.status in runs.FINISHED)
+
+    assert run.record.status == runs.SUCCEEDED
+    assert run.record.returncode == 0
+    assert run.progress == (2, 2)
+    assert run.tail(1)[0].endswith("reports --since 01/01/2024")
+
+
+@pytest.mark.parametrize("command", [shlex.join([sys.executable, "stub.py", "0"]), "./reposense"])
+def test_run_relative_command(tmp_path, monkeypatch, command):
+    # like the default java -jar RepoSense.jar, the paths of the command are relative to the app's directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "stub.py").write_text(STUB)
+    (tmp_path / "reposense").write_text("#!/bin/sh\necho \"(1/1) $*\"\n")
+    (tmp_path / "reposense").chmod(0o755)
+
+    run = runs.RunQueue(command, "runs").submit("a", CONFIGS)
+    wait_for(lambda: run.record.status in runs.FINISHED)
+
+    assert run.record.status == runs.SUCCEEDED, run.tail()
+
+
+def test_runs_respect_concurrency_limit(make_queue):
+    queue = make_queue(0.3, max_concurrent=2)
+    submitted = [queue.submit("a", CONFIGS) for _ in range(4)]
+    wait_for(lambda: all(run.record.status in runs.FINISHED for run in submitted))
+
+    assert all(run.record.status == runs.SUCCEEDED for run in submitted)
+
+    events = sorted([(run.record.started, 1) for run in submitted] + [(run.record.finished, -1) for run in submitted])
+    running = [sum(change for _, change in events[:i + 1]) for i in range(len(events))]
+    assert max(running) == 2
+
+
+def test_cancel_queued_run(make_queue):
+    queue = make_queue(30, max_concurrent=1)
+    running = queue.submit("a", CONFIGS)
+    queued = queue.submit("a", CONFIGS)
+    wait_for(lambda: running.record.status == runs.RUNNING)
+
+    queue.cancel(queued.id, "a")
+
+    assert queued.record.status == runs.CANCELLED
+    assert queued.record.started is None
+    assert running.record.status == runs.RUNNING
+
+
+def test_cancel_running_run(make_queue):
+    queue = make_queue(30)
+    run = queue.submit("a", CONFIGS)
+    wait_for(lambda: run.progress is not None)
+
+    queue.cancel(run.id, "a")
+    wait_for(lambda: run.record.status in runs.FINISHED)
+
+    assert run.record.status == runs.CANCELLED
+    assert run.record.returncode != 0
+    assert run.record.duration < 30
+
+
+def test_run_times_out(make_queue):
+    queue = make_queue(30, timeout=0.5)
+    run = queue.submit("a", CONFIGS)
+    wait_for(lambda: run.record.status in runs.FINISHED)
+
+    assert run.record.status == runs.FAILED
+    assert run.record.message == "Stopped after 0.5 seconds"
+
+
+def test_queue_refuses_runs_when_full(make_queue):
+    queue = make_queue(30, max_concurrent=1, max_queued=1)
+    running = queue.submit("a", CONFIGS)
+    wait_for(lambda: running.record.status == runs.RUNNING)
+    queue.submit("a", CONFIGS)
+
+    with pytest.raises(runs.RunQueueFull):
+        queue.submit("b", CONFIGS)
+
+
+def test_owners_only_see_and_cancel_their_runs(make_queue):
+    queue = make_queue(30)
+    run = queue.submit("a", CONFIGS)
+
+    assert queue.runs("a") == [run]
+    assert queue.runs("b") == []
+    assert queue.get(run.id, "b") is None
+
+    queue.cancel(run.id, "b")
+    wait_for(lambda: run.progress is not None)
+    assert run.record.status == runs.RUNNING
+
+
+@pytest.mark.parametrize("args", [["--config", "/etc"], ["--output=/tmp"], ["-r", "x"], ["--conf", "/etc"],
+                                  ["--view"], ["--since", "01/01/2024", "--", "--output"]])
+def test_submit_rejects_options(make_queue, args):
+    queue = make_queue()
+
+    with pytest.raises(ValueError, match="not one of the allowed options"):
+        queue.submit("a", CONFIGS, args)
+
+    assert queue.runs("a") == []
@@ -0,0 +1,85 @@
+import pytest
+
+from utils import validation
+
+
+def repo_record(repo: str = "https://github.com/foo/bar", branch: str = "master", **fields) -> dict:
+    return {"repo": repo, "branch": branch, "file_fmts": ["java"], "ignore_glob_lists": ["docs/**"],
+            "ignore_commits_list": ["abc123"], "ignore_authors_list": ["bot"], "file_size_limits": 1000, **fields}
+
+
+def messages(config: str, records: list[dict]) -> list[tuple[int, str, str]]:
+    return [(error.row, error.field, error.message) for error in validation.validate(config, records)]
+
+
+def test_valid_config_has_no_errors():
+    records = [repo_record(), repo_record(branch="release/1.0"), repo_record("git@github.com:foo/baz.git"),
+               repo_record("C:\\repos\\foo"), repo_record("file:///srv/repos/foo")]
+
+    assert validation.validate("repo-config", records) == []
+
+
+def test_required_fields():
+    assert messages("repo-config", [repo_record(), repo_record(branch="dev", file_fmts=[], file_size_limits=0)]) == [
+        (1, "File formats", "is required"),
+        (1, "File Size Limit", "is required"),
+    ]
+    # the globs of config.json are optional
+    assert messages("config-json", [{"formats": ["java"], "ignoreGlobList": [], "ignoreCommitList": ["abc"],
+                                     "ignoreAuthorList": ["bot"]}]) == []
+
+
+@pytest.mark.parametrize("branch", ["-x", "a..b", "feature/", "a b", "a.lock", "@", "a~1", "/a"])
+def test_invalid_branch(branch):
+    assert messages("repo-config", [repo_record(branch=branch)]) == [
+        (0, "Branch", f"`{branch}` is not a valid branch name")]
+
+
+@pytest.mark.parametrize("repo", ["https://github.com", "ssh://host", "https://github.com/foo bar", "git@:foo"])
+def test_invalid_location(repo):
+    assert messages("repo-config", [repo_record(repo)]) == [
+        (0, "Repository's Location", f"`{repo}` is not a valid repository URL")]
+
+
+def test_location_with_surrounding_spaces():
+    assert messages("repo-config", [repo_record(" https://github.com/foo/bar")]) == [
+        (0, "Repository's Location", "must not contain control characters or surrounding spaces")]
+
+
+@pytest.mark.parametrize("size, message", [
+    (-1, "must be between 1 and 2147483647 bytes"),
+    (validation.MAX_FILE_SIZE_LIMIT + 1, "must be between 1 and 2147483647 bytes"),
+    ("100", "must be a whole number of bytes"),
+    (True, "must be a whole number of bytes"),
+])
+def test_size_bounds(size, message):
+    assert messages("repo-config", [repo_record(file_size_limits=size)]) == [(0, "File Size Limit", message)]
+    assert validation.validate("repo-config", [repo_record(file_size_limits=validation.MAX_FILE_SIZE_LIMIT)]) == []
+
+
+def test_invalid_globs_and_emails():
+    record = {"repo": "https://github.com/foo/bar", "branch": "master", "author_git_host_id": "alice",
+              "author_emails": ["alice@example.com", "alice"], "author_display_name": "Alice",
+              "git_author_name": ["alice"], "ignore_glob_lists": ["[abc"]}
+
+    assert [field for _, field, _ in messages("author-config", [record])] == ["Author's Emails", "Ignore Glob List"]
+
+
+def test_duplicate_keys_count_locations_of_the_same_repository():
+    records = [repo_record(), repo_record(branch="dev"), repo_record("https://GitHub.com/foo/bar.git/")]
+    groups = [{"repo": "https://github.com/foo/bar", "group": "code", "glob_lists": ["src/**"]},
+              {"repo": "https://github.com/foo/bar", "group": " code ", "glob_lists": ["lib/**"]}]
+
+    assert messages("repo-config", records) == [
+        (2, "Repository's Location / Branch", "is the same as row 1, which it overrides")]
+    assert messages("group-config", groups) == [
+        (1, "Repository's Location / Group Name", "is the same as row 1, which it overrides")]
+
+
+def test_errors_describe_their_row():
+    errors = validation.validate("repo-config", [repo_record(), repo_record(branch="-x", file_fmts=[])])
+
+    assert [(error.row, error.entry, error.field) for error in errors] == [
+        (1, "https://github.com/foo/bar / -x", "Branch"),
+        (1, "https://github.com/foo/bar / -x", "File formats"),
+    ]
@@ -0,0 +1,128 @@
+"""
+Writes zip archives of config files with a bounded memory footprint.
+
+Archives are written into a ``SpooledTemporaryFile``, which stays in memory while the archive is small and moves to
+the disk once it outgrows ``SPOOL_SIZE``. Every member is streamed into the archive with ``ZipFile.open(..., "w")``,
+reading files on the disk in chunks, so building an archive never holds more than one chunk of a member besides the
+spooled buffer. Members larger than 4 GiB are written with ZIP64 extensions.
+
+Archives are deterministic: members are written in sorted order with fixed timestamps and permissions, so the same
+files and compression settings always give byte-identical archives.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Iterable
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+SPOOL_SIZE = int(os.environ.get("REPOCONFIG_ARCHIVE_SPOOL", 8 * 1024 * 1024))
+COMPRESSION = os.environ.get("REPOCONFIG_ARCHIVE_COMPRESSION", "deflate")
+COMPRESS_LEVEL = int(os.environ.get("REPOCONFIG_ARCHIVE_LEVEL", 6))
+
+COMPRESSIONS = {
+    "stored": ZIP_STORED,
+    "deflate": ZIP_DEFLATED,
+}
+
+# the earliest timestamp a zip file can hold
+_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+_CHUNK_SIZE = 1024 * 1024
+
+# contents of a member: bytes, text encoded as UTF-8, or the path of a file on the disk
+Member = bytes | str | os.PathLike
+
+
+def member_size(data: Member) -> int:
+    """
+    :param data: Contents of a member
+    :return: Size of the member before compression, in bytes
+    """
+
+    if isinstance(data, os.PathLike):
+        return os.path.getsize(data)
+
+    return len(data.encode("utf-8") if isinstance(data, str) else data)
+
+
+def member_info(name: str, size: int, compression: str = COMPRESSION, level: int = COMPRESS_LEVEL,
+                executable: bool = False) -> ZipInfo:
+    """
+    Creates the header of a member, with the same timestamp, host system and permissions on every platform.
+
+    :param name: Path of the member in the archive
+    :param size: Size of the member before compression, which decides whether the member needs ZIP64 extensions
+    :param compression: ``stored`` or ``deflate``
+    :param level: Deflate compression level, from 0 to 9
+    :param executable: Whether to mark the member as executable
+    :return: ZipInfo of the member
+    :raises ValueError: If the compression is not supported
+    """
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression `{compression}`, expected one of {', '.join(COMPRESSIONS)}")
+
+    info = ZipInfo(name, date_time=_TIMESTAMP)
+    info.compress_type = COMPRESSIONS[compression]
+    # ZipFile.open only takes the compression level from the ZipInfo, unlike ZipFile.writestr
+    info._compresslevel = level
+    info.create_system = 3
+    info.external_attr = (0o100755 if executable else 0o100644) << 16
+    info.file_size = size
+    return info
+
+
+def write_archive(files: dict[str, Member], f: BinaryIO, compression: str = COMPRESSION,
+                  level: int = COMPRESS_LEVEL, executables: Iterable[str] = ()) -> None:
+    """
+    Writes files into a deterministic zip archive, streaming each file into the archive.
+
+    :param files: Mapping from path in the archive to its contents
+    :param f: Seekable binary file to write the archive to
+    :param compression: ``stored`` or ``deflate``
+    :param level: Deflate compression level, from 0 to 9
+    :param executables: Paths in the archive of the files to mark as executable
+    :raises ValueError: If the compression is not supported
+    """
+
+    executables = set(executables)
+
+    with ZipFile(f, "w", allowZip64=True) as archive:
+        for name in sorted(files):
+            data = files[name]
+            data = data.encode("utf-8") if isinstance(data, str) else data
+            info = member_info(name, member_size(data), compression, level, name in executables)
+
+            # the declared size makes ZipFile add ZIP64 extensions to the members that need them
+            with archive.open(info, "w") as entry:
+                if isinstance(data, os.PathLike):
+                    with open(data, "rb") as source:
+                        shutil.copyfileobj(source, entry, _CHUNK_SIZE)
+                else:
+                    entry.write(data)
+
+
+def spooled_archive(files: dict[str, Member], compression: str = COMPRESSION, level: int = COMPRESS_LEVEL,
+                    executables: Iterable[str] = (), spool_size: int = SPOOL_SIZE) -> tempfile.SpooledTemporaryFile:
+    """
+    Writes files into a deterministic zip archive in a spooled temporary file.
+
+    :param files: Mapping from path in the archive to its contents
+    :param compression: ``stored`` or ``deflate``
+    :param level: Deflate compression level, from 0 to 9
+    :param executables: Paths in the archive of the files to mark as executable
+    :param spool_size: Size in bytes above which the archive is moved from memory to the disk
+    :return: Spooled temporary file containing the archive, positioned at its start
+    :raises ValueError: If the compression is not supported
+    """
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_size, prefix="archive-", suffix=".zip")
+
+    try:
+        write_archive(files, spooled, compression, level, executables)
+    except BaseException:
+        spooled.close()
+        raise
+
+    spooled.seek(0)
+    return spooled
@@ -0,0 +1,315 @@
+"""
+Validates the commit hashes and ranges of ``ignore_commits_list`` against repositories on the disk.
+
+All the hashes entered for a repository are resolved by a single ``git cat-file --batch-check`` process, and the
+history of the branch and of the ranges' endpoints is listed by a single ``git rev-list --parents`` process, from which
+every range is expanded without running ``git`` again. Results are cached by repository and by the commit the branch
+points to, so that checking the same entries again does not run ``git`` at all.
+"""
+
+import itertools
+import os
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Iterable, NamedTuple
+
+from utils.identity import is_valid_branch
+
+CACHE_SIZE = int(os.environ.get("REPOCONFIG_COMMIT_CACHE", 32))
+
+# git does not accept abbreviated hashes shorter than 4 characters
+_HASH = re.compile(r"[0-9a-fA-F]{4,40}")
+
+_FROM_END = 1
+_FROM_START = 2
+
+
+class CommitError(Exception):
+    """
+    Raised when a repository cannot be read.
+    """
+
+
+class CommitCheck(NamedTuple):
+    entry: str
+    ok: bool
+    message: str
+    # full hashes of the commits the entry stands for, which for ranges are only listed when they are expanded
+    commits: tuple[str, ...] = ()
+
+
+def parse_entry(entry: str) -> tuple[str, ...] | None:
+    """
+    Splits an entry of ``ignore_commits_list`` into the hashes it refers to.
+
+    :param entry: Full or partial commit hash, or a range of commits separated by ``..``
+    :return: Tuple of the hash, or of the start and end hashes of a range, or None if the entry is malformed
+    """
+
+    hashes = tuple(entry.strip().split(".."))
+
+    if len(hashes) > 2 or not all(_HASH.fullmatch(commit) for commit in hashes):
+        return None
+
+    return hashes
+
+
+def _git(path: str, *args: str, stdin: str | None = None) -> str:
+    process = subprocess.run(
+        ["git", "-C", path, *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        stdin=None if stdin is not None else subprocess.DEVNULL,
+    )
+
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise CommitError(lines[0] if lines else f"`git {args[0]}` exited with {process.returncode}")
+
+    return process.stdout
+
+
+def resolve_hashes(path: str, hashes: Iterable[str]) -> dict[str, tuple[str, str]]:
+    """
+    Resolves full or partial hashes with a single ``git cat-file --batch-check``.
+
+    :param path: Disk path to the repository
+    :param hashes: Hashes to resolve
+    :return: Mapping from each hash to a tuple of its full hash, or an empty string if it cannot be resolved, and its
+             object type, or ``missing`` or ``ambiguous``
+    """
+
+    hashes = list(dict.fromkeys(hashes))
+
+    if not hashes:
+        return {}
+
+    output = _git(path, "cat-file", "--batch-check=%(objectname) %(objecttype)", stdin="\n".join(hashes) + "\n")
+    resolved = {}
+
+    # the objects are reported in the order they were given, as `<name> missing` or `<name> ambiguous` on failure
+    for commit, line in zip(hashes, output.splitlines()):
+        name, _, kind = line.rpartition(" ")
+        resolved[commit] = ("", kind) if kind in ("missing", "ambiguous") else (name, kind)
+
+    return resolved
+
+
+def list_parents(path: str, tips: Iterable[str]) -> dict[str, tuple[str, ...]]:
+    """
+    Lists the history of the given commits with a single ``git rev-list --parents --topo-order``.
+
+    :param path: Disk path to the repository
+    :param tips: Full hashes of the commits whose history to list
+    :return: Mapping from every commit in the history to its parents, with every commit before its parents
+    """
+
+    tips = list(dict.fromkeys(tips))
+
+    if not tips:
+        return {}
+
+    output = _git(path, "rev-list", "--parents", "--topo-order", *tips)
+    return {commit: tuple(parents) for commit, *parents in map(str.split, output.splitlines())}
+
+
+def ancestors(parents: dict[str, tuple[str, ...]], commit: str) -> set[str]:
+    """
+    Returns a commit and all of its ancestors.
+    """
+
+    seen = {commit}
+    stack = [commit]
+
+    while stack:
+        for parent in parents.get(stack.pop(), ()):
+            if parent not in seen:
+                seen.add(parent)
+                stack.append(parent)
+
+    return seen
+
+
+def expand_range(parents: dict[str, tuple[str, ...]], start: str, end: str) -> tuple[str, ...]:
+    """
+    Expands a range of commits like ``git rev-list start..end``, i.e. the commits reachable from the end but not from
+    the start.
+
+    Walks the history from the newer of the two commits, painting the commits reachable from the end and from the
+    start, and stops as soon as no commit reachable only from the end is left to walk, so that short ranges in long
+    histories are cheap to expand.
+
+    :param parents: History containing both commits, as listed by ``list_parents``
+    :param start: Full hash of the start of the range, which is not part of the range
+    :param end: Full hash of the end of the range
+    :return: Full hashes of the commits in the range, newest commit first
+    """
+
+    order = list(parents)
+    flags = {end: _FROM_END}
+    flags[start] = flags.get(start, 0) | _FROM_START
+    # number of commits reachable only from the end that have not been walked yet
+    pending = int(flags[end] == _FROM_END)
+    commits = []
+
+    for commit in itertools.islice(order, min(order.index(start), order.index(end)), None):
+        if not pending:
+            break
+
+        flag = flags.get(commit)
+
+        if flag is None:
+            continue
+
+        if flag == _FROM_END:
+            commits.append(commit)
+            pending -= 1
+
+        for parent in parents[commit]:
+            old = flags.get(parent, 0)
+            new = flags[parent] = old | flag
+
+            if old != new:
+                pending += (new == _FROM_END) - (old == _FROM_END)
+
+    return tuple(commits)
+
+
+def resolve_head(path: str, branch: str = "") -> str:
+    """
+    Resolves the commit a branch points to.
+
+    :param path: Disk path to the repository
+    :param branch: Branch to resolve, or an empty string for the checked out branch
+    :return: Full hash of the commit
+    :raises CommitError: If the repository or branch does not exist
+    """
+
+    if not os.path.isdir(path):
+        raise CommitError("Disk path does not exist")
+
+    if branch and not is_valid_branch(branch):
+        raise CommitError(f"`{branch}` is not a valid branch name")
+
+    try:
+        return _git(path, "rev-parse", "--verify", "--quiet", f"{branch or 'HEAD'}^{{commit}}").strip()
+    except CommitError:
+        raise CommitError(f"Branch `{branch}` does not exist" if branch else "Repository has no commits")
+
+
+def check_entries(path: str, branch: str, entries: Iterable[str], expand: bool = False,
+                  head: str | None = None) -> dict[str, CommitCheck]:
+    """
+    Checks that every entry of ``ignore_commits_list`` refers to commits of the branch.
+
+    :param path: Disk path to the repository
+    :param branch: Branch whose commits are ignored, or an empty string for the checked out branch
+    :param entries: Full or partial commit hashes, or ranges of commits separated by ``..``
+    :param expand: Whether to list the commits of every range
+    :param head: Full hash of the commit the branch points to, if it has already been resolved
+    :return: Mapping from each entry to its CommitCheck
+    :raises CommitError: If the repository or branch cannot be read
+    """
+
+    entries = list(dict.fromkeys(entries))
+    parsed = {entry: parse_entry(entry) for entry in entries}
+    resolved = resolve_hashes(path, (commit for hashes in parsed.values() if hashes for commit in hashes))
+
+    def describe(commit: str) -> str | None:
+        kind = resolved[commit][1]
+        if kind == "missing":
+            return f"`{commit}` does not exist"
+        if kind == "ambiguous":
+            return f"`{commit}` is ambiguous, enter more of the hash"
+        if kind != "commit":
+            return f"`{commit}` is a {kind}, not a commit"
+        return None
+
+    checks = {}
+    found = {}
+
+    for entry, hashes in parsed.items():
+        if hashes is None:
+            checks[entry] = CommitCheck(entry, False, "Not a commit hash or a range of commit hashes")
+            continue
+
+        problems = [problem for problem in map(describe, hashes) if problem]
+
+        if problems:
+            checks[entry] = CommitCheck(entry, False, "; ".join(problems))
+        else:
+            found[entry] = tuple(resolved[commit][0] for commit in hashes)
+
+    if not found:
+        return {entry: checks[entry] for entry in entries}
+
+    head = head or resolve_head(path, branch)
+    parents = list_parents(path, [head, *(full for hashes in found.values() for full in hashes)])
+    on_branch = ancestors(parents, head)
+
+    for entry, hashes in found.items():
+        if len(hashes) == 1:
+            commit = hashes[0]
+            checks[entry] = CommitCheck(entry, commit in on_branch, "Commit found" if commit in on_branch else
+                                        f"Commit is not on branch `{branch or 'HEAD'}`", hashes)
+            continue
+
+        start, end = hashes
+
+        if end not in on_branch:
+            checks[entry] = CommitCheck(entry, False, f"End of range is not on branch `{branch or 'HEAD'}`")
+            continue
+
+        commits = expand_range(parents, start, end)
+
+        if not commits:
+            checks[entry] = CommitCheck(entry, False, "Range is empty, the end must come after the start")
+        else:
+            checks[entry] = CommitCheck(entry, True, f"Range of {len(commits)} commits", commits if expand else ())
+
+    return {entry: checks[entry] for entry in entries}
+
+
+class CommitValidator:
+    """
+    Caches the checks of the most recently validated repositories by the commit their branch points to.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._checks: OrderedDict[tuple[str, str, bool], dict[str, CommitCheck]] = OrderedDict()
+
+    def validate(self, path: str, branch: str, entries: Iterable[str], expand: bool = False) -> dict[str, CommitCheck]:
+        """
+        Checks the entries of ``ignore_commits_list``, only running ``git`` for the entries not checked before at the
+        commit the branch points to.
+
+        :param path: Disk path to the repository
+        :param branch: Branch whose commits are ignored, or an empty string for the checked out branch
+        :param entries: Full or partial commit hashes, or ranges of commits separated by ``..``
+        :param expand: Whether to list the commits of every range
+        :return: Mapping from each entry to its CommitCheck
+        :raises CommitError: If the repository or branch cannot be read
+        """
+
+        entries = list(dict.fromkeys(entries))
+        key = (path, resolve_head(path, branch), expand)
+
+        with self._lock:
+            cached = self._checks.setdefault(key, {})
+            self._checks.move_to_end(key)
+            missing = [entry for entry in entries if entry not in cached]
+
+        if missing:
+            checks = check_entries(path, branch, missing, expand, head=key[1])
+
+            with self._lock:
+                cached.update(checks)
+                while len(self._checks) > self.max_size:
+                    self._checks.popitem(last=False)
+
+        return {entry: cached[entry] for entry in entries}
@@ -0,0 +1,215 @@
+"""
+Checks the config files against each other, before they are downloaded or exported.
+
+Each configurator page writes its config file on its own, so nothing stops ``author-config.csv`` from naming a
+repository or branch that ``repo-config.csv`` does not analyse, or an author whose commits ``repo-config.csv``
+ignores. The checker indexes every config by repository, branch and author once, and then looks every reference up in
+the indexes, so that checking takes linear time in the number of rows of all the configs.
+
+The configs are given in the same form mappings that the configurator pages build, e.g. as parsed from the generated
+files by ``parse_config_files``.
+"""
+
+from typing import NamedTuple
+
+from utils import converters, parsers
+from utils.identity import canonical_email, canonical_repo
+
+ERROR = "error"
+WARNING = "warning"
+
+_PARSERS = {
+    "repo-config.csv": parsers.parse_repo_config_csv,
+    "author-config.csv": parsers.parse_author_config_csv,
+    "group-config.csv": parsers.parse_group_config_csv,
+    "config.json": parsers.parse_config_json,
+}
+
+
+class Issue(NamedTuple):
+    severity: str  # error or warning
+    config: str
+    entry: str
+    message: str
+
+
+def parse_config_files(files: dict[str, bytes | str]) -> dict[str, dict]:
+    """
+    Parses the generated config files back into the form mappings of the configurator pages.
+
+    :param files: Mapping from config file name to its contents
+    :return: Mapping from config file name to its form mapping, for the config files that can be checked
+    """
+
+    return {name: _PARSERS[name](data.encode("utf-8") if isinstance(data, str) else data)
+            for name, data in files.items() if name in _PARSERS}
+
+
+def _entry(repo: str, key: str = "") -> str:
+    return f"{repo} / {key}" if key else repo
+
+
+class _RepoIndex:
+    """
+    Index of the repositories and branches analysed by ``repo-config.csv``.
+    """
+
+    def __init__(self, repo_config: dict[str, dict[str, dict]]):
+        self.branches = {repo: set(branches) for repo, branches in repo_config.items()}
+        # the location each repository is entered with, to tell a misspelt repository from an unknown one
+        self.locations = {canonical_repo(repo): repo for repo in repo_config}
+        self.ignored_authors = {
+            (repo, branch): set(configs.get("ignore_authors_list") or ())
+            for repo, branches in repo_config.items() for branch, configs in branches.items()
+        }
+        self._repo_ignored: dict[str, set[str]] = {}
+
+    def repo_problem(self, repo: str) -> str | None:
+        if repo in self.branches:
+            return None
+
+        location = self.locations.get(canonical_repo(repo))
+        if location is not None:
+            return f"is entered as `{location}` in repo-config.csv, which RepoSense treats as a different repository"
+
+        return "is not in repo-config.csv, so it is not analysed"
+
+    def ignored(self, repo: str, branch: str) -> set[str]:
+        if branch:
+            return self.ignored_authors.get((repo, branch), set())
+
+        # authors without a branch apply to every branch of the repository
+        if repo not in self._repo_ignored:
+            self._repo_ignored[repo] = set().union(*(self.ignored_authors[(repo, name)]
+                                                     for name in self.branches.get(repo, ())))
+
+        return self._repo_ignored[repo]
+
+
+def _check_repo_config(repo_config: dict[str, dict[str, dict]]) -> list[Issue]:
+    issues = []
+    default_limit = converters.REPO_CONFIG_DEFAULTS["file_size_limits"]
+
+    for repo, branches in repo_config.items():
+        for branch, configs in branches.items():
+            limit = configs.get("file_size_limits")
+
+            if configs.get("ignore_file_size_limits") and limit and limit != default_limit:
+                issues.append(Issue(WARNING, "repo-config.csv", _entry(repo, branch),
+                                    "File Size Limit has no effect, since Ignore File Size Limit is set"))
+
+    return issues
+
+
+def _check_author_config(author_config: dict[str, dict[str, dict]], repos: _RepoIndex | None) -> list[Issue]:
+    issues = []
+    # author claiming each email in each repository
+    claimed: dict[tuple[str, str], str] = {}
+
+    for repo, branches in author_config.items():
+        problem = repos.repo_problem(repo) if repos is not None else None
+
+        if problem is not None:
+            issues.append(Issue(ERROR, "author-config.csv", repo, f"Repository {problem}"))
+
+        for branch, configs in branches.items():
+            entry = _entry(repo, branch)
+            author = configs.get("author_git_host_id") or ""
+
+            if repos is not None and problem is None and branch and branch not in repos.branches[repo]:
+                issues.append(Issue(ERROR, "author-config.csv", entry,
+                                    f"Branch `{branch}` is not in repo-config.csv for this repository, so it is not "
+                                    f"analysed"))
+
+            if repos is not None and problem is None:
+                ignored = repos.ignored(repo, branch).intersection([author, *(configs.get("git_author_name") or ())])
+
+                if ignored:
+                    issues.append(Issue(WARNING, "author-config.csv", entry,
+                                        f"Author `{author}` is ignored by the Ignore Authors List of repo-config.csv "
+                                        f"as {', '.join(f'`{name}`' for name in sorted(ignored))}"))
+
+            for email in configs.get("author_emails") or ():
+                other = claimed.setdefault((canonical_repo(repo), canonical_email(email)), author)
+
+                if other != author:
+                    issues.append(Issue(ERROR, "author-config.csv", entry,
+                                        f"Email `{email}` of `{author}` is also an email of `{other}` in this "
+                                        f"repository"))
+
+    return issues
+
+
+def _check_group_config(group_config: dict[str, dict[str, dict]], repos: _RepoIndex | None) -> list[Issue]:
+    if repos is None:
+        return []
+
+    return [Issue(ERROR, "group-config.csv", repo, f"Repository {problem}")
+            for repo in group_config if (problem := repos.repo_problem(repo)) is not None]
+
+
+def _check_config_json(config: dict, author_config: dict[str, dict[str, dict]] | None) -> list[Issue]:
+    issues = []
+    ignored = set(config.get("ignoreAuthorList") or ())
+    claimed: dict[str, str] = {}
+    # display name of each author in author-config.csv
+    display_names = {
+        configs.get("author_git_host_id"): configs.get("author_display_name")
+        for branches in (author_config or {}).values() for configs in branches.values()
+    }
+
+    for author in (config.get("authors") or {}).values():
+        git_id = author.get("gitId") or ""
+        names = ignored.intersection([git_id, *(author.get("authorNames") or ())])
+
+        if names:
+            issues.append(Issue(WARNING, "config.json", git_id,
+                                f"Author `{git_id}` is ignored by the Ignore Authors List of config.json as "
+                                f"{', '.join(f'`{name}`' for name in sorted(names))}"))
+
+        for email in author.get("emails") or ():
+            other = claimed.setdefault(canonical_email(email), git_id)
+
+            if other != git_id:
+                issues.append(Issue(ERROR, "config.json", git_id,
+                                    f"Email `{email}` of `{git_id}` is also an email of `{other}`"))
+
+        display_name = display_names.get(git_id)
+        if display_name and author.get("displayName") and display_name != author["displayName"]:
+            issues.append(Issue(WARNING, "config.json", git_id,
+                                f"Display name `{author['displayName']}` differs from `{display_name}` in "
+                                f"author-config.csv"))
+
+    return issues
+
+
+def check_configs(configs: dict[str, dict]) -> list[Issue]:
+    """
+    Checks the configs against each other: that the repositories and branches of ``author-config.csv`` and
+    ``group-config.csv`` are analysed by ``repo-config.csv``, that no author is also ignored, that no email belongs to
+    two authors and that no setting is overridden by another.
+
+    Configs that are absent are not checked against, e.g. the repositories of ``author-config.csv`` are only checked
+    when there is a ``repo-config.csv``.
+
+    :param configs: Mapping from config file name to its form mapping
+    :return: Issues found, ordered by config
+    """
+
+    repo_config = configs.get("repo-config.csv")
+    repos = _RepoIndex(repo_config) if repo_config else None
+    issues = []
+
+    if repo_config:
+        issues += _check_repo_config(repo_config)
+
+    if configs.get("author-config.csv"):
+        issues += _check_author_config(configs["author-config.csv"], repos)
+
+    if configs.get("group-config.csv"):
+        issues += _check_group_config(configs["group-config.csv"], repos)
+
+    if configs.get("config.json"):
+        issues += _check_config_json(configs["config.json"], configs.get("author-config.csv"))
+
+    return issues
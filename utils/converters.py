@@ -0,0 +1,298 @@
+"""
+Streamlit-free conversion functions for turning form mappings into RepoSense config files.
+
+These functions have no side effects so that they can be reused outside of the Streamlit app, e.g. by the headless
+batch generator in ``generate_configs.py``.
+"""
+
+import csv
+import io
+import json
+import os
+from typing import BinaryIO, Iterable, Iterator
+
+
+REPO_CONFIG_HEADERS = ["Repository's Location", "Branch", "File formats", "Ignore Glob List",
+                       "Ignore standalone config", "Ignore Commits List", "Ignore Authors List", "Shallow Cloning",
+                       "Find Previous Authors", "File Size Limit", "Ignore File Size Limit",
+                       "Skip Ignored File Analysis"]
+AUTHOR_CONFIG_HEADERS = ["Repository's Location", "Branch", "Author's Git Host ID", "Author's Emails",
+                         "Author's Display Name", "Author's Git Author Name", "Ignore Glob List"]
+GROUP_CONFIG_HEADERS = ["Repository's Location", "Group Name", "Globs"]
+
+# defaults of each field, matching the initial values of the widgets in the configurator pages
+REPO_CONFIG_DEFAULTS = {
+    "file_fmts": [],
+    "ignore_glob_lists": [],
+    "ignore_commits_list": [],
+    "ignore_authors_list": [],
+    "find_prev_authors": False,
+    "ignore_standalone_configs": False,
+    "shallow_cloning": False,
+    "ignore_file_size_limits": False,
+    "skip_ignored_file_analysis": False,
+    "file_size_limits": 500000,
+}
+AUTHOR_CONFIG_DEFAULTS = {
+    "author_git_host_id": "",
+    "author_emails": [],
+    "author_display_name": "",
+    "git_author_name": [],
+    "ignore_glob_lists": [],
+}
+GROUP_CONFIG_DEFAULTS = {
+    "glob_lists": [],
+}
+
+
+def write_csv(rows: Iterable[list], headers: list[str], f: BinaryIO) -> None:
+    """
+    Streams rows into a binary file as CSV, matching the format previously produced by ``pandas.DataFrame.to_csv``.
+
+    Rows are encoded and written one at a time, so memory usage does not grow with the number of rows.
+
+    :param rows: Iterable of rows to write
+    :param headers: Header row of the CSV file
+    :param f: Binary file or buffer to write to
+    """
+
+    stream = io.TextIOWrapper(f, encoding="utf-8", newline="")
+
+    try:
+        writer = csv.writer(stream, lineterminator=os.linesep)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    finally:
+        # hand the underlying file back to the caller instead of closing it along with the wrapper
+        stream.detach()
+
+
+def encode_csv_rows(rows: Iterable[list]) -> Iterator[bytes]:
+    """
+    Encodes every row into its own CSV line, in the same format as ``write_csv``.
+
+    Concatenating the encoded header and rows gives the same bytes as writing them together, which allows the lines
+    of unchanged rows to be reused when a config is serialized again.
+
+    :param rows: Iterable of rows to encode
+    :return: Iterator of the encoded lines
+    """
+
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer, lineterminator=os.linesep)
+
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def repo_config_row(repo_url: str, branch: str, configs: dict) -> list:
+    """
+    Generates the row of repo-config.csv for a single branch of a repository.
+
+    :param repo_url: Remote Repo URL or Disk Path to the repository
+    :param branch: Branch of the repository
+    :param configs: Configurations of the branch
+    :return: Row of the CSV file
+    """
+
+    return [
+        repo_url,
+        branch,
+        ";".join(configs["file_fmts"]),
+        ";".join(configs["ignore_glob_lists"]),
+        "yes" if configs["ignore_standalone_configs"] else "",
+        ";".join(configs["ignore_commits_list"]),
+        ";".join(configs["ignore_authors_list"]),
+        "yes" if configs["shallow_cloning"] else "",
+        "yes" if configs["find_prev_authors"] else "",
+        0 if configs["file_size_limits"] < 0 else configs["file_size_limits"],
+        "yes" if configs["ignore_file_size_limits"] else "",
+        "yes" if configs["skip_ignored_file_analysis"] else ""
+    ]
+
+
+def author_config_row(repo_url: str, branch: str, configs: dict) -> list:
+    """
+    Generates the row of author-config.csv for a single author of a branch.
+
+    :param repo_url: Remote Repo URL or Disk Path to the repository
+    :param branch: Branch of the repository
+    :param configs: Details of the author
+    :return: Row of the CSV file
+    """
+
+    return [
+        repo_url,
+        branch,
+        configs["author_git_host_id"],
+        ";".join(configs["author_emails"]),
+        configs["author_display_name"],
+        ";".join(configs["git_author_name"]),
+        ";".join(configs["ignore_glob_lists"])
+    ]
+
+
+def group_config_row(repo_url: str, group: str, configs: dict) -> list:
+    """
+    Generates the row of group-config.csv for a single group of a repository.
+
+    :param repo_url: Remote Repo URL or Disk Path to the repository
+    :param group: Name of the group
+    :param configs: Globs of the group
+    :return: Row of the CSV file
+    """
+
+    return [
+        repo_url,
+        group,
+        ";".join(configs["glob_lists"]),
+    ]
+
+
+def iter_repo_config_rows(repoinfo: dict[str, dict[str, dict]]) -> Iterator[list]:
+    """
+    Generates the rows of repo-config.csv from the repo-config map of the form.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and configurations.
+    :return: Iterator of rows
+    """
+
+    for repo_url, branches in repoinfo.items():
+        for branch, configs in branches.items():
+            yield repo_config_row(repo_url, branch, configs)
+
+
+def iter_author_config_rows(repoinfo: dict[str, dict[str, dict]]) -> Iterator[list]:
+    """
+    Generates the rows of author-config.csv from the author-config map of the form.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and authors.
+    :return: Iterator of rows
+    """
+
+    for repo_url, branches in repoinfo.items():
+        for branch, configs in branches.items():
+            yield author_config_row(repo_url, branch, configs)
+
+
+def iter_group_config_rows(repoinfo: dict[str, dict[str, dict]]) -> Iterator[list]:
+    """
+    Generates the rows of group-config.csv from the group-config map of the form.
+
+    :param repoinfo: Dictionary containing the repository name to group info and globs.
+    :return: Iterator of rows
+    """
+
+    for repo_url, groups in repoinfo.items():
+        for group, configs in groups.items():
+            yield group_config_row(repo_url, group, configs)
+
+
+def write_repo_config_csv(repoinfo: dict[str, dict[str, dict]], f: BinaryIO) -> None:
+    """
+    Streams the repo-config map from the form into a binary file as CSV.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and configurations.
+    :param f: Binary file or buffer to write to
+    """
+
+    write_csv(iter_repo_config_rows(repoinfo), REPO_CONFIG_HEADERS, f)
+
+
+def write_author_config_csv(repoinfo: dict[str, dict[str, dict]], f: BinaryIO) -> None:
+    """
+    Streams the author-config map from the form into a binary file as CSV.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and authors.
+    :param f: Binary file or buffer to write to
+    """
+
+    write_csv(iter_author_config_rows(repoinfo), AUTHOR_CONFIG_HEADERS, f)
+
+
+def write_group_config_csv(repoinfo: dict[str, dict[str, dict]], f: BinaryIO) -> None:
+    """
+    Streams the group-config map from the form into a binary file as CSV.
+
+    :param repoinfo: Dictionary containing the repository name to group info and globs.
+    :param f: Binary file or buffer to write to
+    """
+
+    write_csv(iter_group_config_rows(repoinfo), GROUP_CONFIG_HEADERS, f)
+
+
+def convert_repo_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+    """
+    Converts the repo-config map from the form into a CSV file.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and configurations.
+    :return: Bytes object
+    """
+
+    buffer = io.BytesIO()
+    write_repo_config_csv(repoinfo, buffer)
+    return buffer.getvalue()
+
+
+def convert_author_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+    """
+    Converts the author-config map from the form into a CSV file.
+
+    :param repoinfo: Dictionary containing the repository name to branch info and authors.
+    :return: Bytes object
+    """
+
+    buffer = io.BytesIO()
+    write_author_config_csv(repoinfo, buffer)
+    return buffer.getvalue()
+
+
+def convert_group_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+    """
+    Converts the group-config map from the form into a CSV file.
+
+    :param repoinfo: Dictionary containing the repository name to group info and globs.
+    :return: Bytes object
+    """
+
+    buffer = io.BytesIO()
+    write_group_config_csv(repoinfo, buffer)
+    return buffer.getvalue()
+
+
+def convert_report_config_json_to_json(repoinfo: dict[str, str]) -> str:
+    """
+    Converts the report-config.json mapping to a JSON file.
+
+    :param repoinfo: Dictionary containing JSON-serializable data to turn into a JSON file
+    :return: JSON string
+    """
+
+    return json.dumps(repoinfo, ensure_ascii=False, indent=4)
+
+
+def prepare_config_json(repoinfo: dict) -> dict:
+    """
+    Flattens the authors mapping of the config.json form into the list expected by RepoSense.
+
+    :param repoinfo: Dictionary containing the config.json form data
+    :return: Copy of the form data with authors stored as a list
+    """
+
+    repoinfo_copy = repoinfo.copy()
+    repoinfo_copy["authors"] = list(repoinfo_copy["authors"].values())
+    return repoinfo_copy
+
+
+def convert_config_json_to_json(repoinfo: dict) -> str:
+    """
+    Converts the config.json mapping to a JSON file.
+
+    :param repoinfo: Dictionary containing JSON-serializable data to turn into a JSON file
+    :return: JSON string
+    """
+
+    return json.dumps(prepare_config_json(repoinfo), ensure_ascii=False, indent=4)
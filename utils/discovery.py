@@ -0,0 +1,297 @@
+"""
+Discovers the authors of repositories on the disk from their ``git`` history, to propose author configurations.
+
+Each repository is scanned by its own ``git log`` process, driven from a bounded thread pool, and the number of
+commits of every author name and email pair is cached by the repository's HEAD commit. Scanning a repository again
+only reads the commits made since the cached HEAD, as long as the cached HEAD is still part of the history.
+
+A pool of Python worker processes is deliberately not used: Streamlit runs each page as ``__main__``, which the
+``spawn`` and ``forkserver`` start methods re-execute in every worker, and forking the multi-threaded server is
+unsafe. The history is read and counted by ``git`` and ``collections.Counter``, so threads are not held back by
+the GIL.
+"""
+
+import os
+import re
+import subprocess
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, NamedTuple
+
+from utils.identity import is_valid_branch
+
+DISCOVERY_WORKERS = int(os.environ.get("REPOCONFIG_DISCOVERY_WORKERS", os.cpu_count() or 1))
+
+# GitHub's noreply addresses contain the username of the author, e.g. 12345+octocat@users.noreply.github.com
+_NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$", re.IGNORECASE)
+
+
+class DiscoveryError(Exception):
+    """
+    Raised when a repository cannot be scanned.
+    """
+
+
+class RepoAuthors(NamedTuple):
+    head: str
+    branch: str
+    # number of commits of each author, keyed by the author's name and email joined by a NUL character
+    identities: dict[str, int]
+
+
+class AuthorProposal(NamedTuple):
+    git_host_id: str
+    display_name: str
+    emails: tuple[str, ...]
+    git_author_names: tuple[str, ...]
+    commits: int
+
+    def to_author_config(self, ignore_glob_lists: list[str] | None = None) -> dict:
+        """
+        Converts the proposal into the author configurations of the author-config form.
+
+        :param ignore_glob_lists: Globs to ignore for the author
+        :return: Dictionary of the author's configurations
+        """
+
+        return {
+            "author_git_host_id": self.git_host_id,
+            "author_emails": list(self.emails),
+            "author_display_name": self.display_name,
+            "git_author_name": list(self.git_author_names),
+            "ignore_glob_lists": list(ignore_glob_lists or []),
+        }
+
+    def to_config_json(self, ignore_glob_lists: list[str] | None = None) -> dict:
+        """
+        Converts the proposal into an author of the config.json form.
+
+        :param ignore_glob_lists: Globs to ignore for the author
+        :return: Dictionary of the author's details
+        """
+
+        return {
+            "gitId": self.git_host_id,
+            "emails": list(self.emails),
+            "displayName": self.display_name,
+            "authorNames": list(self.git_author_names),
+            "ignoreGlobList": list(ignore_glob_lists or []),
+        }
+
+
+def _git(path: str, *args: str) -> str:
+    process = subprocess.run(
+        ["git", "-C", path, *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        stdin=subprocess.DEVNULL,
+    )
+
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise DiscoveryError(lines[0] if lines else f"`git {args[0]}` exited with {process.returncode}")
+
+    return process.stdout
+
+
+def scan_repository(path: str, branch: str = "", since: str | None = None) -> tuple[RepoAuthors, bool]:
+    """
+    Counts the commits of every author of a branch, optionally only since a previously scanned commit.
+
+    :param path: Disk path to the repository
+    :param branch: Branch to scan, or an empty string for the checked out branch
+    :param since: Previously scanned HEAD commit of the branch
+    :return: Tuple of the RepoAuthors of the scanned commits, and True if only the commits since ``since`` were
+             scanned
+    """
+
+    if not os.path.isdir(path):
+        raise DiscoveryError("Disk path does not exist")
+
+    if branch and not is_valid_branch(branch):
+        raise DiscoveryError(f"`{branch}` is not a valid branch name")
+
+    try:
+        head = _git(path, "rev-parse", "--verify", "--quiet", f"{branch or 'HEAD'}^{{commit}}").strip()
+    except DiscoveryError:
+        raise DiscoveryError(f"Branch `{branch}` does not exist" if branch else "Repository has no commits")
+
+    if not branch:
+        branch = _git(path, "rev-parse", "--abbrev-ref", "HEAD").strip()
+
+    if since == head:
+        return RepoAuthors(head, branch, {}), True
+
+    # a rewritten history, e.g. after a force push, is scanned again from the start
+    incremental = since is not None and subprocess.run(
+        ["git", "-C", path, "merge-base", "--is-ancestor", since, head],
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+    ).returncode == 0
+
+    log = _git(path, "log", "--no-mailmap", "--format=%an%x00%ae", f"{since}..{head}" if incremental else head)
+    return RepoAuthors(head, branch, dict(Counter(log.splitlines()))), incremental
+
+
+def guess_git_host_id(emails: Iterable[str], names: Iterable[str]) -> str:
+    """
+    Guesses the username of an author on their git host from their emails, falling back to their names.
+
+    :param emails: Emails of the author, most used first
+    :param names: Git author names of the author, most used first
+    :return: Guessed username
+    """
+
+    emails = list(emails)
+
+    for email in emails:
+        match = _NOREPLY_EMAIL.match(email)
+        if match:
+            return match.group(1)
+
+    for name in names:
+        if name and " " not in name:
+            return name
+
+    return emails[0].partition("@")[0] if emails else ""
+
+
+def propose_authors(identities: dict[str, int]) -> list[AuthorProposal]:
+    """
+    Groups the identities found in the history into authors, merging identities that share a name or an email.
+
+    :param identities: Number of commits of each author name and email pair
+    :return: Proposed authors, most commits first
+    """
+
+    parents = {}
+
+    def find(node):
+        parents.setdefault(node, node)
+
+        while parents[node] != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+
+        return node
+
+    pairs = []
+
+    for identity, commits in identities.items():
+        name, _, email = identity.partition("\0")
+        pairs.append((name, email, commits))
+        parents[find(("name", name))] = find(("email", email.lower()))
+
+    groups = {}
+
+    for name, email, commits in pairs:
+        names, emails = groups.setdefault(find(("name", name)), (Counter(), Counter()))
+        names[name] += commits
+        emails[email] += commits
+
+    proposals = []
+
+    for names, emails in groups.values():
+        ranked_names = [name for name, _ in names.most_common() if name]
+        ranked_emails = [email for email, _ in emails.most_common() if email]
+        proposals.append(AuthorProposal(
+            guess_git_host_id(ranked_emails, ranked_names),
+            ranked_names[0] if ranked_names else "",
+            tuple(ranked_emails),
+            tuple(ranked_names),
+            sum(names.values()),
+        ))
+
+    proposals.sort(key=lambda proposal: -proposal.commits)
+    return proposals
+
+
+# the scanned branch of a repository and the authors proposed from its history
+DiscoveredAuthors = tuple[str, list[AuthorProposal]]
+
+
+class AuthorDiscovery:
+    """
+    Scans repositories on a bounded thread pool, caching the authors of each repository and branch by its HEAD commit.
+
+    Scans of the same repository and branch, e.g. from two sessions, take turns, so that each one reads the cache,
+    scans the commits since the cached HEAD and merges them into the cache before the next one starts, and no commit is
+    counted twice.
+    """
+
+    def __init__(self, max_workers: int = DISCOVERY_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, str], RepoAuthors] = {}
+        self._repo_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="discovery")
+
+            return self._executor
+
+    def _scan(self, path: str, branch: str) -> RepoAuthors:
+        with self._lock:
+            repo_lock = self._repo_locks.setdefault((path, branch), threading.Lock())
+
+        with repo_lock:
+            cached = self._cache.get((path, branch))
+            scanned, incremental = scan_repository(path, branch, cached.head if cached else None)
+
+            if incremental and cached is not None:
+                identities = Counter(cached.identities)
+                identities.update(scanned.identities)
+                scanned = RepoAuthors(scanned.head, scanned.branch, dict(identities))
+
+            with self._lock:
+                self._cache[path, branch] = scanned
+
+            return scanned
+
+    def scan(self, repos: Iterable[tuple[str, str]]) -> dict[tuple[str, str], RepoAuthors | str]:
+        """
+        Scans the repositories concurrently, only reading the commits made since their last scan.
+
+        :param repos: Tuples of the disk path to a repository and the branch to scan, or an empty string for the
+                      checked out branch
+        :return: Mapping from each repository and branch to its RepoAuthors, or the reason it could not be scanned
+        """
+
+        executor = self._get_executor()
+        futures = {(path, branch): executor.submit(self._scan, path, branch) for path, branch in dict.fromkeys(repos)}
+        results = {}
+
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except DiscoveryError as e:
+                results[key] = str(e)
+
+        return results
+
+    def discover(self, repos: Iterable[tuple[str, str]]) -> dict[tuple[str, str], DiscoveredAuthors | str]:
+        """
+        Proposes the authors of each repository and branch from its history.
+
+        :param repos: Tuples of the disk path to a repository and the branch to scan, or an empty string for the
+                      checked out branch
+        :return: Mapping from each repository and branch to a tuple of the scanned branch and its proposed authors,
+                 or the reason it could not be scanned
+        """
+
+        return {
+            key: result if isinstance(result, str) else (result.branch, propose_authors(result.identities))
+            for key, result in self.scan(repos).items()
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
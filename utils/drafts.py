@@ -0,0 +1,337 @@
+"""
+Persists the forms of the configurator pages as drafts in a local SQLite database, so that a browser refresh, a
+dropped connection or a server restart does not lose them.
+
+A draft is keyed by its id and holds the fields of the form of each page, e.g. one field per repository, each stored
+as JSON. An ``Autosaver`` saves the forms in a background thread once they have not changed for ``AUTOSAVE_DELAY``
+seconds, or at least every ``AUTOSAVE_MAX_DELAY`` seconds while they keep changing, and only writes the fields whose
+JSON changed since they were last saved. Restoring a draft reads all the fields of a page with a single query.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import Iterable, Iterator, NamedTuple
+
+from utils import storage
+
+DRAFTS_PATH = os.environ.get("REPOCONFIG_DRAFTS", os.path.join(storage.TEMP_DIR, "drafts.sqlite3"))
+DRAFT_TTL = float(os.environ.get("REPOCONFIG_DRAFT_TTL", 30 * 24 * 60 * 60))
+AUTOSAVE_DELAY = float(os.environ.get("REPOCONFIG_AUTOSAVE_DELAY", 2))
+AUTOSAVE_MAX_DELAY = float(os.environ.get("REPOCONFIG_AUTOSAVE_MAX_DELAY", 10))
+
+# number of pages of drafts whose saved fields are remembered, to find the changed fields without reading them back
+SAVED_CACHE_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    draft TEXT NOT NULL REFERENCES drafts (id) ON DELETE CASCADE,
+    page TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (draft, page, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS drafts_updated ON drafts (updated);
+"""
+
+
+class DraftInfo(NamedTuple):
+    id: str
+    created: float
+    updated: float
+    pages: list[str]
+    size: int  # bytes of JSON saved in the draft
+
+
+def encode(value) -> str:
+    """
+    :param value: Value of a field, made of JSON types
+    :return: Compact JSON of the value, which is the same for equal values
+    """
+
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _digest(position: int, text: str) -> bytes:
+    # a field that moved, e.g. after an earlier repository was removed, is written again with its new position
+    return hashlib.blake2b(f"{position}:{text}".encode("utf-8"), digest_size=16).digest()
+
+
+class DraftStore:
+    """
+    SQLite database of drafts. Safe to share between threads, since every operation uses its own connection.
+    """
+
+    def __init__(self, path: str = DRAFTS_PATH):
+        """
+        :param path: Path of the database, which is created if it does not exist
+        """
+
+        self.path = path
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode = WAL")
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.execute("PRAGMA foreign_keys = ON")
+            # with WAL, only checkpoints wait for the disk, which keeps autosaves cheap and the database consistent
+            db.execute("PRAGMA synchronous = NORMAL")
+
+            with db:
+                yield db
+
+    def write(self, draft: str, page: str, changed: dict[str, tuple[int, str]], removed: list[str] = ()):
+        """
+        Writes the changed fields of a page of a draft in a single transaction, creating the draft if needed.
+
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :param changed: Mapping from name to position in the form and JSON of the fields that changed
+        :param removed: Names of the fields that were removed
+        """
+
+        now = time.time()
+
+        with self._connect() as db:
+            db.execute("INSERT INTO drafts VALUES (?, ?, ?) ON CONFLICT (id) DO UPDATE SET updated = excluded.updated",
+                       (draft, now, now))
+            db.executemany("INSERT OR REPLACE INTO fields VALUES (?, ?, ?, ?, ?)",
+                           ((draft, page, name, position, value) for name, (position, value) in changed.items()))
+            db.executemany("DELETE FROM fields WHERE draft = ? AND page = ? AND name = ?",
+                           ((draft, page, name) for name in removed))
+
+    def read(self, draft: str, page: str) -> dict[str, str]:
+        """
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :return: Mapping from name to JSON of the fields of the page, in the order of the form
+        """
+
+        with self._connect() as db:
+            return dict(db.execute("SELECT name, value FROM fields WHERE draft = ? AND page = ? ORDER BY position",
+                                   (draft, page)))
+
+    def load(self, draft: str, page: str) -> dict[str, object]:
+        """
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :return: Mapping from name to value of the fields of the page, empty if the draft has none
+        """
+
+        return {name: json.loads(value) for name, value in self.read(draft, page).items()}
+
+    def list_drafts(self, ids: Iterable[str], limit: int = 100) -> list[DraftInfo]:
+        """
+        :param ids: Ids of the drafts to list, e.g. the drafts of a session
+        :param limit: Maximum number of drafts to list
+        :return: Latest updated drafts among the given ones, from the most recently updated
+        """
+
+        ids = list(dict.fromkeys(ids))
+
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, created, updated, group_concat(DISTINCT page), coalesce(sum(length(value)), 0) "
+                "FROM drafts LEFT JOIN fields ON fields.draft = drafts.id "
+                f"WHERE id IN ({', '.join('?' * len(ids))}) "
+                "GROUP BY id ORDER BY updated DESC LIMIT ?", (*ids, limit)
+            ).fetchall()
+
+        return [DraftInfo(draft, created, updated, sorted(pages.split(",")) if pages else [], size)
+                for draft, created, updated, pages, size in rows]
+
+    def delete(self, draft: str):
+        """
+        :param draft: Id of the draft to delete, along with all its fields
+        """
+
+        with self._connect() as db:
+            db.execute("DELETE FROM drafts WHERE id = ?", (draft,))
+
+    def purge(self, ttl: float = DRAFT_TTL) -> int:
+        """
+        Deletes the drafts that have not been updated within the TTL.
+
+        :param ttl: Maximum age in seconds of a draft since its last update
+        :return: Number of deleted drafts
+        """
+
+        with self._connect() as db:
+            return db.execute("DELETE FROM drafts WHERE updated < ?", (time.time() - ttl,)).rowcount
+
+
+class Autosaver:
+    """
+    Saves the forms of the pages of drafts in a background thread, debounced so that a burst of reruns, e.g. while
+    typing, is saved once. Safe to share between sessions.
+    """
+
+    def __init__(self, store: DraftStore, delay: float = AUTOSAVE_DELAY, max_delay: float = AUTOSAVE_MAX_DELAY):
+        """
+        :param store: Store to save the drafts to
+        :param delay: Seconds without changes to wait before saving a form
+        :param max_delay: Maximum seconds to wait before saving a form that keeps changing
+        """
+
+        self.store = store
+        self.delay = delay
+        self.max_delay = max_delay
+        # last error raised while saving, e.g. when the disk is full
+        self.error: Exception | None = None
+        # time the form of each page of each draft was first and last scheduled since it was last saved, and its fields
+        self._pending: dict[tuple[str, str], tuple[float, float, dict]] = {}
+        # digest of the JSON of each saved field of each page of each draft
+        self._saved: OrderedDict[tuple[str, str], dict[str, bytes]] = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, draft: str, page: str, fields: dict):
+        """
+        Schedules the form of a page to be saved, replacing the form scheduled before if it has not been saved yet.
+
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :param fields: Mapping from name to value of every field of the form, where the fields that are left out are
+                       removed from the draft
+        """
+
+        now = time.monotonic()
+
+        with self._condition:
+            first = self._pending.get((draft, page), (now,))[0]
+            self._pending[(draft, page)] = (first, now, dict(fields))
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="draft-autosave", daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+    def restore(self, draft: str, page: str) -> dict[str, object]:
+        """
+        Restores the form of a page from a draft, and remembers its fields as saved.
+
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :return: Mapping from name to value of the fields of the form, empty if the draft has none
+        """
+
+        texts = self.store.read(draft, page)
+        self.remember(draft, page, texts)
+        return {name: json.loads(text) for name, text in texts.items()}
+
+    def remember(self, draft: str, page: str, texts: dict[str, str]):
+        """
+        Remembers the fields of a page as saved, e.g. after the page is restored from the draft, so that they are not
+        written again.
+
+        :param draft: Id of the draft
+        :param page: Name of the page
+        :param texts: Mapping from name to JSON of the saved fields, in the order of the form
+        """
+
+        with self._condition:
+            self._remember((draft, page), {name: _digest(position, text)
+                                           for position, (name, text) in enumerate(texts.items())})
+
+    def _remember(self, key: tuple[str, str], digests: dict[str, bytes]):
+        self._saved[key] = digests
+        self._saved.move_to_end(key)
+
+        while len(self._saved) > SAVED_CACHE_SIZE:
+            self._saved.popitem(last=False)
+
+    def forget(self, draft: str):
+        """
+        Drops the pending and remembered forms of a draft, e.g. after it is deleted.
+
+        :param draft: Id of the draft
+        """
+
+        with self._condition:
+            for key in [key for key in self._pending if key[0] == draft]:
+                del self._pending[key]
+
+            for key in [key for key in self._saved if key[0] == draft]:
+                del self._saved[key]
+
+    def _due(self, now: float) -> float:
+        # seconds until the next pending form is due
+        return min(min(last + self.delay, first + self.max_delay) - now for first, last, _ in self._pending.values())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending or self._due(time.monotonic()) > 0:
+                    self._condition.wait(self._due(time.monotonic()) if self._pending else None)
+
+                now = time.monotonic()
+                due = {key: pending for key, pending in self._pending.items()
+                       if min(pending[1] + self.delay, pending[0] + self.max_delay) <= now}
+
+                for key in due:
+                    del self._pending[key]
+
+            for key, (first, last, fields) in due.items():
+                self._save(key, first, last, fields)
+
+    def _save(self, key: tuple[str, str], first: float, last: float, fields: dict):
+        try:
+            texts = {name: encode(value) for name, value in fields.items()}
+        except RuntimeError:
+            # the form was changed by its session while it was being encoded, so save it on the next attempt
+            with self._condition:
+                self._pending.setdefault(key, (first, last, fields))
+            return
+
+        with self._condition:
+            saved = self._saved.get(key)
+
+        try:
+            if saved is None:
+                saved = {name: _digest(position, text)
+                         for position, (name, text) in enumerate(self.store.read(*key).items())}
+
+            digests = {name: _digest(position, text) for position, (name, text) in enumerate(texts.items())}
+            changed = {name: (position, texts[name]) for position, (name, digest) in enumerate(digests.items())
+                       if saved.get(name) != digest}
+            removed = [name for name in saved if name not in digests]
+
+            if changed or removed:
+                self.store.write(*key, changed, removed)
+        except sqlite3.Error as e:
+            self.error = e
+            return
+
+        self.error = None
+
+        with self._condition:
+            self._remember(key, digests)
+
+    def flush(self):
+        """
+        Saves every pending form right away, e.g. before the server shuts down.
+        """
+
+        with self._condition:
+            pending, self._pending = self._pending, {}
+
+        for key, (first, last, fields) in pending.items():
+            self._save(key, first, last, fields)
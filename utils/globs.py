@@ -0,0 +1,350 @@
+"""
+Previews which files of a repository the ignore and group globs match, before RepoSense is run.
+
+The files of a repository are listed once with ``git ls-tree`` into a ``PathIndex``, which is cached by the sha of the
+listed tree. The index keeps the paths sorted, so the files under the literal directory prefix of a glob are found by
+binary search, and groups the files by extension, so that globs such as ``**/*.java`` only test the ``.java`` files.
+
+The files matched by each glob are kept as a bitmap over the sorted paths, stored in a Python ``int``, so counting the
+files matched by no glob or by two globs at the same time only takes a few bitwise operations. Matches are cached by
+glob, so editing one glob only matches that glob again.
+
+Globs follow the syntax of Java's ``PathMatcher``, which RepoSense uses: ``*`` and ``?`` do not cross directories,
+``**`` does, and ``{a,b}`` matches either alternative.
+"""
+
+import bisect
+import os
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
+
+from utils.identity import is_valid_branch
+
+INDEX_CACHE_SIZE = int(os.environ.get("REPOCONFIG_GLOB_INDEX_CACHE", 8))
+MATCH_CACHE_SIZE = 256
+
+_META = "*?[{\\"
+
+
+class GlobError(Exception):
+    """
+    Raised when a repository cannot be listed.
+    """
+
+
+class GlobPreview(NamedTuple):
+    total: int
+    # number of files matched by each glob
+    counts: dict[str, int]
+    # pairs of globs that match some of the same files, with the number of such files
+    overlaps: list[tuple[str, str, int]]
+    unmatched_count: int
+    unmatched_examples: list[str]
+
+
+def translate_glob(glob: str) -> str:
+    """
+    Translates a glob into a regular expression, following the semantics of Java's ``PathMatcher``.
+
+    :param glob: Glob to translate
+    :return: Regular expression matching the whole path
+    :raises ValueError: If the glob is malformed, e.g. has an unclosed ``[`` or ``{``
+    """
+
+    regex = []
+    in_group = False
+    i = 0
+
+    while i < len(glob):
+        char = glob[i]
+        i += 1
+
+        if char == "\\":
+            if i == len(glob):
+                raise ValueError(f"Glob `{glob}` ends with an escape character")
+            regex.append(re.escape(glob[i]))
+            i += 1
+        elif char == "*":
+            if i < len(glob) and glob[i] == "*":
+                regex.append(".*")
+                i += 1
+            else:
+                regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                raise ValueError(f"Glob `{glob}` has an unclosed `[`")
+            chars = glob[i:end]
+            negated = chars.startswith("!")
+            chars = chars[1:] if negated else chars
+            escaped = "".join("\\" + c if c in "\\^[]" else c for c in chars)
+            regex.append(f"[^/{escaped}]" if negated else f"(?!/)[{escaped}]")
+            i = end + 1
+        elif char == "{":
+            if in_group:
+                raise ValueError(f"Glob `{glob}` has a nested `{{`")
+            regex.append("(?:")
+            in_group = True
+        elif char == "}" and in_group:
+            regex.append(")")
+            in_group = False
+        elif char == "," and in_group:
+            regex.append("|")
+        else:
+            regex.append(re.escape(char))
+
+    if in_group:
+        raise ValueError(f"Glob `{glob}` has an unclosed `{{`")
+
+    return "".join(regex)
+
+
+@lru_cache(maxsize=1024)
+def compile_glob(glob: str) -> re.Pattern:
+    """
+    Compiles a glob into a regular expression, following the semantics of Java's ``PathMatcher``.
+
+    :param glob: Glob to compile
+    :return: Compiled regular expression matching the whole path
+    :raises ValueError: If the glob is malformed, e.g. has an unclosed ``[`` or ``{``
+    """
+
+    return re.compile(translate_glob(glob), re.DOTALL)
+
+
+def literal_prefix(glob: str) -> str:
+    """
+    Returns the literal directory prefix of a glob, which every path matched by the glob starts with.
+
+    :param glob: Glob to inspect
+    :return: Prefix up to and including the last ``/`` before the first special character, or the whole glob if it
+             has no special characters
+    """
+
+    first_meta = min((glob.find(char) for char in _META if char in glob), default=-1)
+
+    if first_meta == -1:
+        return glob
+
+    return glob[:glob.rfind("/", 0, first_meta) + 1]
+
+
+def literal_extension(glob: str) -> str | None:
+    """
+    Returns the extension every path matched by the glob ends with, if the glob ends with a literal extension.
+
+    :param glob: Glob to inspect
+    :return: Extension without the dot, or None if the glob can match paths with other extensions
+    """
+
+    _, dot, extension = glob.rpartition(".")
+
+    if dot and extension and not any(char in extension for char in "*?[]{},\\/"):
+        return extension
+
+    return None
+
+
+def _extension(path: str) -> str | None:
+    name = path.rpartition("/")[2]
+    return name.rpartition(".")[2] if "." in name else None
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """
+    Generates the positions of the set bits of a bitmap, from the lowest.
+    """
+
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class PathIndex:
+    """
+    Sorted index of the files of a repository tree, supporting cached glob matching.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = sorted(paths)
+        self.all = (1 << len(self.paths)) - 1
+        self._by_extension: dict[str, list[int]] = {}
+        self._matches: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+        for position, path in enumerate(self.paths):
+            extension = _extension(path)
+            if extension is not None:
+                self._by_extension.setdefault(extension, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        low = bisect.bisect_left(self.paths, prefix)
+        # every path starting with the prefix sorts before the prefix followed by the highest code point
+        high = bisect.bisect_left(self.paths, prefix + "\U0010ffff", low)
+        return low, high
+
+    def _match(self, glob: str) -> int:
+        prefix = literal_prefix(glob)
+        low, high = self._prefix_range(prefix)
+
+        if prefix == glob:
+            # a literal path, which only matches itself
+            return 1 << low if low < len(self.paths) and self.paths[low] == glob else 0
+
+        if glob == prefix + "**":
+            # everything under a directory, which is a contiguous run of the sorted paths
+            return ((1 << (high - low)) - 1) << low
+
+        extension = literal_extension(glob)
+
+        if extension is not None:
+            positions = self._by_extension.get(extension, [])
+            candidates = positions[bisect.bisect_left(positions, low):bisect.bisect_left(positions, high)]
+        else:
+            candidates = range(low, high)
+
+        fullmatch = compile_glob(glob).fullmatch
+        paths = self.paths
+        bitmap = bytearray((len(paths) + 7) // 8)
+
+        for position in candidates:
+            if fullmatch(paths[position]):
+                bitmap[position >> 3] |= 1 << (position & 7)
+
+        return int.from_bytes(bitmap, "little")
+
+    def match(self, glob: str) -> int:
+        """
+        Returns the files matched by a glob, caching the result.
+
+        :param glob: Glob to match
+        :return: Bitmap over ``paths`` of the matched files
+        :raises ValueError: If the glob is malformed
+        """
+
+        with self._lock:
+            if glob in self._matches:
+                self._matches.move_to_end(glob)
+                return self._matches[glob]
+
+        bitmap = self._match(glob)
+
+        with self._lock:
+            self._matches[glob] = bitmap
+            if len(self._matches) > MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+
+        return bitmap
+
+    def preview(self, globs: Iterable[str], examples: int = 20) -> GlobPreview:
+        """
+        Previews the files matched by each glob, the files matched by no glob and the globs matching the same files.
+
+        :param globs: Globs to preview
+        :param examples: Maximum number of unmatched files to list
+        :return: GlobPreview of the globs
+        :raises ValueError: If a glob is malformed
+        """
+
+        bitmaps = {glob: self.match(glob) for glob in dict.fromkeys(globs)}
+        matched = 0
+        overlaps = []
+        items = list(bitmaps.items())
+
+        for i, (glob, bitmap) in enumerate(items):
+            matched |= bitmap
+
+            for other, other_bitmap in items[i + 1:]:
+                shared = (bitmap & other_bitmap).bit_count()
+                if shared:
+                    overlaps.append((glob, other, shared))
+
+        unmatched = self.all & ~matched
+        unmatched_examples = []
+
+        for position in iter_bits(unmatched):
+            if len(unmatched_examples) == examples:
+                break
+            unmatched_examples.append(self.paths[position])
+
+        return GlobPreview(
+            len(self.paths),
+            {glob: bitmap.bit_count() for glob, bitmap in bitmaps.items()},
+            overlaps,
+            unmatched.bit_count(),
+            unmatched_examples,
+        )
+
+
+def _git(path: str, *args: str) -> str:
+    process = subprocess.run(
+        ["git", "-C", path, *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="surrogateescape",
+        stdin=subprocess.DEVNULL,
+    )
+
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise GlobError(lines[0] if lines else f"`git {args[0]}` exited with {process.returncode}")
+
+    return process.stdout
+
+
+class PathIndexCache:
+    """
+    Caches the path indexes of the most recently previewed trees by their sha.
+    """
+
+    def __init__(self, max_size: int = INDEX_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[str, PathIndex] = OrderedDict()
+
+    def get(self, path: str, branch: str = "") -> PathIndex:
+        """
+        Returns the path index of the tree of a branch, listing the tree only if it has not been indexed before.
+
+        :param path: Disk path to the repository
+        :param branch: Branch to list, or an empty string for the checked out branch
+        :return: PathIndex of the branch's tree
+        :raises GlobError: If the repository or branch cannot be listed
+        """
+
+        if not os.path.isdir(path):
+            raise GlobError("Disk path does not exist")
+
+        if branch and not is_valid_branch(branch):
+            raise GlobError(f"`{branch}` is not a valid branch name")
+
+        try:
+            tree = _git(path, "rev-parse", "--verify", "--quiet", f"{branch or 'HEAD'}^{{tree}}").strip()
+        except GlobError:
+            raise GlobError(f"Branch `{branch}` does not exist" if branch else "Repository has no commits")
+
+        with self._lock:
+            if tree in self._indexes:
+                self._indexes.move_to_end(tree)
+                return self._indexes[tree]
+
+        listing = _git(path, "ls-tree", "-r", "-z", "--name-only", tree)
+        index = PathIndex(listing.split("\0")[:-1])
+
+        with self._lock:
+            self._indexes[tree] = index
+            if len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+
+        return index
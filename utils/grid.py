@@ -0,0 +1,239 @@
+"""
+Grid editing mode for the configurator pages, where every branch, group or author is a row of a single
+``st.data_editor`` instead of a section of individual widgets.
+
+List fields are edited as ``;``-joined text, the same encoding used by the CSV configs, and flags as checkboxes.
+"""
+
+import math
+from typing import Iterable, NamedTuple
+
+import streamlit as st
+
+from utils.identity import RepoIndex, unique_emails
+
+
+class GridColumn(NamedTuple):
+    field: str
+    label: str
+    kind: str  # one of text, list, lower_list, emails, flag or size
+    help: str = ""
+
+
+REPO_CONFIG_GRID = [
+    GridColumn("repo", "Repository's Location", "text", "Remote Repo URL or Disk Path to the `git` repository"),
+    GridColumn("branch", "Branch", "text", "Branch to analyze in the target repository"),
+    GridColumn("file_fmts", "File formats", "lower_list", "`;`-separated file extensions to analyse"),
+    GridColumn("ignore_glob_lists", "Ignore Glob List", "list", "`;`-separated file path globs to ignore"),
+    GridColumn("ignore_standalone_configs", "Ignore standalone config", "flag"),
+    GridColumn("ignore_commits_list", "Ignore Commits List", "list", "`;`-separated commit hashes or ranges"),
+    GridColumn("ignore_authors_list", "Ignore Authors List", "list", "`;`-separated Git Author Names"),
+    GridColumn("shallow_cloning", "Shallow Cloning", "flag"),
+    GridColumn("find_prev_authors", "Find Previous Authors", "flag"),
+    GridColumn("file_size_limits", "File Size Limit", "size", "File size limit in bytes"),
+    GridColumn("ignore_file_size_limits", "Ignore File Size Limit", "flag"),
+    GridColumn("skip_ignored_file_analysis", "Skip Ignored File Analysis", "flag"),
+]
+AUTHOR_CONFIG_GRID = [
+    GridColumn("repo", "Repository's Location", "text", "Remote Repo URL or Disk Path to the `git` repository"),
+    GridColumn("branch", "Branch", "text", "Branch to analyze in the target repository"),
+    GridColumn("author_git_host_id", "Author's Git Host ID", "text"),
+    GridColumn("author_emails", "Author's Emails", "emails", "`;`-separated emails of the author"),
+    GridColumn("author_display_name", "Author's Display Name", "text"),
+    GridColumn("git_author_name", "Author's Git Author Name", "list", "`;`-separated `git` author names"),
+    GridColumn("ignore_glob_lists", "Ignore Glob List", "lower_list", "`;`-separated file path globs to ignore"),
+]
+GROUP_CONFIG_GRID = [
+    GridColumn("repo", "Repository's Location", "text", "Remote Repo URL or Disk Path to the `git` repository"),
+    GridColumn("group", "Group Name", "text"),
+    GridColumn("glob_lists", "Globs", "list", "`;`-separated file path globs to include in the group"),
+]
+CONFIG_JSON_AUTHORS_GRID = [
+    GridColumn("gitId", "Author's Git Host ID", "text"),
+    GridColumn("emails", "Author's Emails", "emails", "`;`-separated emails of the author"),
+    GridColumn("displayName", "Author's Display Name", "text"),
+    GridColumn("authorNames", "Author's Git Author Name", "list", "`;`-separated `git` author names"),
+    GridColumn("ignoreGlobList", "Ignore Glob List", "lower_list", "`;`-separated file path globs to ignore"),
+]
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value)) or value == ""
+
+
+def to_rows(records: Iterable[dict], columns: list[GridColumn]) -> list[dict]:
+    """
+    Converts records of the form into rows of the grid.
+
+    :param records: Records with one value per column field
+    :param columns: Columns of the grid
+    :return: Rows of the grid
+    """
+
+    rows = []
+
+    for record in records:
+        row = {}
+        for column in columns:
+            value = record.get(column.field)
+            if column.kind in ("list", "lower_list", "emails"):
+                row[column.field] = ";".join(value or [])
+            elif column.kind == "flag":
+                row[column.field] = bool(value)
+            else:
+                row[column.field] = value
+
+        rows.append(row)
+
+    return rows
+
+
+def from_rows(rows: Iterable[dict], columns: list[GridColumn]) -> list[dict]:
+    """
+    Converts rows of the grid back into records of the form, applying the same clean up as the widgets do.
+
+    :param rows: Rows of the grid, e.g. as returned by the data editor
+    :param columns: Columns of the grid
+    :return: Records with one value per column field
+    """
+
+    records = []
+
+    for row in rows:
+        record = {}
+        for column in columns:
+            value = row.get(column.field)
+            if column.kind in ("list", "lower_list", "emails"):
+                items = [] if _is_blank(value) else [item.strip() for item in str(value).split(";") if item.strip()]
+                if column.kind == "lower_list":
+                    items = [item.lower() for item in items]
+                elif column.kind == "emails":
+                    items = unique_emails(items)
+                record[column.field] = items
+            elif column.kind == "flag":
+                record[column.field] = False if _is_blank(value) else bool(value)
+            elif column.kind == "size":
+                record[column.field] = 500000 if _is_blank(value) else max(int(value), 0)
+            else:
+                record[column.field] = "" if _is_blank(value) else str(value).strip()
+
+        records.append(record)
+
+    return records
+
+
+def flatten(repoinfo: dict[str, dict[str, dict]], columns: list[GridColumn]) -> list[dict]:
+    """
+    Flattens a repository to branch/group mapping of the form into grid rows.
+
+    The first two columns hold the repository and the branch/group name, and the remaining columns the fields.
+
+    :param repoinfo: Mapping from repository to branch/group name to configurations
+    :param columns: Columns of the grid
+    :return: Rows of the grid
+    """
+
+    repo_field, key_field = columns[0].field, columns[1].field
+    return to_rows(({repo_field: repo, key_field: key, **configs}
+                    for repo, entries in repoinfo.items() for key, configs in entries.items()), columns)
+
+
+def to_records(repoinfo: dict[str, dict[str, dict]], columns: list[GridColumn]) -> list[dict]:
+    """
+    Flattens a repository to branch/group mapping of the form into records like those returned by ``from_rows``, e.g.
+    to validate the form in the same way as the grid.
+
+    :param repoinfo: Mapping from repository to branch/group name to configurations
+    :param columns: Columns of the grid
+    :return: Records with one value per column field, with an empty branch/group name for the repositories without
+             any branches/groups
+    """
+
+    repo_field, key_field = columns[0].field, columns[1].field
+    return [{repo_field: repo, key_field: key, **configs}
+            for repo, entries in repoinfo.items() for key, configs in (entries.items() or [("", {})])]
+
+
+def unflatten(rows: Iterable[dict], columns: list[GridColumn],
+              index: RepoIndex | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Rebuilds the repository to branch/group mapping of the form from grid rows.
+
+    Rows without a repository or branch/group name are left out, rows of the same repository entered with different
+    locations are merged, and later rows override earlier rows with the same repository and branch/group name, just
+    like duplicate branches in the widget mode.
+
+    :param rows: Rows of the grid
+    :param columns: Columns of the grid
+    :param index: Index to merge the rows into, and to record the merged duplicates in
+    :return: Mapping from repository to branch/group name to configurations
+    """
+
+    repo_field, key_field = columns[0].field, columns[1].field
+    index = index if index is not None else RepoIndex()
+
+    for record in from_rows(rows, columns):
+        repo, key = record.pop(repo_field), record.pop(key_field)
+        if repo and key:
+            index.add(repo, key, record)
+
+    return index.repoinfo
+
+
+def set_grid_rows(key: str, rows: list[dict]):
+    """
+    Replaces the rows shown by a grid editor, discarding any edits made to the previous rows.
+
+    :param key: Key of the grid editor
+    :param rows: New rows of the grid
+    """
+
+    st.session_state[f"{key}-rows"] = rows
+    st.session_state.pop(f"{key}-base", None)
+    st.session_state.setdefault("grid-bytes", {}).pop(key, None)
+
+
+def grid_editor(key: str, columns: list[GridColumn]) -> list[dict]:
+    """
+    Renders a data editor holding the rows set by ``set_grid_rows`` and returns the edited rows.
+
+    The data passed to the editor has to stay identical between reruns for the editor to keep its edits, so it is
+    built once and kept in the session state, and the edits are kept by the editor itself. The bytes of the data are
+    recorded in ``st.session_state["grid-bytes"]``, so that they count towards the memory budget of the session.
+
+    :param key: Unique key of the grid editor
+    :param columns: Columns of the grid
+    :return: Edited rows of the grid
+    """
+
+    if f"{key}-base" not in st.session_state:
+        # pandas is a dependency of streamlit itself, and only needed once a grid is shown
+        import pandas as pd
+
+        dtypes = {"flag": "bool", "size": "Int64"}
+        # the rows are only needed to build the data, so they are not kept alongside it
+        base = pd.DataFrame(st.session_state.pop(f"{key}-rows", []), columns=[column.field for column in columns])
+        base = st.session_state[f"{key}-base"] = base.astype({column.field: dtypes.get(column.kind, "object")
+                                                              for column in columns})
+        st.session_state.setdefault("grid-bytes", {})[key] = int(base.memory_usage(deep=True).sum())
+
+    column_config = {}
+    for column in columns:
+        if column.kind == "flag":
+            column_config[column.field] = st.column_config.CheckboxColumn(column.label, help=column.help or None,
+                                                                          default=False)
+        elif column.kind == "size":
+            column_config[column.field] = st.column_config.NumberColumn(column.label, help=column.help or None,
+                                                                        min_value=0, step=1, default=500000)
+        else:
+            column_config[column.field] = st.column_config.TextColumn(column.label, help=column.help or None)
+
+    edited = st.data_editor(
+        st.session_state[f"{key}-base"],
+        key=key,
+        column_config=column_config,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+    )
+    return edited.to_dict("records")
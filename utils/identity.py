@@ -0,0 +1,205 @@
+"""
+Normalizes the repositories, branches and emails entered in the configurators, so that the same repository entered in
+different ways is configured, cloned and analysed only once.
+
+A repository is identified by its host and path, regardless of the protocol, user, trailing slash or ``.git`` suffix
+it is entered with, so ``https://github.com/foo/bar``, ``https://github.com/foo/bar.git`` and
+``git@github.com:foo/bar.git`` are the same repository. The paths of the hosts in ``CASE_INSENSITIVE_HOSTS`` are also
+case-folded. Disk paths are identified by their normalized path. Branch and group names are trimmed, and emails are
+case-folded.
+
+A ``RepoIndex`` maps every identity to the first location it was entered with, and merges the branches of the later
+locations into it, in a single pass over the entries.
+"""
+
+import os
+import posixpath
+import re
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from utils.reachability import is_remote
+
+# hosts whose repository paths are case-insensitive, e.g. github.com/Foo/Bar is github.com/foo/bar
+CASE_INSENSITIVE_HOSTS = frozenset(filter(None, os.environ.get(
+    "REPOCONFIG_CASE_INSENSITIVE_HOSTS", "github.com,gitlab.com,bitbucket.org").lower().split(",")))
+
+_DEFAULT_PORTS = {"https": "443", "http": "80", "ssh": "22", "git": "9418"}
+# scheme://[user[:password]@]host[:port]/path[?query][#fragment], parsed without urllib, which is far slower
+_URL = re.compile(r"(?P<scheme>[a-zA-Z][\w+.-]*)://(?:[^@/]*@)?(?P<host>\[[^\]/]*\]|[^:/]*)(?::(?P<port>\d*))?"
+                  r"(?P<path>[^?#]*)")
+# sequences git does not allow in branch names, see git check-ref-format
+_INVALID_BRANCH = re.compile(r"[\x00-\x20\x7f~^:?*\[\\]|\.\.|@\{|//|(?:^|/)\.|\.lock(?:/|$)|^/|[/.]$")
+
+
+def _canonical_remote(host: str, path: str) -> str:
+    path = path.replace("\\", "/")
+
+    if "//" in path or "/." in path:
+        path = posixpath.normpath("/" + path)
+
+    path = path.strip("/").removesuffix(".git").rstrip("/")
+
+    if host.partition(":")[0] in CASE_INSENSITIVE_HOSTS:
+        path = path.casefold()
+
+    return f"{host}/{path}"
+
+
+@lru_cache(maxsize=4096)
+def canonical_repo(location: str) -> str:
+    """
+    :param location: Remote Repo URL or Disk Path to the repository
+    :return: Identity of the repository, the same for every location of the same repository
+    """
+
+    location = location.strip()
+    url = _URL.match(location) if "://" in location else None
+
+    if url and url["scheme"].lower() == "file":
+        location = url["path"]
+    elif url:
+        host, port = url["host"].lower(), url["port"]
+
+        if port and port != _DEFAULT_PORTS.get(url["scheme"].lower()):
+            host = f"{host}:{port}"
+
+        return _canonical_remote(host, url["path"])
+    elif is_remote(location):
+        # scp-like user@host:path
+        head, _, path = location.partition(":")
+        return _canonical_remote(head.rpartition("@")[2].lower(), path)
+
+    path = os.path.normcase(os.path.normpath(os.path.expanduser(location)))
+    # the .git folder of a working tree is the same repository as the working tree
+    return path.removesuffix(os.sep + ".git")
+
+
+def canonical_name(name: str) -> str:
+    """
+    :param name: Branch or group name
+    :return: Name without surrounding spaces, which git refs and RepoSense groups cannot have
+    """
+
+    return name.strip()
+
+
+def is_valid_branch(name: str) -> bool:
+    """
+    Checks a branch name against the rules of ``git check-ref-format --branch``, before it is passed to ``git``, which
+    would read a name starting with ``-`` as an option.
+
+    :param name: Branch name
+    :return: True if git accepts the name as a branch
+    """
+
+    return bool(name) and not name.startswith("-") and name != "@" and not _INVALID_BRANCH.search(name)
+
+
+def canonical_email(email: str) -> str:
+    """
+    :param email: Email address
+    :return: Case-folded email address without surrounding spaces
+    """
+
+    return email.strip().casefold()
+
+
+def unique_emails(emails: Iterable[str]) -> list[str]:
+    """
+    Removes the emails that differ from an earlier email only by case or surrounding spaces.
+
+    :param emails: Email addresses
+    :return: Trimmed email addresses, keeping the first spelling of each
+    """
+
+    seen = {}
+
+    for email in emails:
+        email = email.strip()
+        seen.setdefault(canonical_email(email), email)
+
+    return list(seen.values())
+
+
+class Duplicate(NamedTuple):
+    location: str
+    key: str  # branch or group name, empty when a repository was merged into an earlier location
+    kept: str  # location the entry was merged into
+
+
+class RepoIndex:
+    """
+    Indexes the repositories of a config by their identity, merging the repositories entered more than once.
+    """
+
+    def __init__(self):
+        self.repoinfo: dict[str, dict[str, dict]] = {}
+        self.duplicates: list[Duplicate] = []
+        # location the repository of each identity was first entered with, and of each location entered
+        self._identities: dict[str, str] = {}
+        self._locations: dict[str, str] = {}
+
+    def location(self, location: str) -> str:
+        """
+        :param location: Remote Repo URL or Disk Path to a repository
+        :return: Location the repository was first entered with
+        """
+
+        kept = self._locations.get(location)
+
+        if kept is None:
+            stripped = location.strip()
+            kept = self._locations[location] = self._identities.setdefault(canonical_repo(stripped), stripped)
+
+            if kept != stripped:
+                self.duplicates.append(Duplicate(stripped, "", kept))
+
+        return kept
+
+    def add(self, location: str, key: str, configs: dict):
+        """
+        Adds a branch or group of a repository. A later branch or group with the same name overrides the earlier one.
+
+        :param location: Remote Repo URL or Disk Path to the repository
+        :param key: Branch or group name
+        :param configs: Configurations of the branch or group
+        """
+
+        kept, key = self.location(location), canonical_name(key)
+        entries = self.repoinfo.setdefault(kept, {})
+
+        if key in entries:
+            self.duplicates.append(Duplicate(location.strip(), key, kept))
+
+        entries[key] = configs
+
+    def update(self, location: str, entries: dict[str, dict]):
+        """
+        Adds every branch or group of a repository, or just the repository if it has none.
+
+        :param location: Remote Repo URL or Disk Path to the repository
+        :param entries: Mapping from branch or group name to configurations
+        """
+
+        if not entries:
+            self.repoinfo.setdefault(self.location(location), {})
+
+        for key, configs in entries.items():
+            self.add(location, key, configs)
+
+
+def merge_repoinfo(repoinfo: Iterable[tuple[str, dict[str, dict]]]) -> RepoIndex:
+    """
+    Merges the repositories entered more than once.
+
+    :param repoinfo: Pairs of repository location and mapping from branch or group name to configurations
+    :return: Index holding the merged mapping and the merged duplicates
+    """
+
+    index = RepoIndex()
+
+    for location, entries in repoinfo:
+        index.update(location, entries)
+
+    return index
@@ -0,0 +1,340 @@
+"""
+Shares the generated artifacts of all sessions in server mode, so that one server can serve a whole team without its
+memory growing with every session.
+
+In server mode, the config files and archives of every session are kept in a single ``ArtifactCache`` instead of in
+the session state. The cache is content-addressed: identical config files, e.g. the same ``config.json`` generated by
+several users, are kept once, and the archives of identical config files are built once and reused by every session.
+Each session binds the names of its artifacts to entries of the cache, and the cache accounts every session for the
+bytes of the entries it binds, and for the bytes of the largest parts of its session state, which the pages report
+with ``ArtifactCache.account``: the encoded lines of its config tables and the frames of its grid editors. The values
+entered in the widgets, the section stores and the form mappings are not counted; they hold what the user typed, which
+cannot be dropped, and Streamlit frees them together with the session.
+
+The cache evicts its least recently used entries once it holds more than ``CACHE_BUDGET`` bytes, starting with the
+entries no session binds, such as archives of config files that have since been edited. A session may bind at most
+``SESSION_BUDGET`` bytes, and the bindings of sessions that have not rerun for ``SESSION_IDLE_TTL`` seconds are
+released, so that their artifacts can be evicted. Evicted config files are read back from the session directory, if
+they are kept on the disk, and evicted archives are built again.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+SERVER_MODE = os.environ.get("REPOCONFIG_SERVER_MODE", "") not in ("", "0")
+CACHE_BUDGET = int(os.environ.get("REPOCONFIG_CACHE_BUDGET", 256 * 1024 * 1024))
+SESSION_BUDGET = int(os.environ.get("REPOCONFIG_SESSION_BUDGET", 32 * 1024 * 1024))
+SESSION_IDLE_TTL = float(os.environ.get("REPOCONFIG_SESSION_IDLE_TTL", 30 * 60))
+
+
+class SessionBudgetError(Exception):
+    """
+    Raised when an artifact would take a session over its memory budget.
+    """
+
+
+class CacheUsage(NamedTuple):
+    entries: int
+    size: int  # bytes of the entries held
+    budget: int
+    saved: int  # bytes that sessions binding the same entries would otherwise hold each
+    sessions: int
+    state: int  # bytes the sessions hold in their session state, as accounted by the pages
+    hits: int
+    misses: int
+    evictions: int
+
+
+def content_key(data: bytes) -> str:
+    """
+    :param data: Contents of an artifact
+    :return: Key of the artifact in the cache, the same for identical contents
+    """
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Process-wide, content-addressed cache of the artifacts of all sessions, evicting the least recently used artifacts
+    under a byte budget. Safe to share between sessions.
+    """
+
+    def __init__(self, budget: int = CACHE_BUDGET, session_budget: int = SESSION_BUDGET,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        """
+        :param budget: Maximum bytes of artifacts to hold, beyond which the least recently used ones are evicted
+        :param session_budget: Maximum bytes of artifacts a single session may bind
+        :param idle_ttl: Seconds without a rerun after which the artifacts of a session are released
+        """
+
+        self.budget = budget
+        self.session_budget = session_budget
+        self.idle_ttl = idle_ttl
+        # artifacts by key, from the least to the most recently used
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        # number of names bound to each key by all sessions
+        self._refs: dict[str, int] = {}
+        # key bound to each name of each session, and the time each session last reran
+        self._bindings: dict[str, dict[str, str]] = {}
+        self._seen: dict[str, float] = {}
+        # bytes each session holds outside the cache
+        self._state: dict[str, int] = {}
+        self._next_idle_check = 0.0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def _bind(self, session: str, name: str, key: str):
+        bindings = self._bindings.setdefault(session, {})
+        previous = bindings.get(name)
+
+        if previous == key:
+            return
+
+        if previous is not None:
+            self._unref(previous)
+
+        bindings[name] = key
+        self._refs[key] = self._refs.get(key, 0) + 1
+
+    def _unbind(self, session: str, name: str):
+        key = self._bindings.get(session, {}).pop(name, None)
+
+        if key is not None:
+            self._unref(key)
+
+    def _unref(self, key: str):
+        self._refs[key] -= 1
+
+        if not self._refs[key]:
+            del self._refs[key]
+
+    def _session_size(self, session: str) -> int:
+        keys = set(self._bindings.get(session, {}).values())
+        return sum(len(self._entries[key]) for key in keys if key in self._entries) + self._state.get(session, 0)
+
+    def _evict(self, key: str):
+        self._size -= len(self._entries.pop(key))
+        self._evictions += 1
+
+    def _shrink(self):
+        if self._size <= self.budget:
+            return
+
+        # the entries no session binds go first, and only then the entries of live sessions
+        for key in [key for key in self._entries if key not in self._refs]:
+            self._evict(key)
+
+            if self._size <= self.budget:
+                return
+
+        while self._size > self.budget:
+            self._evict(next(iter(self._entries)))
+
+    def put(self, session: str, name: str, data: bytes, key: str | None = None) -> bytes:
+        """
+        Adds an artifact of a session, reusing the cached artifact with the same key if there is one.
+
+        :param session: Id of the session
+        :param name: Name of the artifact in the session, e.g. repo-config.csv, which is rebound to the new artifact
+        :param data: Contents of the artifact
+        :param key: Key of the artifact, e.g. the digest of the inputs it was built from, or None to key it by its
+                    contents
+        :return: Cached contents of the artifact, which are shared with the other sessions binding it
+        :raises SessionBudgetError: If the artifact would take the session over its budget, in which case the name is
+                                    unbound, but the artifact is still cached for other sessions
+        """
+
+        key = key or content_key(data)
+
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                data = self._entries[key]
+            else:
+                self._misses += 1
+                self._entries[key] = data
+                self._size += len(data)
+
+            self._bind(session, name, key)
+            self._seen[session] = time.monotonic()
+            size = self._session_size(session)
+
+            if size > self.session_budget:
+                self._unbind(session, name)
+
+            self._shrink()
+
+        if size > self.session_budget:
+            raise SessionBudgetError(f"`{name}` would take the artifacts of this session to {size:,} bytes, over the "
+                                     f"budget of {self.session_budget:,} bytes")
+
+        return data
+
+    def bind(self, session: str, name: str, key: str) -> bytes | None:
+        """
+        Binds a cached artifact to a name of a session, e.g. the archive of config files already built by another
+        session.
+
+        :param session: Id of the session
+        :param name: Name of the artifact in the session
+        :param key: Key of the artifact
+        :return: Cached contents of the artifact, or None if it is not cached
+        """
+
+        with self._lock:
+            data = self._entries.get(key)
+
+            if data is None:
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            self._seen[session] = time.monotonic()
+            self._bind(session, name, key)
+
+            if self._session_size(session) > self.session_budget:
+                self._unbind(session, name)
+                return None
+
+            return data
+
+    def account(self, session: str, size: int):
+        """
+        Records the bytes a session holds outside the cache, e.g. in its session state, which count towards its budget
+        together with the artifacts it binds.
+
+        :param session: Id of the session
+        :param size: Bytes held by the session outside the cache, replacing the previously recorded bytes
+        :raises SessionBudgetError: If the session is over its budget, in which case the bytes are still recorded
+        """
+
+        with self._lock:
+            self._state[session] = size
+            self._seen[session] = time.monotonic()
+            total = self._session_size(session)
+
+        if total > self.session_budget:
+            raise SessionBudgetError(f"This session holds {total:,} bytes, over the budget of "
+                                     f"{self.session_budget:,} bytes")
+
+    def get(self, session: str, name: str, key: str | None = None) -> bytes | None:
+        """
+        :param session: Id of the session
+        :param name: Name of the artifact in the session
+        :param key: Key the artifact must have been added with, or None for any key
+        :return: Contents of the artifact bound to the name, or None if it is not bound, is bound to another key, or
+                 has been evicted
+        """
+
+        with self._lock:
+            bound = self._bindings.get(session, {}).get(name)
+            data = self._entries.get(bound) if bound is not None and key in (None, bound) else None
+
+            if data is not None:
+                self._entries.move_to_end(bound)
+
+            return data
+
+    def release(self, session: str):
+        """
+        Unbinds every artifact of a session, so that they can be evicted unless other sessions bind them.
+
+        :param session: Id of the session
+        """
+
+        with self._lock:
+            self._release(session)
+
+    def _release(self, session: str):
+        for key in self._bindings.pop(session, {}).values():
+            self._unref(key)
+
+        self._state.pop(session, None)
+        self._seen.pop(session, None)
+
+    def touch(self, session: str):
+        """
+        Marks a session as active, and releases the sessions that have been idle for longer than the TTL, at most
+        once every tenth of the TTL.
+
+        :param session: Id of the session
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._seen[session] = now
+
+            if now >= self._next_idle_check:
+                self._next_idle_check = now + self.idle_ttl / 10
+                self._release_idle(now)
+
+    def release_idle(self) -> list[str]:
+        """
+        Releases the sessions that have not rerun within the TTL.
+
+        :return: Ids of the released sessions
+        """
+
+        with self._lock:
+            return self._release_idle(time.monotonic())
+
+    def _release_idle(self, now: float) -> list[str]:
+        idle = [session for session, seen in self._seen.items() if seen < now - self.idle_ttl]
+
+        for session in idle:
+            self._release(session)
+
+        return idle
+
+    def session_size(self, session: str) -> int:
+        """
+        :param session: Id of the session
+        :return: Bytes of the cached artifacts bound by the session, and of its accounted session state
+        """
+
+        with self._lock:
+            return self._session_size(session)
+
+    def usage(self) -> CacheUsage:
+        """
+        :return: Memory accounting of the cache
+        """
+
+        with self._lock:
+            saved = sum(len(self._entries[key]) * (refs - 1)
+                        for key, refs in self._refs.items() if key in self._entries)
+            return CacheUsage(len(self._entries), self._size, self.budget, saved, len(self._seen),
+                              sum(self._state.values()), self._hits, self._misses, self._evictions)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Memory accounting of the cache in the Prometheus text format
+        """
+
+        usage = self.usage()
+        metrics = [
+            ("repoconfig_cache_bytes", "gauge", "Bytes of artifacts held by the shared artifact cache.", usage.size),
+            ("repoconfig_cache_budget_bytes", "gauge", "Byte budget of the shared artifact cache.", usage.budget),
+            ("repoconfig_cache_saved_bytes", "gauge", "Bytes saved by sharing artifacts between sessions.",
+             usage.saved),
+            ("repoconfig_cache_entries", "gauge", "Artifacts held by the shared artifact cache.", usage.entries),
+            ("repoconfig_cache_sessions", "gauge", "Sessions with artifacts in the shared artifact cache.",
+             usage.sessions),
+            ("repoconfig_cache_session_state_bytes", "gauge", "Bytes accounted in the session state of the sessions.",
+             usage.state),
+            ("repoconfig_cache_hits_total", "counter", "Artifacts found in the shared artifact cache.", usage.hits),
+            ("repoconfig_cache_misses_total", "counter", "Artifacts added to the shared artifact cache.", usage.misses),
+            ("repoconfig_cache_evictions_total", "counter", "Artifacts evicted from the shared artifact cache.",
+             usage.evictions),
+        ]
+
+        return "".join(f"# HELP {name} {description}\n# TYPE {name} {kind}\n{name} {value}\n"
+                       for name, kind, description, value in metrics)
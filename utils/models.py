@@ -0,0 +1,385 @@
+"""
+Compact typed models of the config files, used as the inputs of the cached converters.
+
+Each row is a slotted dataclass storing its lists as tuples, and carries a fingerprint computed once when it is
+created. Rows are never modified after they are created, ``dataclasses.replace`` is used to edit them instead.
+
+A ``ConfigTable`` keeps an ordered collection of rows together with an aggregate fingerprint that is updated
+incrementally as rows are added, replaced or removed, so that ``st.cache_data`` can key on the fingerprint in O(1)
+instead of pickling and hashing the whole nested form mapping on every rerun.
+
+Fingerprints are built on ``hash()``, so they are only stable within a single process, which is all that the
+in-memory Streamlit caches need.
+"""
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import ClassVar, Iterable, Iterator
+
+from utils import converters
+
+_MASK = (1 << 64) - 1
+# getters of the values of the fields of each model, created on first use
+_FIELD_GETTERS = {}
+
+
+def _to_tuple(values) -> tuple:
+    return tuple(values) if values is not None else ()
+
+
+class _Model:
+    """
+    Base of the config models, providing dictionary-style access to the fields and the precomputed fingerprint.
+    """
+
+    __slots__ = ()
+    fingerprint: int
+
+    def __post_init__(self):
+        cls = type(self)
+        getter = _FIELD_GETTERS.get(cls)
+
+        if getter is None:
+            getter = _FIELD_GETTERS[cls] = attrgetter(*cls.__match_args__)
+
+        self.fingerprint = hash((cls.__name__, getter(self)))
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+    def configs(self) -> dict:
+        """
+        Returns the fields of the model that are not part of its key, in the format used by the form mappings.
+
+        :return: Dictionary of field name to value, with tuples converted back to lists
+        """
+
+        return {
+            name: list(value) if isinstance(value, tuple) else value
+            for name in self.__match_args__[2:]
+            for value in (getattr(self, name),)
+        }
+
+
+@dataclass(slots=True)
+class RepoBranchConfig(_Model):
+    HEADERS: ClassVar[list[str]] = converters.REPO_CONFIG_HEADERS
+
+    repo: str
+    branch: str
+    file_fmts: tuple[str, ...] = ()
+    ignore_glob_lists: tuple[str, ...] = ()
+    ignore_commits_list: tuple[str, ...] = ()
+    ignore_authors_list: tuple[str, ...] = ()
+    find_prev_authors: bool = False
+    ignore_standalone_configs: bool = False
+    shallow_cloning: bool = False
+    ignore_file_size_limits: bool = False
+    skip_ignored_file_analysis: bool = False
+    file_size_limits: int = 500000
+    fingerprint: int = field(init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_form(cls, repo: str, branch: str, configs: dict) -> "RepoBranchConfig":
+        """
+        Creates the model of a branch from its configurations in the repo-config map of the form.
+
+        :param repo: Remote Repo URL or Disk Path to the repository
+        :param branch: Branch of the repository
+        :param configs: Configurations of the branch
+        :return: RepoBranchConfig of the branch
+        """
+
+        return cls(
+            repo,
+            branch,
+            _to_tuple(configs["file_fmts"]),
+            _to_tuple(configs["ignore_glob_lists"]),
+            _to_tuple(configs["ignore_commits_list"]),
+            _to_tuple(configs["ignore_authors_list"]),
+            bool(configs["find_prev_authors"]),
+            bool(configs["ignore_standalone_configs"]),
+            bool(configs["shallow_cloning"]),
+            bool(configs["ignore_file_size_limits"]),
+            bool(configs["skip_ignored_file_analysis"]),
+            int(configs["file_size_limits"]),
+        )
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.repo, self.branch
+
+    def to_row(self) -> list:
+        return converters.repo_config_row(self.repo, self.branch, self)
+
+
+@dataclass(slots=True)
+class AuthorConfig(_Model):
+    HEADERS: ClassVar[list[str]] = converters.AUTHOR_CONFIG_HEADERS
+
+    repo: str
+    branch: str
+    author_git_host_id: str = ""
+    author_emails: tuple[str, ...] = ()
+    author_display_name: str = ""
+    git_author_name: tuple[str, ...] = ()
+    ignore_glob_lists: tuple[str, ...] = ()
+    fingerprint: int = field(init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_form(cls, repo: str, branch: str, configs: dict) -> "AuthorConfig":
+        """
+        Creates the model of an author from its details in the author-config map of the form.
+
+        :param repo: Remote Repo URL or Disk Path to the repository
+        :param branch: Branch of the repository
+        :param configs: Details of the author
+        :return: AuthorConfig of the author
+        """
+
+        return cls(
+            repo,
+            branch,
+            configs["author_git_host_id"],
+            _to_tuple(configs["author_emails"]),
+            configs["author_display_name"],
+            _to_tuple(configs["git_author_name"]),
+            _to_tuple(configs["ignore_glob_lists"]),
+        )
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.repo, self.branch
+
+    def to_row(self) -> list:
+        return converters.author_config_row(self.repo, self.branch, self)
+
+
+@dataclass(slots=True)
+class GroupConfig(_Model):
+    HEADERS: ClassVar[list[str]] = converters.GROUP_CONFIG_HEADERS
+
+    repo: str
+    group: str
+    glob_lists: tuple[str, ...] = ()
+    fingerprint: int = field(init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_form(cls, repo: str, group: str, configs: dict) -> "GroupConfig":
+        """
+        Creates the model of a group from its globs in the group-config map of the form.
+
+        :param repo: Remote Repo URL or Disk Path to the repository
+        :param group: Name of the group
+        :param configs: Globs of the group
+        :return: GroupConfig of the group
+        """
+
+        return cls(repo, group, _to_tuple(configs["glob_lists"]))
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.repo, self.group
+
+    def to_row(self) -> list:
+        return converters.group_config_row(self.repo, self.group, self)
+
+
+@dataclass(slots=True)
+class ReportConfig(_Model):
+    title: str = ""
+    fingerprint: int = field(init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_form(cls, repoinfo: dict[str, str]) -> "ReportConfig":
+        """
+        Creates the model of report-config.json from the form mapping.
+
+        :param repoinfo: Dictionary containing the report-config.json form data
+        :return: ReportConfig of the form
+        """
+
+        return cls(repoinfo["title"])
+
+    def to_json(self) -> dict[str, str]:
+        return {"title": self.title}
+
+
+def rows_from_form(row_type: type, repoinfo: dict[str, dict[str, dict]]) -> Iterator:
+    """
+    Generates the models of the rows of a nested form mapping of repository to branch or group to configurations.
+
+    :param row_type: Model of the rows, e.g. RepoBranchConfig
+    :param repoinfo: Dictionary containing the repository name to branch or group info and configurations.
+    :return: Iterator of rows
+    """
+
+    for repo, entries in repoinfo.items():
+        for name, configs in entries.items():
+            yield row_type.from_form(repo, name, configs)
+
+
+class ConfigTable:
+    """
+    Ordered collection of config rows, keyed by repository and branch or group, with an aggregate fingerprint.
+
+    The aggregate is the sum of a hash of every row's fingerprint and its insertion sequence number, so replacing,
+    adding or removing a row updates it in O(1), and two tables with the same rows in the same order have the same
+    fingerprint.
+
+    The encoded CSV line of every row is kept until the row is replaced, so serializing the table again after an
+    edit only encodes the rows that changed. ``encoded_size`` is the number of bytes of these lines as of the last
+    serialization.
+    """
+
+    __slots__ = ("row_type", "fingerprint", "encoded_size", "_rows", "_seqs", "_next_seq", "_encoded", "_dirty")
+
+    def __init__(self, row_type: type, rows: Iterable = ()):
+        self.row_type = row_type
+        self._reset()
+
+        for row in rows:
+            self.put(row)
+
+    def _reset(self):
+        self.fingerprint = hash(self.row_type.__name__) & _MASK
+        self._rows = {}
+        self._seqs = {}
+        self._next_seq = 0
+        # encoded lines, in the same order as the rows, with None for the rows that are yet to be encoded
+        self._encoded = {}
+        self._dirty = set()
+        self.encoded_size = 0
+
+    @classmethod
+    def from_form(cls, row_type: type, repoinfo: dict[str, dict[str, dict]]) -> "ConfigTable":
+        """
+        Creates a table from a nested form mapping of repository to branch or group to configurations.
+
+        :param row_type: Model of the rows, e.g. RepoBranchConfig
+        :param repoinfo: Dictionary containing the repository name to branch or group info and configurations.
+        :return: ConfigTable of the form
+        """
+
+        return cls(row_type, rows_from_form(row_type, repoinfo))
+
+    def put(self, row):
+        """
+        Adds a row to the end of the table, or replaces the row with the same key in place.
+
+        :param row: Row to add
+        """
+
+        key = row.key
+        old = self._rows.get(key)
+
+        if old is None:
+            seq = self._seqs[key] = self._next_seq
+            self._next_seq += 1
+        elif old == row:
+            return
+        else:
+            seq = self._seqs[key]
+            self.fingerprint = (self.fingerprint - hash((seq, old.fingerprint))) & _MASK
+
+        self._rows[key] = row
+        self._encoded[key] = None
+        self._dirty.add(key)
+        self.fingerprint = (self.fingerprint + hash((seq, row.fingerprint))) & _MASK
+
+    def discard(self, key: tuple[str, str]):
+        """
+        Removes the row with the given key from the table, if it exists.
+
+        :param key: Key of the row to remove
+        """
+
+        old = self._rows.pop(key, None)
+
+        if old is not None:
+            seq = self._seqs.pop(key)
+            del self._encoded[key]
+            self._dirty.discard(key)
+            self.fingerprint = (self.fingerprint - hash((seq, old.fingerprint))) & _MASK
+
+    def sync(self, rows: Iterable):
+        """
+        Updates the table to contain exactly the given rows in the given order, keeping the encoded lines of the rows
+        that did not change.
+
+        :param rows: Rows that the table should contain
+        """
+
+        rows = list(rows)
+
+        if [row.key for row in rows] == list(self._rows):
+            for row in rows:
+                self.put(row)
+            return
+
+        # rows were added, removed or reordered, so rebuild the table, carrying over the lines of unchanged rows
+        old_rows, old_encoded = self._rows, self._encoded
+        self._reset()
+
+        for row in rows:
+            self.put(row)
+            encoded = old_encoded.get(row.key)
+
+            if encoded is not None and old_rows[row.key] == row:
+                self._encoded[row.key] = encoded
+                self._dirty.discard(row.key)
+
+    def get(self, key: tuple[str, str]):
+        return self._rows.get(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator:
+        return iter(self._rows.values())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def to_csv(self) -> bytes:
+        """
+        Serializes the table into a CSV file with the headers of its row model, only encoding the rows that were
+        added or replaced since the last serialization.
+
+        :return: Bytes object
+        """
+
+        if self._dirty:
+            keys = list(self._dirty)
+            lines = converters.encode_csv_rows(self._rows[key].to_row() for key in keys)
+            self._encoded.update(zip(keys, lines))
+            self._dirty.clear()
+
+        header = next(converters.encode_csv_rows([self.row_type.HEADERS]))
+        data = header + b"".join(self._encoded.values())
+        self.encoded_size = len(data) - len(header)
+        return data
+
+    def forget_encoded(self):
+        """
+        Drops the encoded lines of all the rows, e.g. to free the memory of a session over its budget, so the next
+        serialization encodes every row again.
+        """
+
+        self._encoded = dict.fromkeys(self._rows)
+        self._dirty = set(self._rows)
+        self.encoded_size = 0
+
+    def to_form(self) -> dict[str, dict[str, dict]]:
+        """
+        Converts the table back into the nested form mapping used by the pages and the converters.
+
+        :return: Dictionary containing the repository name to branch or group info and configurations.
+        """
+
+        repoinfo = {}
+
+        for (repo, name), row in self._rows.items():
+            repoinfo.setdefault(repo, {})[name] = row.configs()
+
+        return repoinfo
@@ -0,0 +1,293 @@
+"""
+Parsers for existing RepoSense config files, the inverse of the functions in ``utils/converters.py``.
+
+The parsers return the same ``form_returns`` mappings that the configurator pages build from their widgets, so that
+existing configs can be loaded into the pages and edited.
+"""
+
+import contextlib
+import copy
+import csv
+import gc
+import io
+import itertools
+import json
+from typing import BinaryIO, Callable
+
+from utils import converters
+from utils.identity import RepoIndex, unique_emails
+
+
+def _parse_list(value: str) -> list[str]:
+    if not value:
+        return []
+
+    return [item for item in map(str.strip, value.split(";")) if item]
+
+
+_FLAGS = {"yes": True, "": False}
+
+
+def _parse_flag(value: str) -> bool:
+    flag = _FLAGS.get(value)
+    return flag if flag is not None else value.strip().lower() in ("yes", "true")
+
+
+def _parse_str(value: str) -> str:
+    return value.strip()
+
+
+def _parse_emails(value: str) -> list[str]:
+    return unique_emails(_parse_list(value))
+
+
+def _parse_size(value: str) -> int:
+    value = value.strip()
+    return int(value) if value else converters.REPO_CONFIG_DEFAULTS["file_size_limits"]
+
+
+# mapping from the header of each CSV column to the field in the form and the function used to parse the column
+REPO_CONFIG_COLUMNS: dict[str, tuple[str, Callable[[str], object]]] = {
+    "File formats": ("file_fmts", _parse_list),
+    "Ignore Glob List": ("ignore_glob_lists", _parse_list),
+    "Ignore standalone config": ("ignore_standalone_configs", _parse_flag),
+    "Ignore Commits List": ("ignore_commits_list", _parse_list),
+    "Ignore Authors List": ("ignore_authors_list", _parse_list),
+    "Shallow Cloning": ("shallow_cloning", _parse_flag),
+    "Find Previous Authors": ("find_prev_authors", _parse_flag),
+    "File Size Limit": ("file_size_limits", _parse_size),
+    "Ignore File Size Limit": ("ignore_file_size_limits", _parse_flag),
+    "Skip Ignored File Analysis": ("skip_ignored_file_analysis", _parse_flag),
+}
+AUTHOR_CONFIG_COLUMNS: dict[str, tuple[str, Callable[[str], object]]] = {
+    "Author's Git Host ID": ("author_git_host_id", _parse_str),
+    "Author's Emails": ("author_emails", _parse_emails),
+    "Author's Display Name": ("author_display_name", _parse_str),
+    "Author's Git Author Name": ("git_author_name", _parse_list),
+    "Ignore Glob List": ("ignore_glob_lists", _parse_list),
+}
+# number of rows parsed together at a time
+CHUNK_SIZE = 8192
+
+GROUP_CONFIG_COLUMNS: dict[str, tuple[str, Callable[[str], object]]] = {
+    "Globs": ("glob_lists", _parse_list),
+}
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    Pauses the cyclic garbage collector, which would otherwise be triggered repeatedly by the many small containers
+    allocated while parsing large configs, without any reference cycles to collect.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _open_text(source: BinaryIO | bytes) -> io.TextIOWrapper:
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    # utf-8-sig strips the byte order mark that spreadsheet applications like to add
+    return io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+
+def _parse_csv(source: BinaryIO | bytes, key_header: str, columns: dict[str, tuple[str, Callable[[str], object]]],
+               defaults: dict, index: RepoIndex | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Parses a CSV config into a mapping from repository to the value of the key column to the row's fields.
+
+    Columns are matched to fields by their header, ignoring case, and columns that are absent take the defaults of
+    the configurator pages. Rows are read in fixed-size chunks and each chunk is parsed column by column, so only the
+    resulting mapping and a single chunk are held in memory.
+
+    Rows of the same repository entered with different locations, e.g. with and without ``.git``, are merged into the
+    location it was first entered with.
+
+    :param source: Binary file or bytes of the CSV file
+    :param key_header: Header of the column identifying a row within a repository, e.g. Branch
+    :param columns: Mapping from header to field name and parser of the column
+    :param defaults: Default values of each field
+    :param index: Index to merge the rows of the same repository entered with different locations into, and to record
+                  the merged duplicates in
+    :return: Mapping in the same shape as the form_returns of the matching configurator page
+    """
+
+    stream = _open_text(source)
+
+    try:
+        reader = csv.reader(stream)
+        headers = [header.strip().lower() for header in next(reader, [])]
+
+        try:
+            repo_index = headers.index("repository's location")
+            key_index = headers.index(key_header.lower())
+        except ValueError:
+            raise ValueError(f"Expected the columns \"Repository's Location\" and \"{key_header}\" in the header row")
+
+        # resolve the column index of every known field once, instead of looking up headers for every row
+        present = [(headers.index(header.lower()), field, parse)
+                   for header, (field, parse) in columns.items() if header.lower() in headers]
+        missing = [(field, value) for field, value in defaults.items()
+                   if field not in {field for _, field, _ in present}]
+        fields = [field for _, field, _ in present] + [field for field, _ in missing]
+        index = index if index is not None else RepoIndex()
+
+        with _gc_paused():
+            while chunk := list(itertools.islice(reader, CHUNK_SIZE)):
+                # skip blank lines and pad rows that are missing trailing cells
+                chunk = [row if len(row) >= len(headers) else row + [""] * (len(headers) - len(row))
+                         for row in chunk if any(row)]
+                if not chunk:
+                    continue
+
+                cells = list(zip(*chunk))
+                try:
+                    values = [map(parse, cells[column]) for column, _, parse in present]
+                    # copy the default lists so that rows never share (and mutate) the same list
+                    values += [map(copy.copy, itertools.repeat(value, len(chunk))) for _, value in missing]
+                    records = [dict(zip(fields, row)) for row in zip(*values)]
+                except ValueError as e:
+                    raise ValueError(f"Invalid value in CSV file: {e}")
+
+                for repo, key, record in zip(map(str.strip, cells[repo_index]), map(str.strip, cells[key_index]),
+                                             records):
+                    index.add(repo, key, record)
+
+        return index.repoinfo
+    except csv.Error as e:
+        # e.g. a field over the size limit of the csv module
+        raise ValueError(f"Malformed CSV file: {e}")
+    finally:
+        # hand the underlying file back to the caller instead of closing it along with the wrapper
+        stream.detach()
+
+
+def parse_repo_config_csv(source: BinaryIO | bytes, index: RepoIndex | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Parses a repo-config.csv file into the repo-config map of the form.
+
+    :param source: Binary file or bytes of the CSV file
+    :param index: Index to merge the repositories entered more than once into, see ``_parse_csv``
+    :return: Dictionary containing the repository name to branch info and configurations.
+    """
+
+    return _parse_csv(source, "Branch", REPO_CONFIG_COLUMNS, converters.REPO_CONFIG_DEFAULTS, index)
+
+
+def parse_author_config_csv(source: BinaryIO | bytes, index: RepoIndex | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Parses an author-config.csv file into the author-config map of the form.
+
+    The form holds a single author per repository and branch, so later rows override earlier rows for the same
+    repository and branch, just like duplicate branches do in the configurator. Every overridden row is recorded in
+    the duplicates of the index, so that the dropped authors can be reported.
+
+    :param source: Binary file or bytes of the CSV file
+    :param index: Index to merge the repositories entered more than once into, see ``_parse_csv``
+    :return: Dictionary containing the repository name to branch info and authors.
+    """
+
+    return _parse_csv(source, "Branch", AUTHOR_CONFIG_COLUMNS, converters.AUTHOR_CONFIG_DEFAULTS, index)
+
+
+def parse_group_config_csv(source: BinaryIO | bytes, index: RepoIndex | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Parses a group-config.csv file into the group-config map of the form.
+
+    :param source: Binary file or bytes of the CSV file
+    :param index: Index to merge the repositories entered more than once into, see ``_parse_csv``
+    :return: Dictionary containing the repository name to group info and globs.
+    """
+
+    return _parse_csv(source, "Group Name", GROUP_CONFIG_COLUMNS, converters.GROUP_CONFIG_DEFAULTS, index)
+
+
+def _json_str(data: dict, key: str, owner: str = "") -> str:
+    value = data.get(key, "")
+
+    if not isinstance(value, str):
+        raise ValueError(f"Expected `{key}`{f' of {owner}' if owner else ''} to be a string")
+
+    return value
+
+
+def _json_list(data: dict, key: str, owner: str = "") -> list[str]:
+    value = data.get(key, [])
+
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"Expected `{key}`{f' of {owner}' if owner else ''} to be a list of strings")
+
+    return list(value)
+
+
+def parse_report_config_json(source: BinaryIO | bytes) -> dict[str, str]:
+    """
+    Parses a report-config.json file into the report-config map of the form.
+
+    :param source: Binary file or bytes of the JSON file
+    :return: Dictionary containing the report title
+    """
+
+    stream = _open_text(source)
+
+    try:
+        data = json.load(stream)
+    finally:
+        stream.detach()
+
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object at the top level")
+
+    return {"title": str(data.get("title", ""))}
+
+
+def parse_config_json(source: BinaryIO | bytes) -> dict:
+    """
+    Parses a config.json file into the config.json map of the form.
+
+    :param source: Binary file or bytes of the JSON file
+    :return: Dictionary containing the config.json form data, with authors keyed by their index
+    """
+
+    stream = _open_text(source)
+
+    try:
+        data = json.load(stream)
+    finally:
+        stream.detach()
+
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object at the top level")
+
+    authors = data.get("authors", [])
+
+    if isinstance(authors, dict):
+        authors = list(authors.values())
+
+    if not isinstance(authors, list) or not all(isinstance(author, dict) for author in authors):
+        raise ValueError("Expected `authors` to be a list of objects")
+
+    return {
+        "ignoreGlobList": _json_list(data, "ignoreGlobList"),
+        "formats": _json_list(data, "formats"),
+        "ignoreCommitList": _json_list(data, "ignoreCommitList"),
+        "ignoreAuthorList": _json_list(data, "ignoreAuthorList"),
+        "authors": {
+            index: {
+                "gitId": _json_str(author, "gitId", f"author {index + 1}"),
+                "emails": unique_emails(_json_list(author, "emails", f"author {index + 1}")),
+                "displayName": _json_str(author, "displayName", f"author {index + 1}"),
+                "authorNames": _json_list(author, "authorNames", f"author {index + 1}"),
+                "ignoreGlobList": _json_list(author, "ignoreGlobList", f"author {index + 1}"),
+            }
+            for index, author in enumerate(authors)
+        },
+    }
@@ -0,0 +1,301 @@
+"""
+Times the phases of the reruns of the configurator pages and aggregates them into latency percentiles.
+
+Each rerun of a page is timed by a ``Rerun``, which accumulates the time spent in named phases, such as rendering the
+``st.json`` preview, converting the configs or zipping them, and the sizes of the payloads the rerun produced. The
+time of the rerun not spent in any phase is attributed to ``widgets``, the construction of the page's widgets.
+
+Finished reruns are collected by a ``Profiler`` shared by all sessions, which keeps the latest ``WINDOW`` reruns of
+each page to compute their p50 and p95. When ``LOG_PATH`` is set, every rerun is appended to it as a JSON line, and
+when ``METRICS_PATH`` is set, the percentiles of every page are written to it in the Prometheus text format, e.g. for
+the textfile collector of the node exporter, at most once every ``METRICS_INTERVAL`` seconds. Both are written outside
+the lock of the profiler, so that the reruns of other sessions never wait for the disk.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterable, NamedTuple
+
+from utils import storage
+
+PANEL = os.environ.get("REPOCONFIG_PROFILE_PANEL", "") not in ("", "0")
+LOG_PATH = os.environ.get("REPOCONFIG_PROFILE_LOG", "")
+METRICS_PATH = os.environ.get("REPOCONFIG_PROFILE_METRICS", "")
+METRICS_INTERVAL = float(os.environ.get("REPOCONFIG_PROFILE_METRICS_INTERVAL", 15))
+WINDOW = int(os.environ.get("REPOCONFIG_PROFILE_WINDOW", 500))
+
+QUANTILES = (0.5, 0.95)
+
+# the phase the time of a rerun not spent in any other phase is attributed to
+WIDGETS_PHASE = "widgets"
+
+
+class RerunRecord(NamedTuple):
+    page: str
+    timestamp: float
+    seconds: float
+    phases: dict[str, float]
+    payloads: dict[str, int]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "page": self.page,
+            "timestamp": round(self.timestamp, 3),
+            "seconds": round(self.seconds, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "payloads": self.payloads,
+        })
+
+
+class Rerun:
+    """
+    Times a single rerun of a page.
+    """
+
+    def __init__(self, page: str):
+        self.page = page
+        self.timestamp = time.time()
+        self.phases: dict[str, float] = {}
+        self.payloads: dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Adds the time spent in the block to a phase of the rerun.
+
+        Phases entered within another phase are counted in the outer phase only, so that the phases never add up to
+        more than the rerun.
+
+        :param name: Name of the phase, e.g. convert
+        """
+
+        if self._depth:
+            yield
+            return
+
+        self._depth += 1
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def payload(self, name: str, size: int):
+        """
+        Records the size of a payload produced by the rerun.
+
+        :param name: Name of the payload, e.g. repo-config.csv
+        :param size: Size of the payload in bytes
+        """
+
+        self.payloads[name] = size
+
+    def finish(self) -> RerunRecord:
+        """
+        :return: Record of the rerun, with the time not spent in any phase attributed to the widgets phase
+        """
+
+        seconds = time.perf_counter() - self._start
+        widgets = max(seconds - sum(self.phases.values()), 0.0)
+        return RerunRecord(self.page, self.timestamp, seconds, {WIDGETS_PHASE: widgets, **self.phases},
+                           dict(self.payloads))
+
+
+def quantiles(values: Iterable[float], qs: tuple[float, ...] = QUANTILES) -> dict[float, float]:
+    """
+    Computes quantiles with the nearest-rank method.
+
+    :param values: Values to compute the quantiles of
+    :param qs: Quantiles to compute, between 0 and 1
+    :return: Mapping from quantile to value, empty if there are no values
+    """
+
+    values = sorted(values)
+
+    if not values:
+        return {}
+
+    return {q: values[max(math.ceil(q * len(values)) - 1, 0)] for q in qs}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Profiler:
+    """
+    Collects the finished reruns of every page. Safe to share between sessions.
+    """
+
+    # name and help text of each metric written in the Prometheus text format
+    METRICS = (
+        ("repoconfig_rerun_seconds", "Duration of the reruns of each configurator page."),
+        ("repoconfig_phase_seconds", "Time spent in each phase of the reruns of each configurator page."),
+        ("repoconfig_payload_bytes", "Size of the payloads produced by the reruns of each configurator page."),
+    )
+
+    def __init__(self, window: int = WINDOW, log_path: str = LOG_PATH, metrics_path: str = METRICS_PATH,
+                 metrics_interval: float = METRICS_INTERVAL):
+        """
+        :param window: Number of the latest reruns of each page to compute the percentiles over
+        :param log_path: Path of the file to append each rerun to as a JSON line, or empty to not log the reruns
+        :param metrics_path: Path of the file to write the metrics to in the Prometheus text format after reruns, or
+                             empty to not write the metrics
+        :param metrics_interval: Minimum seconds between two writes of the metrics
+        """
+
+        self.window = window
+        self.log_path = log_path
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self._next_metrics = 0.0
+        self._reruns: dict[str, deque[RerunRecord]] = {}
+        # running sum and count of every series since the start of the server, as Prometheus summaries expect
+        self._totals: dict[tuple[str, str], list[float]] = {}
+        # functions returning more metrics in the Prometheus text format, e.g. the memory accounting of a cache
+        self._collectors: list[Callable[[], str]] = []
+        self._lock = threading.Lock()
+
+    def add_collector(self, collector: Callable[[], str]):
+        """
+        Adds more metrics to write alongside the metrics of the reruns.
+
+        :param collector: Function returning the metrics in the Prometheus text format
+        """
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _add(self, metric: str, labels: str, value: float):
+        total = self._totals.setdefault((metric, labels), [0.0, 0])
+        total[0] += value
+        total[1] += 1
+
+    def record(self, rerun: RerunRecord):
+        """
+        Records a finished rerun, and writes it to the log and the metrics file when they are configured, the metrics
+        only if they were last written ``metrics_interval`` seconds ago.
+
+        :param rerun: Record of the rerun
+        """
+
+        now = time.monotonic()
+        snapshot = None
+
+        with self._lock:
+            self._reruns.setdefault(rerun.page, deque(maxlen=self.window)).append(rerun)
+            self._add("repoconfig_rerun_seconds", _labels(page=rerun.page), rerun.seconds)
+
+            for name, seconds in rerun.phases.items():
+                self._add("repoconfig_phase_seconds", _labels(page=rerun.page, phase=name), seconds)
+
+            for name, size in rerun.payloads.items():
+                self._add("repoconfig_payload_bytes", _labels(page=rerun.page, payload=name), size)
+
+            if self.metrics_path and now >= self._next_metrics:
+                self._next_metrics = now + self.metrics_interval
+                snapshot = self._snapshot()
+
+        # written outside the lock, so that other sessions do not wait for the disk
+        if self.log_path:
+            # a single write of a whole line to a file opened for appending, so the lines of reruns never interleave
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(rerun.to_json() + "\n")
+
+        if snapshot is not None:
+            storage.atomic_write(os.path.abspath(self.metrics_path), self._to_prometheus(*snapshot).encode("utf-8"))
+
+    def _snapshot(self) -> tuple[dict[str, list[RerunRecord]], dict[tuple[str, str], tuple[float, int]], list]:
+        # copies of the reruns, totals and collectors, to format the metrics without holding the lock
+        return ({page: list(reruns) for page, reruns in self._reruns.items()},
+                {key: (total, count) for key, (total, count) in self._totals.items()}, list(self._collectors))
+
+    @staticmethod
+    def _series(reruns: dict[str, list[RerunRecord]]) -> dict[tuple[str, str], list[float]]:
+        series = {}
+
+        for page, reruns in reruns.items():
+            for rerun in reruns:
+                series.setdefault(("repoconfig_rerun_seconds", _labels(page=page)), []).append(rerun.seconds)
+
+                for name, seconds in rerun.phases.items():
+                    key = ("repoconfig_phase_seconds", _labels(page=page, phase=name))
+                    series.setdefault(key, []).append(seconds)
+
+                for name, size in rerun.payloads.items():
+                    series.setdefault(("repoconfig_payload_bytes", _labels(page=page, payload=name)), []).append(size)
+
+        return series
+
+    def summary(self, page: str) -> dict:
+        """
+        Computes the percentiles of the latest reruns of a page.
+
+        :param page: Name of the page
+        :return: Mapping from ``rerun``, ``phases`` and ``payloads`` to a mapping from name to the percentiles of its
+                 values, where the rerun itself is named ``total``, and from ``reruns`` to the number of reruns
+        """
+
+        with self._lock:
+            reruns = list(self._reruns.get(page, ()))
+
+        phases, payloads = {}, {}
+
+        for rerun in reruns:
+            for name, seconds in rerun.phases.items():
+                phases.setdefault(name, []).append(seconds)
+
+            for name, size in rerun.payloads.items():
+                payloads.setdefault(name, []).append(size)
+
+        return {
+            "reruns": len(reruns),
+            "rerun": {"total": quantiles(rerun.seconds for rerun in reruns)},
+            "phases": {name: quantiles(values) for name, values in phases.items()},
+            "payloads": {name: quantiles(values) for name, values in payloads.items()},
+        }
+
+    def _to_prometheus(self, reruns: dict[str, list[RerunRecord]], totals: dict[tuple[str, str], tuple[float, int]],
+                       collectors: list[Callable[[], str]]) -> str:
+        series = self._series(reruns)
+        lines = []
+
+        for metric, description in self.METRICS:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} summary")
+
+            for (name, labels), values in sorted(series.items()):
+                if name != metric:
+                    continue
+
+                for q, value in quantiles(values).items():
+                    lines.append(f'{metric}{{{labels},quantile="{q}"}} {value}')
+
+                total, count = totals[(metric, labels)]
+                lines.append(f"{metric}_sum{{{labels}}} {total}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n" + "".join(collector() for collector in collectors)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Percentiles of the latest reruns of every page, in the Prometheus text format
+        """
+
+        with self._lock:
+            snapshot = self._snapshot()
+
+        return self._to_prometheus(*snapshot)
@@ -0,0 +1,204 @@
+"""
+Checks that the repositories and branches entered in the configurators exist, before RepoSense is run on them.
+
+Each repository is listed once with ``git ls-remote --heads``, on a bounded thread pool with a timeout per check, and
+the branches of the repository are checked against the listed heads. Listings are cached by location for a TTL, so
+rerunning a page or checking another branch of the same repository does not run ``git`` again.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterable, NamedTuple
+
+MAX_WORKERS = int(os.environ.get("REPOCONFIG_CHECK_WORKERS", 16))
+CHECK_TIMEOUT = float(os.environ.get("REPOCONFIG_CHECK_TIMEOUT", 10))
+CHECK_TTL = float(os.environ.get("REPOCONFIG_CHECK_TTL", 5 * 60))
+
+# never wait for credentials, an unreachable private repository fails the check instead, and never run the commands
+# of transports such as ext::, whose locations are commands
+_GIT_ENV = {
+    "GIT_TERMINAL_PROMPT": "0",
+    "GIT_SSH_COMMAND": os.environ.get("GIT_SSH_COMMAND", "ssh -o BatchMode=yes"),
+    "GIT_ALLOW_PROTOCOL": "file:git:http:https:ssh",
+}
+
+
+class RemoteStatus(NamedTuple):
+    reachable: bool
+    message: str
+    branches: frozenset[str] = frozenset()
+
+
+class CheckResult(NamedTuple):
+    ok: bool
+    message: str
+
+
+def is_remote(location: str) -> bool:
+    """
+    Checks if a repository location is a URL, as opposed to a path on the disk.
+
+    :param location: Remote Repo URL or Disk Path to the repository
+    :return: True if the location is a URL, including scp-like ``user@host:path`` locations
+    """
+
+    if "://" in location:
+        return True
+
+    head, sep, _ = location.partition(":")
+    # scp-like syntax, which git only recognises when there is no slash before the colon
+    return bool(sep) and "/" not in head and "\\" not in head and len(head) > 1
+
+
+def list_heads(location: str, timeout: float = CHECK_TIMEOUT) -> RemoteStatus:
+    """
+    Lists the branches of a repository with ``git ls-remote``.
+
+    :param location: Remote Repo URL or Disk Path to the repository
+    :param timeout: Seconds to wait for ``git`` before giving up
+    :return: RemoteStatus of the repository
+    """
+
+    if location.startswith("-"):
+        # git would read the location as an option, e.g. --upload-pack=<command>, which runs the command
+        return RemoteStatus(False, "Repository location cannot start with `-`")
+
+    if not is_remote(location) and not os.path.exists(os.path.expanduser(location)):
+        return RemoteStatus(False, "Disk path does not exist")
+
+    try:
+        process = subprocess.run(
+            ["git", "ls-remote", "--heads", "--", location],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env={**os.environ, **_GIT_ENV},
+            stdin=subprocess.DEVNULL,
+        )
+    except subprocess.TimeoutExpired:
+        return RemoteStatus(False, f"Timed out after {timeout:g}s")
+    except FileNotFoundError:
+        return RemoteStatus(False, "`git` is not installed")
+
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        return RemoteStatus(False, lines[0] if lines else f"`git ls-remote` exited with {process.returncode}")
+
+    branches = frozenset(
+        ref.removeprefix("refs/heads/")
+        for line in process.stdout.splitlines()
+        for ref in line.split("\t")[1:2]
+    )
+    return RemoteStatus(True, "Repository is reachable", branches)
+
+
+def check_branch(status: RemoteStatus, branch: str | None) -> CheckResult:
+    """
+    Checks a branch against the listed branches of its repository.
+
+    :param status: RemoteStatus of the repository
+    :param branch: Name of the branch, or an empty value for the default branch
+    :return: CheckResult of the branch
+    """
+
+    if not status.reachable:
+        return CheckResult(False, status.message)
+
+    if not branch:
+        return CheckResult(True, status.message)
+
+    if branch in status.branches:
+        return CheckResult(True, f"Branch `{branch}` exists")
+
+    return CheckResult(False, f"Branch `{branch}` does not exist")
+
+
+class ReachabilityChecker:
+    """
+    Lists repositories concurrently on a bounded thread pool, caching the listings by location for a TTL.
+
+    A single checker can be shared by all sessions, concurrent checks of the same location wait on the same
+    ``git ls-remote``.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, timeout: float = CHECK_TIMEOUT, ttl: float = CHECK_TTL):
+        self.timeout = timeout
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reachability")
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[float, RemoteStatus]] = {}
+        self._pending: dict[str, Future] = {}
+
+    def _list(self, location: str) -> RemoteStatus:
+        try:
+            status = list_heads(location, self.timeout)
+
+            with self._lock:
+                self._cache[location] = (time.monotonic() + self.ttl, status)
+        finally:
+            with self._lock:
+                del self._pending[location]
+
+        return status
+
+    def lookup(self, location: str) -> RemoteStatus | None:
+        """
+        Returns the cached listing of a repository, if it has not expired.
+
+        :param location: Remote Repo URL or Disk Path to the repository
+        :return: RemoteStatus of the repository, or None if it has not been checked within the TTL
+        """
+
+        cached = self._cache.get(location)
+        return cached[1] if cached is not None and cached[0] > time.monotonic() else None
+
+    def check_locations(self, locations: Iterable[str]) -> dict[str, RemoteStatus]:
+        """
+        Lists every repository that has no cached listing concurrently, and waits for all of them.
+
+        :param locations: Remote Repo URLs or Disk Paths to the repositories
+        :return: Mapping from location to RemoteStatus
+        """
+
+        results = {}
+        futures = {}
+
+        with self._lock:
+            for location in dict.fromkeys(locations):
+                status = self.lookup(location)
+
+                if status is not None:
+                    results[location] = status
+                elif location in self._pending:
+                    futures[location] = self._pending[location]
+                else:
+                    futures[location] = self._pending[location] = self._executor.submit(self._list, location)
+
+        wait(futures.values())
+        results.update((location, future.result()) for location, future in futures.items())
+        return results
+
+    def check(self, repoinfo: dict[str, Iterable[str]]) -> dict[str, dict[str, CheckResult]]:
+        """
+        Checks every branch of every repository of a form mapping.
+
+        :param repoinfo: Dictionary containing the repository name to its branches
+        :return: Mapping from repository to branch to CheckResult
+        """
+
+        statuses = self.check_locations(repoinfo)
+        return {
+            location: {branch: check_branch(statuses[location], branch) for branch in branches}
+            for location, branches in repoinfo.items()
+        }
+
+    def clear(self):
+        """
+        Forgets all cached listings, e.g. after the user has fixed access to a repository.
+        """
+
+        with self._lock:
+            self._cache.clear()
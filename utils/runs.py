@@ -0,0 +1,379 @@
+"""
+Runs RepoSense on the generated config files, so that a report can be generated without leaving the app.
+
+Each run gets its own directory under ``RUNS_DIR``, holding the config files it was queued with under ``configs/``,
+the report RepoSense generates under ``reports/``, its full log in ``run.log`` and its record in ``run.json``. Runs
+are queued on a ``RunQueue``, which runs at most ``MAX_CONCURRENT_RUNS`` of them at a time as subprocesses on a
+bounded thread pool, and refuses new runs once ``MAX_QUEUED_RUNS`` are waiting. Every run belongs to the owner that
+queued it, e.g. the draft whose id is kept in the URL, which is the only owner that can see and cancel it. Owners
+outlive sessions, so the runs are still shown after a refresh of the page or a restart of the server. The output of a
+run is read line by line as it is written, and its progress is taken from the ``(i/n)`` counters RepoSense prints
+while it clones and analyses each repository, so that pages only read the state of the runs, and never wait for them.
+
+The command is ``REPOSENSE_COMMAND``, followed by ``--config`` and ``--output`` with the directories of the run, and
+the extra arguments of the run, which may only use the options in ``ALLOWED_OPTIONS``. It can be replaced, e.g. by a
+local stub script, without changing anything else. Runs run in their own directories, where RepoSense clones the
+repositories, so the relative paths of the command are resolved against the working directory of the app first.
+"""
+
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+
+from utils import storage
+
+REPOSENSE_COMMAND = os.environ.get("REPOCONFIG_REPOSENSE_COMMAND", "java -jar RepoSense.jar")
+RUNS_DIR = os.environ.get("REPOCONFIG_RUNS_DIR", "./runs")
+MAX_CONCURRENT_RUNS = int(os.environ.get("REPOCONFIG_MAX_CONCURRENT_RUNS", 1))
+MAX_QUEUED_RUNS = int(os.environ.get("REPOCONFIG_MAX_QUEUED_RUNS", 10))
+RUN_TIMEOUT = float(os.environ.get("REPOCONFIG_RUN_TIMEOUT", 0))
+RUN_HISTORY = int(os.environ.get("REPOCONFIG_RUN_HISTORY", 50))
+RUN_REFRESH = float(os.environ.get("REPOCONFIG_RUN_REFRESH", 1))
+
+# number of the latest log lines of each run kept in memory, the full log is kept on the disk
+LOG_TAIL = 500
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# long options of RepoSense that runs may be queued with; the options choosing the config files, the output and the
+# repositories are set by the queue, and the options serving or copying files of the server are left out
+ALLOWED_OPTIONS = (
+    "--since", "--until", "--period", "--formats", "--timezone", "--ignore-standalone-config",
+    "--ignore-filesize-limit", "--shallow-cloning", "--find-previous-authors", "--analyze-authorship",
+    "--originality-threshold", "--last-modified-date",
+)
+
+_PROGRESS = re.compile(r"\((\d+)/(\d+)\)")
+
+
+class RunQueueFull(Exception):
+    """
+    Raised when a run is queued while ``MAX_QUEUED_RUNS`` runs are already waiting.
+    """
+
+
+def check_args(args: list[str]):
+    """
+    Checks that the extra arguments of a run only use the options in ``ALLOWED_OPTIONS``, given as ``--option value``
+    or ``--option=value``, so that a run cannot read other config files or write its report elsewhere.
+
+    :param args: Extra arguments of RepoSense
+    :raises ValueError: If an argument is an option that is not allowed, including short options
+    """
+
+    for arg in args:
+        if arg.startswith("-") and arg.partition("=")[0] not in ALLOWED_OPTIONS:
+            raise ValueError(f"`{arg}` is not one of the allowed options {', '.join(ALLOWED_OPTIONS)}")
+
+
+def resolve_command(command: list[str]) -> list[str]:
+    """
+    Resolves the relative paths of a command against the current working directory, so that it can be run from
+    another directory, e.g. ``java -jar RepoSense.jar`` into ``java -jar /app/RepoSense.jar``.
+
+    :param command: Program and arguments of the command
+    :return: Command whose program, if given as a path, and whose arguments naming existing files are absolute paths
+    """
+
+    # programs without a directory, e.g. java, are looked up on the PATH instead
+    return [os.path.abspath(arg) if (os.sep in arg if index == 0 else not arg.startswith("-") and os.path.exists(arg))
+            else arg for index, arg in enumerate(command)]
+
+
+class RunRecord(NamedTuple):
+    id: str
+    status: str
+    args: list[str]
+    submitted: float
+    started: float | None = None
+    finished: float | None = None
+    returncode: int | None = None
+    message: str = ""
+    # id of the owner that queued the run, empty for runs recorded before runs had owners
+    owner: str = ""
+
+    @property
+    def duration(self) -> float | None:
+        """
+        :return: Seconds the run has been running for, or ran for if it finished, or None if it has not started
+        """
+
+        if self.started is None:
+            return None
+
+        return (self.finished or time.time()) - self.started
+
+
+class Run:
+    """
+    State of a single run, updated by the thread running it and read by the pages.
+    """
+
+    def __init__(self, record: RunRecord, directory: str):
+        self.record = record
+        self.directory = directory
+        # latest counter of the log, e.g. (3, 10) after the third of ten repositories
+        self.progress: tuple[int, int] | None = None
+        self.cancelled = threading.Event()
+        self.timed_out = False
+        self._tail: deque[str] = deque(maxlen=LOG_TAIL)
+        self._process: subprocess.Popen | None = None
+        self._future: Future | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def id(self) -> str:
+        return self.record.id
+
+    @property
+    def reports_dir(self) -> str:
+        return os.path.join(self.directory, "reports")
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.directory, "run.log")
+
+    def tail(self, lines: int = LOG_TAIL) -> list[str]:
+        """
+        :param lines: Maximum number of lines to return
+        :return: Latest lines of the log of the run, read from the disk if the run was loaded from the history
+        """
+
+        with self._lock:
+            tail = list(self._tail)
+
+        if not tail and os.path.isfile(self.log_path):
+            with open(self.log_path, encoding="utf-8", errors="replace") as f:
+                tail = [line.rstrip("\n") for line in deque(f, maxlen=LOG_TAIL)]
+
+        return tail[-lines:]
+
+    def _update(self, **changes):
+        self.record = self.record._replace(**changes)
+
+        record = json.dumps(self.record._asdict()).encode("utf-8")
+        storage.atomic_write(os.path.join(self.directory, "run.json"), record)
+
+    def _log(self, line: str):
+        counters = _PROGRESS.findall(line)
+
+        with self._lock:
+            self._tail.append(line)
+
+            if counters and int(counters[-1][1]) > 0:
+                done, total = map(int, counters[-1])
+                self.progress = (min(done, total), total)
+
+
+class RunQueue:
+    """
+    Queues runs of RepoSense and runs them on a bounded thread pool, keeping the history of the latest runs. Safe to
+    share between sessions, which only see and cancel the runs of their owner.
+    """
+
+    def __init__(self, command: str = REPOSENSE_COMMAND, runs_dir: str = RUNS_DIR,
+                 max_concurrent: int = MAX_CONCURRENT_RUNS, max_queued: int = MAX_QUEUED_RUNS,
+                 timeout: float = RUN_TIMEOUT, history: int = RUN_HISTORY):
+        """
+        :param command: Command running RepoSense, before its arguments, e.g. ``java -jar RepoSense.jar``
+        :param runs_dir: Directory to keep the directories of the runs in
+        :param max_concurrent: Maximum number of runs running at the same time
+        :param max_queued: Maximum number of runs waiting to run
+        :param timeout: Seconds after which a run is stopped, or 0 to let runs run for as long as they take
+        :param history: Number of the latest runs to keep, whose directories are removed once they are older
+        """
+
+        self.command = shlex.split(command)
+        self.runs_dir = runs_dir
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.history = history
+        self._executor = None
+        self._lock = threading.Lock()
+        # runs from the oldest to the latest submitted
+        self._runs: dict[str, Run] = {}
+
+        os.makedirs(runs_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        records = []
+
+        for entry in os.scandir(self.runs_dir):
+            try:
+                with open(os.path.join(entry.path, "run.json"), encoding="utf-8") as f:
+                    records.append(RunRecord(**json.load(f)))
+            except (OSError, ValueError, TypeError):
+                # not a run, or a run whose record was not written completely
+                continue
+
+        for record in sorted(records, key=lambda record: record.submitted):
+            run = self._runs[record.id] = Run(record, os.path.join(self.runs_dir, record.id))
+
+            if record.status not in FINISHED:
+                # the server stopped while the run was queued or running
+                run._update(status=FAILED, finished=record.finished or time.time(),
+                            message="Interrupted by a restart of the server")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="reposense")
+
+            return self._executor
+
+    def submit(self, owner: str, configs: dict[str, bytes], args: list[str] = ()) -> Run:
+        """
+        Queues a run of RepoSense on config files.
+
+        :param owner: Id of the owner queuing the run, e.g. the id of a draft
+        :param configs: Mapping from config file name to its contents
+        :param args: Extra arguments of RepoSense, e.g. ``["--since", "01/01/2024"]``
+        :return: The queued run
+        :raises ValueError: If the arguments use an option that is not allowed, see ``check_args``
+        :raises RunQueueFull: If ``max_queued`` runs are already waiting
+        """
+
+        check_args(args)
+
+        with self._lock:
+            if sum(run.record.status == QUEUED for run in self._runs.values()) >= self.max_queued:
+                raise RunQueueFull(f"{self.max_queued} runs are already waiting, try again once one of them starts")
+
+            run_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+            directory = os.path.join(self.runs_dir, run_id)
+            os.makedirs(os.path.join(directory, "configs"))
+
+            for name, data in configs.items():
+                with open(os.path.join(directory, "configs", name), "wb") as f:
+                    f.write(data)
+
+            run = self._runs[run_id] = Run(RunRecord(run_id, QUEUED, list(args), time.time(), owner=owner),
+                                          directory)
+            run._update()
+            self._prune()
+
+        run._future = self._get_executor().submit(self._run, run)
+        return run
+
+    def _prune(self):
+        finished = [run for run in self._runs.values() if run.record.status in FINISHED]
+
+        for run in finished[:max(len(self._runs) - self.history, 0)]:
+            del self._runs[run.id]
+            shutil.rmtree(run.directory, ignore_errors=True)
+
+    def _timeout(self, run: Run):
+        run.timed_out = True
+        run._process.kill()
+
+    def _run(self, run: Run):
+        if run.cancelled.is_set():
+            run._update(status=CANCELLED, finished=time.time(), message="Cancelled before it started")
+            return
+
+        command = [*resolve_command(self.command), "--config", os.path.abspath(os.path.join(run.directory, "configs")),
+                   "--output", os.path.abspath(run.reports_dir), *run.record.args]
+        run._update(status=RUNNING, started=time.time())
+        timer = None
+
+        try:
+            with open(run.log_path, "w", encoding="utf-8") as log:
+                log.write(f"$ {shlex.join(command)}\n")
+                run._log(f"$ {shlex.join(command)}")
+
+                with run._lock:
+                    run._process = subprocess.Popen(command, cwd=run.directory, stdin=subprocess.DEVNULL,
+                                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                                    encoding="utf-8", errors="replace", bufsize=1)
+
+                    if run.cancelled.is_set():
+                        # cancelled while the process was starting
+                        run._process.terminate()
+
+                if self.timeout:
+                    timer = threading.Timer(self.timeout, self._timeout, (run,))
+                    timer.daemon = True
+                    timer.start()
+
+                for line in run._process.stdout:
+                    log.write(line)
+                    run._log(line.rstrip("\n"))
+
+                returncode = run._process.wait()
+        except OSError as e:
+            # e.g. the command is not installed
+            run._log(str(e))
+            run._update(status=FAILED, finished=time.time(), message=f"Unable to run RepoSense: {e}")
+            return
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if run.cancelled.is_set():
+            run._update(status=CANCELLED, finished=time.time(), returncode=returncode, message="Cancelled")
+        elif run.timed_out:
+            run._update(status=FAILED, finished=time.time(), returncode=returncode,
+                        message=f"Stopped after {self.timeout:g} seconds")
+        else:
+            run._update(status=SUCCEEDED if returncode == 0 else FAILED, finished=time.time(), returncode=returncode,
+                        message="" if returncode == 0 else f"RepoSense exited with code {returncode}")
+
+    def cancel(self, run_id: str, owner: str):
+        """
+        Cancels a run, removing it from the queue if it is waiting, or stopping its process if it is running.
+
+        :param run_id: Id of the run
+        :param owner: Id of the owner cancelling the run, which does nothing unless the owner queued the run
+        """
+
+        run = self.get(run_id, owner)
+
+        if run is None or run.record.status in FINISHED:
+            return
+
+        run.cancelled.set()
+
+        if run._future is not None and run._future.cancel():
+            run._update(status=CANCELLED, finished=time.time(), message="Cancelled before it started")
+            return
+
+        with run._lock:
+            if run._process is not None and run._process.poll() is None:
+                run._process.terminate()
+
+    def runs(self, owner: str) -> list[Run]:
+        """
+        :param owner: Id of the owner
+        :return: Runs of the owner in the history, from the latest submitted
+        """
+
+        with self._lock:
+            return [run for run in reversed(self._runs.values()) if run.record.owner == owner]
+
+    def get(self, run_id: str, owner: str) -> Run | None:
+        """
+        :param run_id: Id of the run
+        :param owner: Id of the owner
+        :return: The run, or None if it is not in the history or was not queued by the owner
+        """
+
+        with self._lock:
+            run = self._runs.get(run_id)
+
+        return run if run is not None and run.record.owner == owner else None
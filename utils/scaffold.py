@@ -0,0 +1,141 @@
+"""
+Builds a deployable RepoSense scaffold around the generated config files.
+
+The scaffold contains the config files under ``configs/``, a run script that downloads and runs RepoSense, a
+Dockerfile and compose file to run it in a container, and a GitHub Actions workflow to run it in CI.
+
+The config files are the ones created on the configurator pages, so the scaffold always holds the same validated
+config files as ``configs.zip``. The archive is streamed into a spooled temporary file by
+``archives.spooled_archive``. Archives are deterministic, so the same config files always give byte-identical
+archives, which can be cached and deduplicated by their digest.
+"""
+
+import tempfile
+
+from utils import archives
+
+RUN_SCRIPT = """\
+#!/bin/sh
+# Generates the RepoSense report of the repositories configured in configs/ into reports/
+#
+# Set REPOSENSE_VERSION to a release tag, e.g. v3.0, to pin the version of RepoSense, and pass any other RepoSense
+# options as arguments, e.g. ./run.sh --since 01/01/2024
+set -eu
+
+cd "$(dirname "$0")"
+
+REPOSENSE_VERSION="${REPOSENSE_VERSION:-latest}"
+REPOSENSE_JAR="${REPOSENSE_JAR:-RepoSense.jar}"
+
+if [ ! -f "$REPOSENSE_JAR" ]; then
+    if [ "$REPOSENSE_VERSION" = "latest" ]; then
+        url="https://github.com/reposense/RepoSense/releases/latest/download/RepoSense.jar"
+    else
+        url="https://github.com/reposense/RepoSense/releases/download/$REPOSENSE_VERSION/RepoSense.jar"
+    fi
+
+    echo "Downloading RepoSense ($REPOSENSE_VERSION)..."
+    curl -fsSL -o "$REPOSENSE_JAR" "$url"
+fi
+
+if [ "${1:-}" = "--download-only" ]; then
+    exit 0
+fi
+
+java -jar "$REPOSENSE_JAR" --config configs --output reports "$@"
+"""
+
+DOCKERFILE = """\
+FROM eclipse-temurin:17-jre
+
+RUN apt-get update \\
+    && apt-get install -y --no-install-recommends curl git \\
+    && rm -rf /var/lib/apt/lists/*
+
+ARG REPOSENSE_VERSION=latest
+
+WORKDIR /reposense
+COPY . /reposense
+
+RUN chmod +x run.sh && REPOSENSE_VERSION=$REPOSENSE_VERSION ./run.sh --download-only
+
+ENTRYPOINT ["./run.sh"]
+"""
+
+COMPOSE_FILE = """\
+services:
+  reposense:
+    build:
+      context: .
+      args:
+        REPOSENSE_VERSION: ${REPOSENSE_VERSION:-latest}
+    volumes:
+      - ./reports:/reposense/reports
+"""
+
+CI_WORKFLOW = """\
+name: RepoSense Report
+
+on:
+  push:
+    branches: [main, master]
+  schedule:
+    - cron: "0 0 * * *"
+  workflow_dispatch:
+
+jobs:
+  report:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: actions/setup-java@v4
+        with:
+          distribution: temurin
+          java-version: "17"
+      - run: sh run.sh
+      - uses: actions/upload-artifact@v4
+        with:
+          name: reposense-report
+          path: reports
+"""
+
+README = """\
+# RepoSense Scaffold
+
+Generated by RepoConfig. The RepoSense config files are in `configs/`.
+
+* Run `./run.sh` to download RepoSense and generate the report into `reports/` (requires Java 17 and `git`)
+* Run `docker compose up --build` to generate the report in a container instead
+* Push this folder to a GitHub repository to generate the report on every push and daily with GitHub Actions
+"""
+
+EXECUTABLES = ("run.sh",)
+
+
+def scaffold_files(configs: dict[str, bytes | str]) -> dict[str, bytes | str]:
+    """
+    Lays out the files of the scaffold around the config files.
+
+    :param configs: Mapping from config file name to its contents
+    :return: Mapping from path in the scaffold to contents
+    """
+
+    return {
+        **{f"configs/{name}": data for name, data in configs.items()},
+        "run.sh": RUN_SCRIPT,
+        "Dockerfile": DOCKERFILE,
+        "docker-compose.yml": COMPOSE_FILE,
+        ".github/workflows/reposense.yml": CI_WORKFLOW,
+        "README.md": README,
+    }
+
+
+def build_scaffold(configs: dict[str, bytes | str]) -> tempfile.SpooledTemporaryFile:
+    """
+    Builds the scaffold archive into a spooled temporary file.
+
+    :param configs: Mapping from config file name to its contents
+    :return: Spooled temporary file containing the archive, positioned at its start
+    """
+
+    return archives.spooled_archive(scaffold_files(configs), executables=EXECUTABLES)
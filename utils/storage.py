@@ -0,0 +1,188 @@
+"""
+Per-session storage for generated config files.
+
+Each session writes its files into its own directory under ``TEMP_DIR`` (or keeps them in memory), so concurrent
+sessions on the same server never overwrite each other's files. Files are written atomically, and session
+directories that have not been touched for longer than the TTL are garbage collected. In server mode, the contents of
+the files are kept in the ``ArtifactCache`` shared by all sessions instead of in the store.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from utils.memory import ArtifactCache, SessionBudgetError, content_key
+
+TEMP_DIR = os.environ.get("REPOCONFIG_TEMP_DIR", "./temp")
+STORAGE_MODE = os.environ.get("REPOCONFIG_STORAGE", "disk")
+SESSION_TTL = float(os.environ.get("REPOCONFIG_SESSION_TTL", 24 * 60 * 60))
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Writes data to a file atomically, by writing to a temporary file in the same directory and renaming it.
+
+    Readers either see the previous version of the file or the complete new version, never a partial write.
+
+    :param path: Path of the file to write
+    :param data: Bytes to write
+    """
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def collect_garbage(base_dir: str = TEMP_DIR, ttl: float = SESSION_TTL, keep: tuple[str, ...] = ()) -> list[str]:
+    """
+    Removes session directories that have not been modified within the TTL.
+
+    :param base_dir: Directory containing the session directories
+    :param ttl: Maximum age in seconds of a session directory since its last write
+    :param keep: Names of session directories to never remove
+    :return: Paths of the removed directories
+    """
+
+    if not os.path.isdir(base_dir):
+        return []
+
+    removed = []
+    cutoff = time.time() - ttl
+
+    for entry in os.scandir(base_dir):
+        if entry.name in keep or not entry.is_dir(follow_symlinks=False):
+            continue
+
+        try:
+            if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                shutil.rmtree(entry.path)
+                removed.append(entry.path)
+        except FileNotFoundError:
+            # another process got to it first
+            continue
+
+    return removed
+
+
+class ArtifactStore:
+    """
+    Stores the generated config files of a single session, either in memory or in a session directory on disk.
+    """
+
+    def __init__(self, session_id: str, base_dir: str | None = TEMP_DIR, cache: ArtifactCache | None = None):
+        """
+        :param session_id: Unique identifier of the session owning the files
+        :param base_dir: Directory to create the session directory in, or None to keep the files in memory only
+        :param cache: Cache shared by all sessions to keep the contents of the files in, or None to keep them in the
+                      store
+        """
+
+        self.session_id = session_id
+        self.directory = None if base_dir is None else os.path.join(base_dir, session_id)
+        self.cache = cache
+        # contents of each file, or their key in the cache if there is one
+        self._files: dict[str, bytes | str] = {}
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def put(self, name: str, data: bytes) -> bytes:
+        """
+        Stores a file, writing it to the session directory if the store is backed by disk.
+
+        :param name: Name of the file
+        :param data: Contents of the file
+        :return: The same bytes, so that they can be reused for downloads without being serialized again, which are
+                 shared with the other sessions storing the same file if the store has a cache
+        :raises SessionBudgetError: If the store has a cache, and the file would take the session over its budget
+        """
+
+        if self.cache is not None:
+            key = content_key(data)
+            unchanged = self._files.get(name) == key
+
+            try:
+                data = self.cache.put(self.session_id, name, data, key)
+            except SessionBudgetError:
+                # the name is unbound, so the previous contents are not kept either
+                self._files.pop(name, None)
+                raise
+
+            if unchanged:
+                return data
+        elif self._files.get(name) == data:
+            return data
+
+        if self.directory is not None:
+            # the directory may have been collected if the session was idle for longer than the TTL
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write(os.path.join(self.directory, name), data)
+
+        self._files[name] = data if self.cache is None else key
+        return data
+
+    def get(self, name: str) -> bytes | None:
+        """
+        :param name: Name of the file
+        :return: Contents of the file, or None if it has not been stored, or has been evicted from the cache and is
+                 not kept on the disk
+        """
+
+        if self.cache is None or name not in self._files:
+            return self._files.get(name)
+
+        data = self.cache.get(self.session_id, name)
+
+        if data is None and self.path(name) is not None and os.path.isfile(self.path(name)):
+            with open(self.path(name), "rb") as f:
+                data = f.read()
+
+            try:
+                data = self.cache.put(self.session_id, name, data, self._files[name])
+            except SessionBudgetError:
+                # served from the disk without being cached
+                pass
+
+        return data
+
+    def path(self, name: str) -> str | None:
+        """
+        :param name: Name of the file
+        :return: Path of the file on disk, or None if the store is in memory or the file has not been stored
+        """
+
+        if self.directory is None or name not in self._files:
+            return None
+
+        return os.path.join(self.directory, name)
+
+    def names(self) -> list[str]:
+        """
+        :return: Names of the stored files
+        """
+
+        return list(self._files)
+
+    def clear(self):
+        """
+        Removes all stored files, including the session directory.
+        """
+
+        self._files.clear()
+
+        if self.cache is not None:
+            self.cache.release(self.session_id)
+
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
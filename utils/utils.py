@@ -1,17 +1,55 @@
-import json
+import contextlib
+import functools
+import hashlib
 import os
-import io
-import pandas as pd
+import pathlib
+import tempfile
+import time
+import uuid
+from typing import TYPE_CHECKING, Callable
+
 import streamlit as st
-from zipfile import ZipFile
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils import archives, consistency, converters, identity, memory, models, profiling, storage
+from utils.widgets import seed_tags
+
+# the modules of the features only some pages use are imported by the functions using them, so that importing a page
+# does not import sqlite3, the run queue or the git helpers of every other page
+if TYPE_CHECKING:
+    from utils import commits, discovery, drafts, globs, reachability, runs, validation
+
+# the most problems of a config listed below its form
+MAX_LISTED_ERRORS = 1000
+MAX_LISTED_DUPLICATES = 10
+MAX_LISTED_DRAFTS = 20
+# the most converted config files of each kind kept by the data cache outside server mode
+MAX_CACHED_CONVERSIONS = 16
+
+# the cached converters key on the precomputed fingerprints of the models instead of hashing their contents
+_MODEL_HASH_FUNCS = {
+    models.ConfigTable: lambda table: table.fingerprint,
+    models.ReportConfig: lambda report: report.fingerprint,
+}
+
+
+def cached_conversion(func: Callable) -> Callable:
+    """
+    Caches a converter in the data cache, keyed on the precomputed fingerprints of the models.
+
+    In server mode, the converter is not cached: the converted config files are kept by the artifact cache, whose budget
+    would not cover a second, process-wide copy of every converted file in the data cache. The rows of a config table
+    keep their encoded lines, so converting a table again only encodes the rows that were edited.
+
+    :param func: Converter of a config model into a config file
+    :return: Cached converter
+    """
+
+    if memory.SERVER_MODE:
+        return func
 
+    return st.cache_data(func, max_entries=MAX_CACHED_CONVERSIONS, hash_funcs=_MODEL_HASH_FUNCS)
 
-TEMP_DIR = "./temp"
-if not os.path.exists(TEMP_DIR):
-    os.mkdir(TEMP_DIR)
-else:
-    for file in os.listdir(TEMP_DIR):
-        os.remove(os.path.join(TEMP_DIR, file))
 
 def check_config_file_state(name_to_file_mapping: dict[str, bytes]):
     if len(name_to_file_mapping) == 0:
@@ -20,149 +58,1086 @@ def check_config_file_state(name_to_file_mapping: dict[str, bytes]):
     return name_to_file_mapping
 
 
-def zip_files(name_to_file_mapping: dict[str, bytes]):
+def zip_files(name_to_file_mapping: dict[str, archives.Member], compression: str = archives.COMPRESSION,
+              level: int = archives.COMPRESS_LEVEL) -> tempfile.SpooledTemporaryFile:
     """
     Converts a series of files into a zip file for downloading.
 
+    The archive is streamed into a spooled temporary file, which moves to the disk once the archive is large, and
+    files given as paths are streamed from the disk, so that large archives are not held in memory while they are
+    built.
+
     References https://discuss.streamlit.io/t/downloading-two-csv-files-using-download-button/39955/2
-    :param name_to_file_mapping: Mapping from file name to bytes.
-    :return: ByteIO object
+    :param name_to_file_mapping: Mapping from file name to bytes, text or the path of a file on the disk.
+    :param compression: ``stored`` or ``deflate``
+    :param level: Deflate compression level, from 0 to 9
+    :return: Spooled temporary file containing the archive, positioned at its start
+    """
+
+    return archives.spooled_archive(name_to_file_mapping, compression, level)
+
+
+def digest_config_files(name_to_file_mapping: dict[str, bytes | str]) -> str:
+    """
+    Computes a content digest of the config files, covering their names, order and contents.
+
+    :param name_to_file_mapping: Mapping from file name to file contents.
+    :return: Hex digest of the mapping
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for name, data in name_to_file_mapping.items():
+        data = data.encode("utf-8") if isinstance(data, str) else data
+        digest.update(name.encode("utf-8"))
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+
+    return digest.hexdigest()
+
+
+def get_config_archive(name_to_file_mapping: dict[str, bytes | str], digest: str | None = None) -> bytes:
+    """
+    Returns the zip archive of the config files, only rebuilding it when one of the files has changed.
+
+    The archive is kept as an artifact of the session under the digest of the config files, so reruns that do not
+    modify any config reuse the previously built archive instead of compressing every file again, and in server mode,
+    so do the other sessions with the same config files.
+
+    :param name_to_file_mapping: Mapping from file name to file contents.
+    :param digest: Digest of the config files, if already computed by ``digest_config_files``
+    :return: Bytes of the zip archive
     """
 
-    buffer = io.BytesIO()
+    def build() -> bytes:
+        store = get_artifact_store()
+        files = {}
 
-    with ZipFile(buffer, "x") as file:
         for name, data in name_to_file_mapping.items():
-            file.writestr(name, data)
+            path = store.path(name)
+            # stream the files that are kept on the disk, unless their session directory has been collected
+            files[name] = pathlib.Path(path) if path is not None and os.path.isfile(path) else data
+
+        with profile_phase("zip"), zip_files(files) as archive:
+            return archive.read()
 
-    return buffer
+    archive = get_artifact("configs.zip", digest or digest_config_files(name_to_file_mapping), build)
+    record_payload("configs.zip", len(archive))
+    return archive
 
 
-@st.cache_data
-def convert_repo_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+def render_sidebar():
+    """
+    Renders the sidebar shared by all pages, containing the config download and scaffold export controls.
     """
-    Converts the repo-config map from the form into a CSV file.
 
-    :param repoinfo: Dictionary containing the repository name to branch info and configurations.
-    :return: Bytes object
+    configs = get_config_files()
+    digest = digest_config_files(configs)
+
+    with st.sidebar:
+        st.write("## Download Config Files")
+        render_consistency_issues(check_config_files(digest, configs))
+        st.download_button(
+            on_click=lambda: check_config_file_state(get_config_files()),
+            label="Download Config Files",
+            data=get_config_archive(configs, digest),
+            mime="application/octet-stream",
+            file_name="configs.zip",
+            key="config-file-download"
+        )
+
+        st.write("## Export as RepoSense Scaffold")
+        if st.button("Export...", key="scaffold-export",
+                     help="Packages the configs with a run script, a Dockerfile and a CI workflow for RepoSense"):
+            export_scaffold()
+
+        # the scaffold is only offered while it holds the current config files, which it exports sorted by name
+        scaffold_archive = find_artifact("reposense-scaffold.zip", digest_config_files(dict(sorted(configs.items()))))
+
+        if scaffold_archive is not None:
+            st.download_button(
+                label="Download Scaffold",
+                data=scaffold_archive,
+                mime="application/zip",
+                file_name="reposense-scaffold.zip",
+                key="scaffold-download"
+            )
+
+        render_drafts()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def check_config_files(digest: str, _configs: dict[str, bytes | str]) -> list[consistency.Issue]:
+    """
+    Checks the config files against each other, which is cached by the digest of the config files and shared by all
+    sessions.
+
+    :param digest: Digest of the config files, as computed by ``digest_config_files``
+    :param _configs: Mapping from config file name to its contents, which is not hashed by the cache
+    :return: Issues found between the config files
+    """
+
+    with profile_phase("consistency"):
+        try:
+            return consistency.check_configs(consistency.parse_config_files(_configs))
+        except (ValueError, UnicodeDecodeError) as e:
+            return [consistency.Issue(consistency.ERROR, "", "", f"Unable to read the config files: {e}")]
+
+
+def render_consistency_issues(issues: list[consistency.Issue]):
+    """
+    Lists the issues found between the config files, e.g. authors of repositories that are not analysed.
+
+    :param issues: Issues found by ``check_config_files``
     """
 
-    all_entries = []
-    headers = ["Repository's Location", "Branch", "File formats", "Ignore Glob List", "Ignore standalone config",
-               "Ignore Commits List", "Ignore Authors List", "Shallow Cloning", "Find Previous Authors",
-               "File Size Limit", "Ignore File Size Limit", "Skip Ignored File Analysis"]
+    if not issues:
+        return
 
-    for repo_url, branches in repoinfo.items():
-        for branch, configs in branches.items():
-            all_entries.append([
-                repo_url,
-                branch,
-                ";".join(configs["file_fmts"]),
-                ";".join(configs["ignore_glob_lists"]),
-                "yes" if configs["ignore_standalone_configs"] else "",
-                ";".join(configs["ignore_commits_list"]),
-                ";".join(configs["ignore_authors_list"]),
-                "yes" if configs["shallow_cloning"] else "",
-                "yes" if configs["find_prev_authors"] else "",
-                0 if configs["file_size_limits"] < 0 else configs["file_size_limits"],
-                "yes" if configs["ignore_file_size_limits"] else "",
-                "yes" if configs["skip_ignored_file_analysis"] else ""
-            ])
+    errors = sum(issue.severity == consistency.ERROR for issue in issues)
+    summary = f"{errors} errors and {len(issues) - errors} warnings between the config files"
 
-    df = pd.DataFrame(all_entries, columns=headers)
+    with st.expander(("❌ " if errors else "⚠️ ") + summary, expanded=bool(errors)):
+        st.markdown("\n".join(
+            f"- **{issue.config}** {issue.entry and f'`{issue.entry}`: '}{issue.message}"
+            for issue in issues[:MAX_LISTED_ERRORS]
+        ))
 
-    # need to save it to disk first for Docker containers
-    df.to_csv("temp/repo-config.csv", index=False)
-    return df.to_csv(index=False).encode("utf-8")
+        if len(issues) > MAX_LISTED_ERRORS:
+            st.caption(f"Showing the first {MAX_LISTED_ERRORS} of {len(issues)} issues")
 
 
-@st.cache_data
-def convert_author_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+@st.cache_resource
+def get_profiler() -> profiling.Profiler:
     """
-    Converts the author-config map from the form into a CSV file.
+    Returns the profiler shared by all sessions, which collects the timings of the reruns of every page.
 
-    :param repoinfo: Dictionary containing the repository name to branch info and authors.
-    :return: Bytes object
+    :return: Profiler of the server
+    """
+
+    return profiling.Profiler()
+
+
+def start_rerun(page: str):
     """
+    Starts timing the rerun of a page. Called by every page before rendering anything.
+
+    :param page: Name of the page, e.g. repo-config
+    """
+
+    st.session_state["profile-rerun"] = profiling.Rerun(page)
 
-    all_entries = []
-    headers = ["Repository's Location",	"Branch", "Author's Git Host ID", "Author's Emails", "Author's Display Name",
-               "Author's Git Author Name", "Ignore Glob List"]
 
-    for repo_url, branches in repoinfo.items():
-        for branch, configs in branches.items():
-            all_entries.append([
-                repo_url,
-                branch,
-                configs["author_git_host_id"],
-                ";".join(configs["author_emails"]),
-                configs["author_display_name"],
-                ";".join(configs["git_author_name"]),
-                ";".join(configs["ignore_glob_lists"])
-            ])
+def profile_phase(name: str) -> contextlib.AbstractContextManager:
+    """
+    Times a block as a phase of the current rerun, e.g. ``with profile_phase("preview"): st.json(...)``.
 
-    df = pd.DataFrame(all_entries, columns=headers)
+    :param name: Name of the phase
+    :return: Context manager timing the block, which does nothing outside a timed rerun
+    """
 
-    # need to save it to disk first for Docker containers
-    df.to_csv("temp/author-config.csv", index=False)
-    return df.to_csv(index=False).encode("utf-8")
+    rerun = st.session_state.get("profile-rerun")
+    return rerun.phase(name) if rerun is not None else contextlib.nullcontext()
 
 
-@st.cache_data
-def convert_group_config_csv_to_csv(repoinfo: dict[str, dict[str, dict]]) -> bytes:
+def profiled(phase: str) -> Callable[[Callable], Callable]:
     """
-    Converts the group-config map from the form into a CSV file.
+    Times every call of the decorated function as a phase of the current rerun, including the calls answered from a
+    cache.
 
-    :param repoinfo: Dictionary containing the repository name to branch info and authors.
-    :return: Bytes object
+    :param phase: Name of the phase
+    :return: Decorator
     """
 
-    all_entries = []
-    headers = ["Repository's Location", "Group Name", "Globs"]
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_phase(phase):
+                return func(*args, **kwargs)
 
-    for repo_url, groups in repoinfo.items():
-        for group, configs in groups.items():
-            all_entries.append([
-                repo_url,
-                group,
-                ";".join(configs["glob_lists"]),
-            ])
+        return wrapper
 
-    df = pd.DataFrame(all_entries, columns=headers)
+    return decorator
 
-    # need to save it to disk first for Docker containers
-    df.to_csv("temp/group-config.csv", index=False)
-    return df.to_csv(index=False).encode("utf-8")
 
+def record_payload(name: str, size: int):
+    """
+    Records the size of a payload produced by the current rerun.
 
-@st.cache_data
-def convert_report_config_json_to_json(repoinfo: dict[str, str]) -> str:
+    :param name: Name of the payload, e.g. repo-config.csv
+    :param size: Size of the payload in bytes
     """
-    Converts the report-config.json mapping to a JSON file.
 
-    :param repoinfo: Dictionary containing JSON-serializable data to turn into a JSON file
-    :return: JSON string
+    rerun = st.session_state.get("profile-rerun")
+    if rerun is not None:
+        rerun.payload(name, size)
+
+
+def finish_rerun(panel: bool = True):
+    """
+    Finishes timing the rerun of a page and records it, and accounts the session state in server mode. Called by every
+    page after rendering everything.
+
+    The profiling panel is rendered in the sidebar when ``REPOCONFIG_PROFILE_PANEL`` is set, or when the page is opened
+    with the ``profile`` query parameter, e.g. ``/repo-config.csv_Configurator?profile``.
+
+    :param panel: Whether the profiling panel may be rendered, which fragments cannot do since they cannot write to
+                  the sidebar
     """
 
-    with open("temp/report-config.json", "w") as f:
-        json.dump(repoinfo, f, ensure_ascii=False, indent=4)
+    if get_artifact_cache() is not None:
+        account_session_state(get_artifact_cache())
+
+    rerun = st.session_state.pop("profile-rerun", None)
+
+    if rerun is None:
+        return
 
-    return json.dumps(repoinfo, indent=4)
+    record = rerun.finish()
+    profiler = get_profiler()
+    profiler.record(record)
 
+    if panel and (profiling.PANEL or "profile" in st.query_params):
+        render_profile_panel(record, profiler.summary(record.page))
 
-@st.cache_data
-def convert_config_json_to_json(repoinfo: dict) -> str:
+        if get_artifact_cache() is not None:
+            render_memory_panel(get_artifact_cache())
+
+
+def account_session_state(cache: memory.ArtifactCache):
     """
-    Converts the report-config.json mapping to a JSON file.
+    Counts the largest parts of the session state towards the memory budget of the session: the encoded lines of its
+    config tables and the data of its grid editors. The encoded lines are only kept to serialize the tables faster, so
+    they are dropped when the session goes over its budget, and a warning is shown if it is still over.
 
-    :param repoinfo: Dictionary containing JSON-serializable data to turn into a JSON file
-    :return: JSON string
+    :param cache: Artifact cache of the server
+    """
+
+    session = get_artifact_store().session_id
+    tables = st.session_state.get("config-tables", {}).values()
+    grids = sum(st.session_state.get("grid-bytes", {}).values())
+
+    try:
+        cache.account(session, grids + sum(table.encoded_size for table in tables))
+        return
+    except memory.SessionBudgetError:
+        for table in tables:
+            table.forget_encoded()
+
+    try:
+        cache.account(session, grids)
+    except memory.SessionBudgetError as e:
+        st.warning(f"{e}. Download the created config files and reload the page to free its memory.")
+
+
+def _format_quantiles(values: dict[float, float], unit: str) -> list[str]:
+    if unit == "ms":
+        return [f"{values[q] * 1000:.1f} ms" if q in values else "-" for q in profiling.QUANTILES]
+
+    return [f"{values[q]:,} B" if q in values else "-" for q in profiling.QUANTILES]
+
+
+def render_profile_panel(record: profiling.RerunRecord, summary: dict):
+    """
+    Renders the timings of the rerun of the page and the percentiles of its latest reruns in the sidebar.
+
+    :param record: Record of the rerun of the page
+    :param summary: Percentiles of the latest reruns of the page, as computed by ``Profiler.summary``
+    """
+
+    rows = [("**total**", f"{record.seconds * 1000:.1f} ms", *_format_quantiles(summary["rerun"]["total"], "ms"))]
+    rows += [
+        (name, f"{record.phases[name] * 1000:.1f} ms" if name in record.phases else "-",
+         *_format_quantiles(values, "ms"))
+        for name, values in summary["phases"].items()
+    ]
+    rows += [
+        (name, f"{record.payloads[name]:,} B" if name in record.payloads else "-", *_format_quantiles(values, "B"))
+        for name, values in summary["payloads"].items()
+    ]
+
+    header = ["", "this rerun", *(f"p{round(q * 100)}" for q in profiling.QUANTILES)]
+    lines = ["| " + " | ".join(header) + " |", "|" + " --- |" * len(header)]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+
+    with st.sidebar:
+        with st.expander("Profiling", expanded=True):
+            st.markdown("\n".join(lines))
+            st.caption(f"Percentiles of the latest {summary['reruns']} reruns of `{record.page}`")
+
+
+def render_memory_panel(cache: memory.ArtifactCache):
+    """
+    Renders the memory accounting of the artifact cache in the sidebar, for the current session and for the server.
+
+    :param cache: Artifact cache of the server
+    """
+
+    usage = cache.usage()
+    session = get_artifact_store().session_id
+    lines = [
+        "| | held | budget |",
+        "| --- | --- | --- |",
+        f"| this session | {cache.session_size(session):,} B | {cache.session_budget:,} B |",
+        f"| all sessions | {usage.size:,} B | {usage.budget:,} B |",
+    ]
+
+    with st.sidebar:
+        with st.expander("Memory", expanded=True):
+            st.markdown("\n".join(lines))
+            st.caption(f"{usage.entries} artifacts of {usage.sessions} sessions, {usage.saved:,} B saved by sharing, "
+                       f"{usage.hits} hits, {usage.misses} misses and {usage.evictions} evictions, "
+                       f"{usage.state:,} B of session state")
+
+
+def render_sections(page: str, indices: list[int], render: Callable[[int], object], batched: bool = False):
+    """
+    Renders sections of a page, e.g. its repositories, separated by dividers, and keeps the result of each section in
+    ``st.session_state[f"{page}-sections"]``, where the page collects the results of all its sections.
+
+    In batched mode, each section is rendered as a fragment, so that interacting with one of its widgets only reruns
+    that section, which commits its result to the session state, instead of rerunning the whole page. The rest of the
+    page, e.g. the preview of the created configs, catches up on the next full rerun, e.g. when the configs are
+    created.
+
+    :param page: Name of the page, e.g. repo-config
+    :param indices: Indices of the sections to render
+    :param render: Function rendering the section at an index and returning its result
+    :param batched: Whether to render each section as a fragment
+    """
+
+    sections = st.session_state.setdefault(f"{page}-sections", {})
+
+    for position, index in enumerate(indices):
+        if batched:
+            _render_section_fragment(page, index, render)
+        else:
+            sections[index] = render(index)
+
+        if position != len(indices) - 1:
+            st.divider()
+
+
+@st.experimental_fragment
+def _render_section_fragment(page: str, index: int, render: Callable[[int], object]):
+    sections = st.session_state.setdefault(f"{page}-sections", {})
+    ctx = get_script_run_ctx()
+
+    if ctx is None or not ctx.fragment_ids_this_run:
+        sections[index] = render(index)
+        return
+
+    # the section is rerun on its own, so it is timed as a rerun of its own
+    start_rerun(f"{page}-section")
+
+    try:
+        sections[index] = render(index)
+    finally:
+        finish_rerun(panel=False)
+
+
+def validate_config(config: str, records: list[dict]) -> list["validation.ValidationError"]:
+    """
+    Validates every row of a config, timed as a phase of the current rerun.
+
+    :param config: Name of the config, one of the keys of ``validation.CONFIGS``
+    :param records: Records of the rows of the config, including the incomplete rows left out of the config
+    :return: Problems found in the config
+    """
+
+    from utils import validation
+
+    with profile_phase("validate"):
+        return validation.validate(config, records)
+
+
+def render_validation_errors(errors: list["validation.ValidationError"]) -> bool:
+    """
+    Lists the problems found in a config, with the row and field of each problem.
+
+    :param errors: Problems found by ``validate_config``
+    :return: Whether the config has no problems
+    """
+
+    if not errors:
+        return True
+
+    st.error(f"Found {len(errors)} problems in the configurations, fix them and create the configurations again!")
+    st.dataframe(
+        [
+            {"Row": error.row + 1, "Entry": error.entry, "Field": error.field, "Problem": error.message}
+            for error in errors[:MAX_LISTED_ERRORS]
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    if len(errors) > MAX_LISTED_ERRORS:
+        st.caption(f"Showing the first {MAX_LISTED_ERRORS} of {len(errors)} problems")
+
+    return False
+
+
+def _listed(items: list[str]) -> str:
+    more = f", and {len(items) - MAX_LISTED_DUPLICATES} more" if len(items) > MAX_LISTED_DUPLICATES else ""
+    return ", ".join(items[:MAX_LISTED_DUPLICATES]) + more
+
+
+def render_duplicates(duplicates: list[identity.Duplicate], entries: str = "branches"):
+    """
+    Lists the repositories entered more than once, which were merged into the location they were first entered with,
+    and the branches or groups that override an earlier one.
+
+    :param duplicates: Duplicates recorded by a ``RepoIndex``
+    :param entries: Name of the entries of a repository, e.g. branches or groups
+    """
+
+    merged = [f"`{duplicate.location}` into `{duplicate.kept}`" for duplicate in duplicates if not duplicate.key]
+    overridden = [f"`{duplicate.key}` of `{duplicate.kept}`" for duplicate in duplicates if duplicate.key]
+
+    if merged:
+        st.info(f"Merged {len(merged)} repositories entered more than once, so that they are only analysed once: "
+                f"{_listed(merged)}")
+
+    if overridden:
+        st.warning(f"{len(overridden)} {entries} entered more than once override the earlier ones: "
+                   f"{_listed(overridden)}")
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_scaffold_archive(digest: str, _configs: dict[str, bytes]) -> bytes:
+    """
+    Builds the scaffold archive of the config files, which is cached by the digest of the config files and shared by
+    all sessions, since identical config files always give identical archives.
+
+    :param digest: Digest of the config files, as computed by ``digest_config_files``
+    :param _configs: Mapping from config file name to its contents, which is not hashed by the cache
+    :return: Bytes of the zip archive
+    """
+
+    return _build_scaffold_archive(_configs)
+
+
+def _build_scaffold_archive(configs: dict[str, bytes]) -> bytes:
+    from utils import scaffold
+
+    with scaffold.build_scaffold(configs) as spooled:
+        return spooled.read()
+
+
+def export_scaffold():
+    """
+    Builds the scaffold archive of the config files created in this session for the sidebar's download button.
+
+    Only the config files created with _Create configurations!_ are exported, so the scaffold holds the same
+    validated config files as ``configs.zip``, and never the unsubmitted forms of the pages.
+    """
+
+    with profile_phase("scaffold"):
+        configs = dict(sorted(get_config_files().items()))
+
+        if not configs:
+            st.warning("No config files created!")
+            return
+
+        digest = digest_config_files(configs)
+        render_consistency_issues(check_config_files(digest, configs))
+
+        build = functools.partial(build_scaffold_archive, digest, configs)
+
+        if get_artifact_cache() is not None:
+            # the artifact cache already shares the archive between sessions, without another copy in the data cache
+            build = functools.partial(_build_scaffold_archive, configs)
+
+        archive = get_artifact("reposense-scaffold.zip", digest, build)
+
+    record_payload("reposense-scaffold.zip", len(archive))
+
+
+def get_artifact_store() -> storage.ArtifactStore:
+    """
+    Returns the artifact store of the current session, creating it on first use.
+
+    Stale session directories left behind by other sessions are garbage collected whenever a new store is created.
+
+    :return: ArtifactStore of the current session
+    """
+
+    if "artifact-store" not in st.session_state:
+        session_id = uuid.uuid4().hex
+
+        if storage.STORAGE_MODE == "memory":
+            st.session_state["artifact-store"] = storage.ArtifactStore(session_id, None, get_artifact_cache())
+        else:
+            storage.collect_garbage(keep=(session_id,))
+            st.session_state["artifact-store"] = storage.ArtifactStore(session_id, cache=get_artifact_cache())
+
+    return st.session_state["artifact-store"]
+
+
+@st.cache_resource
+def get_artifact_cache() -> memory.ArtifactCache | None:
+    """
+    Returns the artifact cache shared by all sessions in server mode, whose memory accounting is written alongside the
+    profiling metrics.
+
+    :return: ArtifactCache of the server, or None outside server mode
+    """
+
+    if not memory.SERVER_MODE:
+        return None
+
+    cache = memory.ArtifactCache()
+    get_profiler().add_collector(cache.to_prometheus)
+    return cache
+
+
+def get_config_files() -> dict[str, bytes]:
+    """
+    Returns the config files created in the current session, marking the session as active in server mode.
+
+    :return: Mapping from config file name to its contents, in the order they were first created
+    """
+
+    store = get_artifact_store()
+
+    if store.cache is not None:
+        store.cache.touch(store.session_id)
+
+    return {name: data for name in store.names() if (data := store.get(name)) is not None}
+
+
+def get_artifact(name: str, key: str, build: Callable[[], bytes]) -> bytes:
+    """
+    Returns an artifact of the current session, e.g. an archive, only building it when its inputs have changed.
+
+    In server mode, the artifact is looked up in the artifact cache shared by all sessions, so that sessions with the
+    same inputs build it once. Otherwise, it is kept in the session state.
+
+    :param name: Name of the artifact, e.g. configs.zip
+    :param key: Digest of the inputs of the artifact
+    :param build: Function building the artifact
+    :return: Bytes of the artifact
+    """
+
+    cache = get_artifact_cache()
+
+    if cache is None:
+        cached = st.session_state.get(f"artifact-{name}")
+
+        if cached is None or cached[0] != key:
+            cached = st.session_state[f"artifact-{name}"] = (key, build())
+
+        return cached[1]
+
+    session, key = get_artifact_store().session_id, f"{name}:{key}"
+    data = cache.bind(session, name, key)
+
+    if data is None:
+        data = build()
+
+        try:
+            data = cache.put(session, name, data, key)
+        except memory.SessionBudgetError as e:
+            st.warning(f"{e}, so it is built again on every rerun")
+
+    return data
+
+
+def find_artifact(name: str, key: str) -> bytes | None:
+    """
+    :param name: Name of an artifact of the current session
+    :param key: Digest of the inputs the artifact must have been built from
+    :return: Bytes of the artifact as last returned by ``get_artifact``, or None if there is none, it was built from
+             other inputs, or it was evicted from the artifact cache in server mode
+    """
+
+    cache = get_artifact_cache()
+
+    if cache is None:
+        cached = st.session_state.get(f"artifact-{name}")
+        return cached[1] if cached is not None and cached[0] == key else None
+
+    return cache.get(get_artifact_store().session_id, name, f"{name}:{key}")
+
+
+@st.cache_resource
+def get_autosaver() -> "drafts.Autosaver | None":
+    """
+    Returns the draft autosaver shared by all sessions, purging the drafts past their TTL when it is created.
+
+    :return: Autosaver of the server, or None if drafts are disabled
+    """
+
+    from utils import drafts
+
+    if not drafts.DRAFTS_PATH:
+        return None
+
+    store = drafts.DraftStore()
+    store.purge()
+    return drafts.Autosaver(store)
+
+
+def get_draft_id() -> str:
+    """
+    Returns the id of the draft of the current session, which is kept in the URL so that reloading the page restores
+    the draft.
+
+    :return: Id of the draft
+    """
+
+    if "draft-id" not in st.session_state:
+        _use_draft(st.query_params.get("draft") or uuid.uuid4().hex[:12])
+
+    if st.query_params.get("draft") != st.session_state["draft-id"]:
+        st.query_params["draft"] = st.session_state["draft-id"]
+
+    return st.session_state["draft-id"]
+
+
+def _use_draft(draft: str):
+    # the drafts the session created or was opened with, which are the only drafts it lists, opens or deletes
+    st.session_state.setdefault("draft-ids", []).append(draft)
+    st.session_state["draft-id"] = st.query_params["draft"] = draft
+
+
+def restore_draft(page: str) -> dict | None:
+    """
+    Restores the form of a page from the draft of the current session, once per session and draft, before the
+    widgets of the page are rendered.
+
+    :param page: Name of the page
+    :return: Form of the page saved in the draft, or None if there is nothing to restore
+    """
+
+    autosaver = get_autosaver()
+    restored = st.session_state.setdefault("draft-restored", {})
+
+    if autosaver is None or restored.get(page) == get_draft_id():
+        return None
+
+    restored[page] = get_draft_id()
+
+    with profile_phase("restore"):
+        return autosaver.restore(get_draft_id(), page) or None
+
+
+def autosave_draft(page: str, form: dict):
+    """
+    Schedules the form of a page to be saved into the draft of the current session, without blocking the rerun.
+
+    :param page: Name of the page
+    :param form: Form of the page, whose top-level entries, e.g. repositories, are saved as separate fields
+    """
+
+    autosaver = get_autosaver()
+
+    if autosaver is not None:
+        autosaver.schedule(get_draft_id(), page, {str(name): value for name, value in form.items()})
+
+
+def open_draft(draft: str):
+    """
+    Switches the session to one of its saved drafts, whose forms replace the forms of the pages as they are next
+    rendered.
+
+    :param draft: Id of the draft
+    """
+
+    if draft not in st.session_state.get("draft-ids", []):
+        return
+
+    st.session_state["draft-id"] = st.query_params["draft"] = draft
+    # restore every page from the opened draft when it is next rendered
+    st.session_state["draft-restored"] = {}
+
+
+def delete_draft(draft: str):
+    """
+    Deletes one of the saved drafts of the session. The forms of the session keep being autosaved into a new draft if
+    it was the current one.
+
+    :param draft: Id of the draft
+    """
+
+    if draft not in st.session_state.get("draft-ids", []):
+        return
+
+    st.session_state["draft-ids"].remove(draft)
+    autosaver = get_autosaver()
+    autosaver.store.delete(draft)
+    autosaver.forget(draft)
+
+    if st.session_state.get("draft-id") == draft:
+        # keep editing the forms in a new draft
+        _use_draft(uuid.uuid4().hex[:12])
+
+
+def render_drafts():
+    """
+    Renders the draft controls of the sidebar, listing the saved drafts of the session to open or delete. Drafts of
+    other sessions are only opened through their links, so that users sharing a server cannot open or delete each
+    other's drafts.
+    """
+
+    autosaver = get_autosaver()
+
+    if autosaver is None:
+        return
+
+    draft = get_draft_id()
+    st.write("## Drafts")
+    st.caption(f"Your forms are autosaved as draft `{draft}`. Open this page's link again to pick up where you left "
+               f"off.")
+
+    if autosaver.error is not None:
+        st.warning(f"Unable to autosave the draft: {autosaver.error}")
+
+    with st.expander("Saved drafts"):
+        for info in autosaver.store.list_drafts(st.session_state.get("draft-ids", []), MAX_LISTED_DRAFTS):
+            label_col, open_col, delete_col = st.columns([3, 2, 2])
+            label_col.markdown(f"`{info.id}`  \n{time.strftime('%Y-%m-%d %H:%M', time.localtime(info.updated))}, "
+                               f"{', '.join(info.pages) or 'empty'}")
+            open_col.button("Open", key=f"draft-open-{info.id}", on_click=open_draft, args=(info.id,),
+                            disabled=info.id == draft)
+            delete_col.button("Delete", key=f"draft-delete-{info.id}", on_click=delete_draft, args=(info.id,))
+
+
+@st.cache_resource
+def get_run_queue() -> "runs.RunQueue":
+    """
+    Returns the RepoSense run queue shared by all sessions, so that the concurrency limit applies to the whole server.
+
+    :return: RunQueue of the server
+    """
+
+    from utils import runs
+
+    return runs.RunQueue()
+
+
+@st.cache_resource
+def get_reachability_checker() -> "reachability.ReachabilityChecker":
+    """
+    Returns the repository reachability checker shared by all sessions, so that they share its cached listings.
+
+    :return: ReachabilityChecker of the server
+    """
+
+    from utils import reachability
+
+    return reachability.ReachabilityChecker()
+
+
+@st.cache_resource
+def get_author_discovery() -> "discovery.AuthorDiscovery":
+    """
+    Returns the author discovery shared by all sessions, so that they share its thread pool and cached scans.
+
+    :return: AuthorDiscovery of the server
+    """
+
+    from utils import discovery
+
+    return discovery.AuthorDiscovery()
+
+
+@st.cache_resource
+def get_path_index_cache() -> "globs.PathIndexCache":
+    """
+    Returns the path index cache shared by all sessions, so that each repository tree is only listed once.
+
+    :return: PathIndexCache of the server
+    """
+
+    from utils import globs
+
+    return globs.PathIndexCache()
+
+
+def render_glob_preview(repo_location: str, glob_lists: dict[str, list[str]], branch: str = "",
+                        unmatched_label: str = "Files matched by no glob"):
+    """
+    Renders the number of files of a repository on the disk matched by each glob, the globs matching the same files
+    and the files matched by no glob.
+
+    :param repo_location: Disk Path to the repository
+    :param glob_lists: Dictionary containing the name of each list of globs to its globs
+    :param branch: Branch whose files are matched, or an empty string for the checked out branch
+    :param unmatched_label: Label of the files matched by no glob
     """
 
-    repoinfo_copy = repoinfo.copy()
-    repoinfo_copy["authors"] = list(repoinfo_copy["authors"].values())
+    from utils import globs, reachability
 
-    with open("temp/config.json", "w") as f:
-        json.dump(repoinfo_copy, f, ensure_ascii=False, indent=4)
+    if not repo_location:
+        return
+
+    if reachability.is_remote(repo_location):
+        st.caption("Glob previews are only available for repositories on the disk")
+        return
+
+    try:
+        index = get_path_index_cache().get(os.path.expanduser(repo_location), branch)
+        preview = index.preview(glob for patterns in glob_lists.values() for glob in patterns)
+    except (globs.GlobError, ValueError) as e:
+        st.caption(f":x: :red[Unable to preview the globs: {e}]")
+        return
+
+    owners = {}
+    for name, patterns in glob_lists.items():
+        for glob in patterns:
+            owners.setdefault(glob, []).append(name)
+
+    if preview.counts:
+        st.dataframe(
+            [
+                {"List": name, "Glob": glob, "Files matched": preview.counts[glob]}
+                for name, patterns in glob_lists.items()
+                for glob in patterns
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    for glob, names in owners.items():
+        if len(names) > 1 and preview.counts[glob]:
+            st.caption(f":warning: {', '.join(names)} all include `{glob}`, which matches {preview.counts[glob]} files")
+
+    for glob, other, shared in preview.overlaps:
+        st.caption(f":warning: `{glob}` ({', '.join(owners[glob])}) and `{other}` ({', '.join(owners[other])}) "
+                   f"both match {shared} files")
+
+    st.caption(f"{unmatched_label}: {preview.unmatched_count} of {preview.total} files")
+
+    if preview.unmatched_examples:
+        more = preview.unmatched_count - len(preview.unmatched_examples)
+        st.code("\n".join(preview.unmatched_examples) + (f"\n... and {more} more" if more else ""), language=None)
+
+
+@st.cache_resource
+def get_commit_validator() -> "commits.CommitValidator":
+    """
+    Returns the commit validator shared by all sessions, so that they share its cached checks.
+
+    :return: CommitValidator of the server
+    """
+
+    from utils import commits
+
+    return commits.CommitValidator()
+
+
+def _expand_ranges(tags_key: str, checks: dict[str, "commits.CommitCheck"]):
+    expanded = []
+    for entry, check in checks.items():
+        expanded.extend(check.commits if check.ok and ".." in entry else [entry])
+    seed_tags(tags_key, list(dict.fromkeys(expanded)))
+
+
+def render_commit_check(repo_location: str, branch: str, entries: list[str], tags_key: str):
+    """
+    Renders whether each entry of an ``ignore_commits_list`` refers to commits of a branch of a repository on the disk,
+    with a button to replace the ranges of commits in the tags input with the commits they contain.
+
+    :param repo_location: Disk Path to the repository
+    :param branch: Branch whose commits are ignored
+    :param entries: Full or partial commit hashes, or ranges of commits separated by ``..``
+    :param tags_key: Key of the tags input of the entries
+    """
+
+    from utils import commits, reachability
+
+    if not repo_location or not entries:
+        return
+
+    if reachability.is_remote(repo_location):
+        st.caption("Commit checks are only available for repositories on the disk")
+        return
+
+    try:
+        checks = get_commit_validator().validate(os.path.expanduser(repo_location), branch, entries, expand=True)
+    except commits.CommitError as e:
+        st.caption(f":x: :red[Unable to check the commits: {e}]")
+        return
+
+    st.dataframe(
+        [{"Entry": entry, "Status": ("✅ " if ok else "❌ ") + message} for entry, ok, message, _ in checks.values()],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    if any(check.ok and ".." in entry for entry, check in checks.items()):
+        st.button("Replace the ranges with their commits", key=tags_key + "-expand", on_click=_expand_ranges,
+                  args=(tags_key, checks))
+
+
+def _parse_scan_target(line: str) -> tuple[str, str]:
+    path, sep, branch = line.strip().rpartition("@")
+    return (path, branch) if sep and path else (line.strip(), "")
+
+
+def _describe_proposal(path: str, branch: str, proposal: "discovery.AuthorProposal") -> str:
+    email = f" <{proposal.emails[0]}>" if proposal.emails else ""
+    return f"{proposal.display_name}{email} ({proposal.commits} commits in {path}@{branch})"
+
+
+def _apply_proposals(key: str, proposals: list, on_apply: Callable):
+    on_apply([proposals[index] for index in st.session_state[f"{key}-discovery-selected"]])
+    st.session_state[f"{key}-discovery-selected"] = []
+
+
+def render_author_discovery(key: str, repos: list[tuple[str, str]],
+                            on_apply: Callable[[list[tuple[str, str, "discovery.AuthorProposal"]]], None]):
+    """
+    Renders a panel that scans the history of repositories on the disk and proposes authors from it.
+
+    :param key: Prefix of the keys of the panel's widgets
+    :param repos: Disk paths and branches to scan when no repositories are entered in the panel
+    :param on_apply: Callback receiving the selected proposals as tuples of the repository, branch and proposal,
+                     which runs before the page is rendered so that it can seed the page's widgets
+    """
+
+    with st.expander("Discover Authors from `git` History"):
+        targets = st.text_area(
+            "Enter in the Disk Paths to the `git` repositories to scan, one per line",
+            key=f"{key}-discovery-targets",
+            placeholder="e.g. ../foo/bar or ../foo/bar@master",
+            help="Append `@branch` to scan a branch other than the checked out one. "
+                 + ("Leave blank to scan the repositories on the disk entered below" if repos else "")
+        )
+        targets = [_parse_scan_target(line) for line in targets.splitlines() if line.strip()] or repos
+
+        if st.button("Scan", key=f"{key}-discovery-scan", disabled=not targets):
+            with st.spinner(f"Scanning {len(targets)} repositories..."):
+                results = get_author_discovery().discover(targets)
+
+            st.session_state[f"{key}-discovery-results"] = results
+            st.session_state[f"{key}-discovery-selected"] = []
+
+        results = st.session_state.get(f"{key}-discovery-results", {})
+        proposals = []
+
+        for (path, _), result in results.items():
+            if isinstance(result, str):
+                st.warning(f"Unable to scan `{path}`: {result}")
+            else:
+                branch, authors = result
+                proposals.extend((path, branch, author) for author in authors)
+
+        if proposals:
+            selected = st.multiselect(
+                f"Select the authors to add, out of the {len(proposals)} authors found",
+                range(len(proposals)),
+                key=f"{key}-discovery-selected",
+                format_func=lambda index: _describe_proposal(*proposals[index])
+            )
+            st.button(
+                "Add selected authors",
+                key=f"{key}-discovery-apply",
+                disabled=not selected,
+                on_click=_apply_proposals,
+                args=(key, proposals, on_apply)
+            )
+
+
+def save_config_file(name: str, data: bytes) -> bytes:
+    """
+    Saves a generated config file into the session's artifact store, from which the configs to download are read.
+
+    :param name: Name of the config file, e.g. repo-config.csv
+    :param data: Contents of the config file
+    :return: The same bytes, or the identical bytes shared by all sessions in server mode, for use in the page's
+             download button
+    """
+
+    try:
+        data = get_artifact_store().put(name, data)
+    except memory.SessionBudgetError as e:
+        st.error(f"Unable to keep `{name}` for the config archive and the scaffold: {e}")
+
+    record_payload(name, len(data))
+    return data
+
+
+def get_config_table(name: str, row_type: type) -> models.ConfigTable:
+    """
+    Returns the table of config rows of a page, which is kept across reruns so that the encoded lines of the rows
+    that were not edited can be reused when the config is serialized again.
+
+    :param name: Name of the config, e.g. repo-config
+    :param row_type: Model of the rows, e.g. RepoBranchConfig
+    :return: ConfigTable of the config
+    """
+
+    tables = st.session_state.setdefault("config-tables", {})
+
+    if name not in tables:
+        tables[name] = models.ConfigTable(row_type)
+
+    return tables[name]
+
+
+@profiled("convert")
+@cached_conversion
+def convert_repo_config_csv_to_csv(table: models.ConfigTable) -> bytes:
+    """
+    Converts the repo-config table from the form into a CSV file.
+
+    :param table: ConfigTable of RepoBranchConfig rows, one for each branch of each repository
+    :return: Bytes object
+    """
+
+    return table.to_csv()
+
+
+@profiled("convert")
+@cached_conversion
+def convert_author_config_csv_to_csv(table: models.ConfigTable) -> bytes:
+    """
+    Converts the author-config table from the form into a CSV file.
+
+    :param table: ConfigTable of AuthorConfig rows, one for each author of each branch
+    :return: Bytes object
+    """
+
+    return table.to_csv()
+
+
+@profiled("convert")
+@cached_conversion
+def convert_group_config_csv_to_csv(table: models.ConfigTable) -> bytes:
+    """
+    Converts the group-config table from the form into a CSV file.
+
+    :param table: ConfigTable of GroupConfig rows, one for each group of each repository
+    :return: Bytes object
+    """
+
+    return table.to_csv()
+
+
+@profiled("convert")
+@cached_conversion
+def convert_report_config_json_to_json(report: models.ReportConfig) -> bytes:
+    """
+    Converts the report-config.json model to a JSON file.
+
+    :param report: ReportConfig of the form
+    :return: Bytes object
+    """
+
+    return converters.convert_report_config_json_to_json(report.to_json()).encode("utf-8")
+
+
+@profiled("convert")
+@cached_conversion
+def convert_config_json_to_json(repoinfo: dict) -> bytes:
+    """
+    Converts the config.json mapping to a JSON file.
+
+    :param repoinfo: Dictionary containing JSON-serializable data to turn into a JSON file
+    :return: Bytes object
+    """
 
-    return json.dumps(repoinfo_copy, indent=4)
+    return converters.convert_config_json_to_json(repoinfo).encode("utf-8")
@@ -0,0 +1,243 @@
+"""
+Validates whole configs in one batched pass, reporting every problem together with the row and field it was found in.
+
+A config is validated as a list of records, one for each row of the config, whose fields are named as in the grid
+editing mode, e.g. the rows of a grid or the flattened form of a page. Every check is applied to a whole column at
+once with precompiled patterns, and globs are only parsed, never compiled, so validating a config takes linear time in
+the number of its rows and values.
+"""
+
+import re
+from typing import NamedTuple
+
+from utils import globs, identity
+
+# RepoSense reads the file size limit as a Java int
+MAX_FILE_SIZE_LIMIT = 2 ** 31 - 1
+
+_URL = re.compile(r"(?:https?|ssh|git)://[^\s/]+/\S+|file://\S+|(?:[\w.-]+@)?[\w.-]+:[^\s/\\]\S*")
+# a scheme, or the host of a scp-like location, as opposed to the drive letter of a Windows path
+_URL_PREFIX = re.compile(r"[^/\\]*@|[a-zA-Z][\w+.-]+:")
+_CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+class ValidationError(NamedTuple):
+    row: int
+    entry: str
+    field: str
+    message: str
+
+
+class Field(NamedTuple):
+    name: str
+    label: str
+    kind: str  # one of text, location, ref, list, globs, emails or size
+    required: bool = True
+
+
+class ConfigSpec(NamedTuple):
+    fields: list[Field]
+    # fields identifying a row, which must be unique within the config
+    key: tuple[str, ...] = ()
+
+
+CONFIGS = {
+    "repo-config": ConfigSpec([
+        Field("repo", "Repository's Location", "location"),
+        Field("branch", "Branch", "ref"),
+        Field("file_fmts", "File formats", "list"),
+        Field("ignore_glob_lists", "Ignore Glob List", "globs"),
+        Field("ignore_commits_list", "Ignore Commits List", "list"),
+        Field("ignore_authors_list", "Ignore Authors List", "list"),
+        Field("file_size_limits", "File Size Limit", "size"),
+    ], key=("repo", "branch")),
+    "author-config": ConfigSpec([
+        Field("repo", "Repository's Location", "location"),
+        Field("branch", "Branch", "ref"),
+        Field("author_git_host_id", "Author's Git Host ID", "text"),
+        Field("author_emails", "Author's Emails", "emails"),
+        Field("author_display_name", "Author's Display Name", "text"),
+        Field("git_author_name", "Author's Git Author Name", "list"),
+        Field("ignore_glob_lists", "Ignore Glob List", "globs"),
+    ], key=("repo", "branch")),
+    "group-config": ConfigSpec([
+        Field("repo", "Repository's Location", "location"),
+        Field("group", "Group Name", "text"),
+        Field("glob_lists", "Globs", "globs"),
+    ], key=("repo", "group")),
+    "report-config": ConfigSpec([
+        Field("title", "Report Title", "text"),
+    ]),
+    "config-json": ConfigSpec([
+        Field("formats", "File formats", "list"),
+        Field("ignoreGlobList", "Ignore Glob List", "globs", required=False),
+        Field("ignoreCommitList", "Ignore Commits List", "list"),
+        Field("ignoreAuthorList", "Ignore Authors List", "list"),
+    ]),
+    "config-json-authors": ConfigSpec([
+        Field("gitId", "Author's Git Host ID", "text"),
+        Field("emails", "Author's Emails", "emails"),
+        Field("displayName", "Author's Display Name", "text"),
+        Field("authorNames", "Author's Git Author Name", "list"),
+        Field("ignoreGlobList", "Ignore Glob List", "globs"),
+    ], key=("gitId",)),
+}
+
+
+def _glob_error(glob: str) -> str | None:
+    # only escapes, classes and groups can be malformed, so the globs without them need not be parsed
+    if "[" not in glob and "{" not in glob and "\\" not in glob:
+        return None
+
+    try:
+        globs.translate_glob(glob)
+    except ValueError as e:
+        return str(e)
+
+    return None
+
+
+def _email_error(email: str) -> str | None:
+    return None if _EMAIL.fullmatch(email) else f"`{email}` is not a valid email address"
+
+
+def _location_error(value: str) -> str | None:
+    if _CONTROL.search(value) or value != value.strip():
+        return "must not contain control characters or surrounding spaces"
+
+    if _URL_PREFIX.match(value):
+        return None if _URL.fullmatch(value) else f"`{value}` is not a valid repository URL"
+
+    return None
+
+
+def _ref_error(value: str) -> str | None:
+    # the same rules as the branches passed to git, so that a branch is never valid on one path only
+    return None if identity.is_valid_branch(value) else f"`{value}` is not a valid branch name"
+
+
+def _size_error(value) -> str | None:
+    if isinstance(value, bool) or not isinstance(value, int):
+        return "must be a whole number of bytes"
+
+    if not 0 < value <= MAX_FILE_SIZE_LIMIT:
+        return f"must be between 1 and {MAX_FILE_SIZE_LIMIT} bytes"
+
+    return None
+
+
+# checks of a single value of each kind, and of each item of the lists of each kind
+_VALUE_CHECKS = {"location": _location_error, "ref": _ref_error, "size": _size_error}
+_ITEM_CHECKS = {"globs": _glob_error, "emails": _email_error}
+# normalization of the values of each kind identifying a row, other than names, which are trimmed
+_KEY_CANONICAL = {"location": identity.canonical_repo}
+
+
+def check_column(values: list, kind: str, required: bool = True) -> list[tuple[int, str]]:
+    """
+    Checks the values of a column. Each distinct value or list item is only checked once, since the same
+    repositories, globs and emails tend to be repeated across many rows.
+
+    :param values: Values of the column, one for each row
+    :param kind: Kind of the values, one of text, location, ref, list, globs, emails or size
+    :param required: Whether every row must have a value
+    :return: Index of every row with a missing or invalid value and the problem with the value
+    """
+
+    if required:
+        # empty strings and lists, None and a zero size all count as missing
+        problems = [(row, "is required") for row, value in enumerate(values) if not value]
+    else:
+        problems = []
+
+    if kind in _VALUE_CHECKS:
+        check, results = _VALUE_CHECKS[kind], {}
+
+        for row, value in enumerate(values):
+            if not value:
+                continue
+
+            try:
+                message = results[value]
+            except KeyError:
+                message = results[value] = check(value)
+            except TypeError:
+                # values that cannot be hashed, e.g. a list where a single value was expected
+                message = check(value)
+
+            if message is not None:
+                problems.append((row, message))
+    elif kind in _ITEM_CHECKS:
+        check, results = _ITEM_CHECKS[kind], {}
+
+        for row, items in enumerate(values):
+            for item in items or ():
+                if item not in results:
+                    results[item] = check(item)
+
+                message = results[item]
+                if message is not None:
+                    problems.append((row, message))
+                    break
+
+    return problems
+
+
+def describe(record: dict, key: tuple[str, ...]) -> str:
+    """
+    :param record: Record of a row
+    :param key: Fields identifying the row
+    :return: Description of the row to show alongside its problems, e.g. its repository and branch
+    """
+
+    return " / ".join(str(record.get(name) or "?") for name in key)
+
+
+def validate(config: str, records: list[dict]) -> list[ValidationError]:
+    """
+    Validates every row of a config: its required fields, the syntax of its repository URLs or paths, branch names,
+    globs and emails, the bounds of its file size limit, and that no two rows have the same key, counting the
+    different locations of the same repository as the same.
+
+    :param config: Name of the config, one of the keys of ``CONFIGS``
+    :param records: Records of the rows of the config
+    :return: Problems found in the config, ordered by row and then by field
+    """
+
+    spec = CONFIGS[config]
+    problems: dict[int, list[tuple[str, str]]] = {}
+
+    for field in spec.fields:
+        for row, message in check_column([record.get(field.name) for record in records], field.kind, field.required):
+            problems.setdefault(row, []).append((field.label, message))
+
+    if spec.key:
+        seen = {}
+        labels = " / ".join(field.label for field in spec.fields if field.name in spec.key)
+        # the same repository entered with different locations, or a name with surrounding spaces, is the same key
+        canonical = [_KEY_CANONICAL.get(field.kind, identity.canonical_name)
+                     for name in spec.key for field in spec.fields if field.name == name]
+
+        for row, record in enumerate(records):
+            key = tuple(record.get(name) for name in spec.key)
+
+            if not all(key):
+                continue
+
+            try:
+                key = tuple(normalize(value) for normalize, value in zip(canonical, key))
+            except AttributeError:
+                # values that are not strings, which the column checks already report
+                pass
+
+            if key in seen:
+                problems.setdefault(row, []).append((labels, f"is the same as row {seen[key] + 1}, which it overrides"))
+            else:
+                seen[key] = row
+
+    return [
+        ValidationError(row, describe(records[row], spec.key), label, message)
+        for row in range(len(records)) if row in problems
+        for label, message in problems[row]
+    ]
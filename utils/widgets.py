@@ -0,0 +1,153 @@
+"""
+Widget helpers shared by the configurator pages.
+
+Some configurator pages only render part of their widgets on each run, e.g. one page of repositories at a time.
+Streamlit discards the state of widgets that are not rendered in a run, so the helpers here remember the last value
+of each widget, scoped to the current page, and restore it when the widget is rendered again.
+"""
+
+import math
+from typing import Callable
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+def _page_state(name: str) -> dict:
+    """
+    Returns a dictionary in the session state that is private to the current page, since the configurator pages
+    reuse the same widget keys.
+    """
+
+    ctx = get_script_run_ctx()
+    return st.session_state.setdefault(f"{name}-{ctx.page_script_hash if ctx else ''}", {})
+
+
+def seed_tags(key: str, value: list[str]):
+    """
+    Sets the value of a tags input before it is rendered, e.g. when importing an existing config.
+
+    The tags component keeps its own state on the frontend once mounted, so seeding a new value also gives the
+    component a new identity to remount it with the seeded value.
+
+    :param key: Key of the tags input, as passed to ``tags_input``
+    :param value: Tags to show in the input
+    """
+
+    seeds = _page_state("tag-seeds")
+    generation = seeds[key][0] + 1 if key in seeds else 1
+    seeds[key] = (generation, list(value))
+    _page_state("tag-values")[key] = list(value)
+
+
+def tags_input(label: str, key: str, **kwargs) -> list[str]:
+    """
+    Renders an ``st_tags`` input whose value can be seeded with ``seed_tags``, and which keeps its value while it
+    is not rendered.
+
+    :param label: Label of the input
+    :param key: Unique key of the input
+    :param kwargs: Other keyword arguments to pass on to ``st_tags``
+    :return: Tags entered in the input
+    """
+
+    # streamlit_tags loads Streamlit's components API, which imports pyarrow and numpy, so it is only imported once a
+    # page renders its first tags input
+    from streamlit_tags import st_tags
+
+    seeds, values = _page_state("tag-seeds"), _page_state("tag-values")
+    generation, value = seeds.get(key, (0, []))
+
+    if f"{key}-{generation}" not in st.session_state and values.get(key) is not None and values[key] != value:
+        # the input was not rendered in the previous run and lost its state, so remount it with its last value
+        seed_tags(key, values[key])
+        generation, value = seeds[key]
+
+    values[key] = tags = st_tags(label=label, key=f"{key}-{generation}", value=value, **kwargs)
+    return tags
+
+
+def kept(widget: Callable, *args, key: str, **kwargs):
+    """
+    Renders a widget, restoring the value it had when it was last rendered if Streamlit has discarded its state.
+
+    :param widget: Widget function to call, e.g. ``st.text_input``
+    :param args: Positional arguments of the widget
+    :param key: Unique key of the widget
+    :param kwargs: Other keyword arguments of the widget
+    :return: Value of the widget
+    """
+
+    values = _page_state("widget-values")
+
+    if key not in st.session_state and key in values:
+        st.session_state[key] = values[key]
+
+    values[key] = value = widget(*args, key=key, **kwargs)
+    return value
+
+
+def seed_widget(key: str, value):
+    """
+    Sets the value of a widget rendered with ``kept`` before it is rendered, including when it is not rendered in
+    the next run, e.g. when it is on another page of sections.
+
+    :param key: Key of the widget
+    :param value: Value to show in the widget
+    """
+
+    st.session_state[key] = _page_state("widget-values")[key] = value
+
+
+def widget_value(key: str, default=None):
+    """
+    Returns the current value of a widget rendered with ``kept``, or its remembered value if it was not rendered in
+    the previous run.
+
+    :param key: Key of the widget
+    :param default: Value to return if the widget has never been rendered
+    :return: Value of the widget
+    """
+
+    if key in st.session_state:
+        return st.session_state[key]
+
+    return _page_state("widget-values").get(key, default)
+
+
+def forget_widgets():
+    """
+    Forgets the remembered values of the widgets on the current page, e.g. before seeding the page with imported
+    values.
+    """
+
+    _page_state("widget-values").clear()
+    _page_state("tag-values").clear()
+
+
+def paginate(key: str, total: int, label: Callable[[int], str]) -> list[int]:
+    """
+    Renders the search and pagination controls for a list of sections, and returns the sections to render.
+
+    :param key: Unique key prefix of the controls
+    :param total: Total number of sections
+    :param label: Function returning the searchable label of the section at an index
+    :return: Indices of the sections on the current page
+    """
+
+    search_col, size_col, page_col = st.columns([3, 1, 1])
+    search = search_col.text_input("Search", key=f"{key}-search", placeholder="Filter by repository...")
+    page_size = size_col.selectbox("Per page", [5, 10, 25, 50, 100], index=1, key=f"{key}-page-size")
+
+    indices = list(range(total))
+    if search:
+        indices = [index for index in indices if search.lower() in label(index).lower()]
+
+    pages = max(math.ceil(len(indices) / page_size), 1)
+    if st.session_state.get(f"{key}-page", 1) > pages:
+        st.session_state[f"{key}-page"] = pages
+
+    page = page_col.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}-page")
+    visible = indices[(page - 1) * page_size:page * page_size]
+    st.caption(f"Showing {len(visible)} of {len(indices)} repositories (page {page} of {pages})")
+    return visible